@@ -0,0 +1,72 @@
+"""
+Startup discovery cost with and without a discovery artifact.
+
+Every round builds a fresh topology (not timed) and times what run() does before the initial
+publish: loading the artifact, building the discovery record of every device and writing the
+artifact back. Four variants are compared:
+
+- no artifact: every device is serialized;
+- cold: an artifact path is configured but the file does not exist yet, so every device is
+  serialized, fingerprinted and written;
+- warm: the artifact matches the topology, so every device is fingerprinted and its payload read
+  from the mapping instead of being serialized, and the file is left untouched;
+- one changed: like warm, but one device changed, so it is serialized and its record appended.
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_artifact.py [--devices 500] [--entities 10] [--rounds 5]
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+import time
+
+from bench_discovery import build_connection
+
+
+def startup(devices: int, entities: int, path: str | None, change: bool = False) -> float:
+    connection = build_connection(devices, entities, False)
+    if change:
+        connection._origins[0]._devices[0].entities[0].availability.add("bench/changed/status")
+    if path is not None:
+        connection.discovery_artifact(path)
+    start = time.perf_counter()
+    connection._load_discovery_artifact()
+    try:
+        for _device, _record in connection._discovery_records():
+            pass
+    finally:
+        connection._save_discovery_artifact()
+    return time.perf_counter() - start
+
+
+def run(devices: int, entities: int, rounds: int) -> dict:
+    best = {"no artifact": float("inf"), "cold": float("inf"), "warm": float("inf"), "one changed": float("inf")}
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "discovery.bin")
+        for _ in range(rounds):
+            best["no artifact"] = min(best["no artifact"], startup(devices, entities, None))
+            if os.path.exists(path):
+                os.remove(path)
+            best["cold"] = min(best["cold"], startup(devices, entities, path))
+            best["warm"] = min(best["warm"], startup(devices, entities, path))
+            best["one changed"] = min(best["one changed"], startup(devices, entities, path, change=True))
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--devices", type=int, default=500)
+    parser.add_argument("--entities", type=int, default=10)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    best = run(args.devices, args.entities, args.rounds)
+    for variant, seconds in best.items():
+        print(f"{variant:>11}: {seconds * 1e3:8.1f} ms startup discovery "
+              f"({args.devices} devices x {args.entities} entities, best of {args.rounds})")
+
+
+if __name__ == "__main__":
+    main()
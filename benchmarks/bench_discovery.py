@@ -0,0 +1,123 @@
+"""
+Per-device cost of building and serializing device discovery payloads.
+
+Builds a topology of devices with mixed entities and times the full discovery pipeline
+(payload build, abbreviation key resolution, JSON serialization) with the discovery cache
+cleared before every round, so each round re-serializes every device.
+
+It also times the former recursive ``resolve_abbreviations`` pass, which copied every
+Enum-keyed payload into a string-keyed one before serialization. Payload builders now emit
+final keys from the precompiled tables in ``helper.abbreviations.key_tables``, so that
+per-device cost is gone from the pipeline entirely.
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_discovery.py [--devices 500] [--entities 10] [--rounds 5]
+"""
+from __future__ import annotations
+
+import argparse
+import time
+from enum import Enum
+
+from jhomeassistant import HomeAssistantConnection, HomeAssistantDevice, HomeAssistantOrigin
+from jhomeassistant.helper.abbreviations import get_key_table
+from jhomeassistant.entities import ButtonEntity, SelectEntity, SensorEntity
+from jhomeassistant.types.device_classes import SensorDeviceClass
+from jhomeassistant.types.units import TemperatureUnit
+
+
+class _NullConnection:
+    availability_topic = "bench/bridge/status"
+    is_connected = True
+
+
+def build_connection(devices: int, entities: int, abbreviated: bool) -> HomeAssistantConnection:
+    origin = HomeAssistantOrigin("Benchmark", sw_version="1.0", url="https://example.invalid")
+    for d in range(devices):
+        device = HomeAssistantDevice(f"Bench Device {d}", identifier=f"bench-device-{d}")
+        device.manufacturer = "ACME"
+        device.model = "Bench"
+        for e in range(entities):
+            kind = e % 3
+            base = f"bench/{d}/{e}"
+            if kind == 0:
+                entity = SensorEntity(f"Temperature {e}", f"{base}/state", SensorDeviceClass.TEMPERATURE, TemperatureUnit.CELSIUS)
+            elif kind == 1:
+                entity = ButtonEntity(f"Restart {e}", f"{base}/set", on_press=lambda *_: None)
+            else:
+                entity = SelectEntity(f"Mode {e}", f"{base}/state", f"{base}/set", ["auto", "manual"], on_select=lambda *_: None)
+            entity.availability.add(f"{base}/available")
+            device.add_entities(entity)
+        origin.add_devices(device)
+    return HomeAssistantConnection(_NullConnection(), abbreviated).add_origin(origin)
+
+
+def run(devices: int, entities: int, rounds: int, abbreviated: bool) -> float:
+    connection = build_connection(devices, entities, abbreviated)
+    best = float("inf")
+    for _ in range(rounds):
+        connection._discovery_cache.clear()
+        start = time.perf_counter()
+        for _device, _record in connection._discovery_records():
+            pass
+        best = min(best, time.perf_counter() - start)
+    return best / devices
+
+
+def legacy_resolve_abbreviations(payload: dict, abbreviated: bool) -> dict:
+    """The recursive resolver discovery used before the precompiled key tables."""
+    new_payload = {}
+    for key, value in payload.items():
+        if isinstance(value, dict):
+            value = legacy_resolve_abbreviations(value, abbreviated)
+        elif isinstance(value, list):
+            value = [legacy_resolve_abbreviations(i, abbreviated) if isinstance(i, dict) else i for i in value]
+        if isinstance(key, Enum):
+            first, second = key.value
+            key = second if abbreviated else first
+        new_payload[key] = value
+    return new_payload
+
+
+def _to_enum_keys(payload, inverse):
+    if isinstance(payload, dict):
+        return {inverse.get(k, k): _to_enum_keys(v, inverse) for k, v in payload.items()}
+    if isinstance(payload, list):
+        return [_to_enum_keys(i, inverse) for i in payload]
+    return payload
+
+
+def run_legacy_resolution(devices: int, entities: int, rounds: int, abbreviated: bool) -> float:
+    """Per-device cost of the removed Enum -> string copy, measured on equivalent Enum-keyed payloads."""
+    connection = build_connection(devices, entities, abbreviated)
+    table = get_key_table(abbreviated)
+    # Component unique ids are plain strings and must stay untouched.
+    inverse = {v: k for k, v in table.items() if k.value[1 if abbreviated else 0] == v}
+    payloads = [_to_enum_keys(payload, inverse) for _topic, payload in connection._discovery_gen()]
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for payload in payloads:
+            legacy_resolve_abbreviations(payload, abbreviated)
+        best = min(best, time.perf_counter() - start)
+    return best / devices
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--devices", type=int, default=500)
+    parser.add_argument("--entities", type=int, default=10)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    for abbreviated in (False, True):
+        per_device = run(args.devices, args.entities, args.rounds, abbreviated)
+        mode = "abbreviated" if abbreviated else "full"
+        legacy = run_legacy_resolution(args.devices, args.entities, args.rounds, abbreviated)
+        print(f"{mode:>11}: {per_device * 1e6:8.1f} us/device pipeline, "
+              f"removed recursive resolution pass: {legacy * 1e6:6.1f} us/device "
+              f"({args.entities} entities/device, best of {args.rounds})")
+
+
+if __name__ == "__main__":
+    main()
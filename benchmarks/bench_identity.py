@@ -0,0 +1,77 @@
+"""
+Discovery cost of a single large device with and without memoized identity tokens.
+
+``HomeAssistantDevice.unique_id`` and ``HomeAssistantEntityBase.identifier`` cache their
+``build_urlsafe_token`` result until the device identifiers, the device name or the entity name
+change. The baseline rounds swap in the former properties, which hashed on every access.
+Each round clears the discovery cache, so every round serializes the whole device.
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_identity.py [--entities 1000] [--rounds 20]
+"""
+from __future__ import annotations
+
+import argparse
+import time
+from contextlib import contextmanager
+
+from jmqtt import client_identity
+
+from jhomeassistant import HomeAssistantConnection, HomeAssistantDevice, HomeAssistantOrigin
+from jhomeassistant.entities import HomeAssistantEntityBase, SensorEntity
+
+
+class _NullConnection:
+    availability_topic = "bench/bridge/status"
+    is_connected = True
+
+
+def build_connection(entities: int) -> HomeAssistantConnection:
+    device = HomeAssistantDevice("Bench Device", identifier="bench-device")
+    for e in range(entities):
+        device.add_entities(SensorEntity(f"Register {e}", f"bench/registers/{e}/state"))
+    origin = HomeAssistantOrigin("Benchmark").add_devices(device)
+    return HomeAssistantConnection(_NullConnection()).add_origin(origin)
+
+
+@contextmanager
+def unmemoized_identity():
+    """Temporarily restore the properties that rebuilt the tokens on every access."""
+    unique_id, identifier = HomeAssistantDevice.unique_id, HomeAssistantEntityBase.identifier
+    HomeAssistantDevice.unique_id = property(
+        lambda self: client_identity.hashing.build_urlsafe_token(self.identifiers[0], 32, self.name))
+    HomeAssistantEntityBase.identifier = property(
+        lambda self: client_identity.hashing.build_urlsafe_token(self._name))
+    try:
+        yield
+    finally:
+        HomeAssistantDevice.unique_id, HomeAssistantEntityBase.identifier = unique_id, identifier
+
+
+def run(connection: HomeAssistantConnection, rounds: int) -> float:
+    best = float("inf")
+    for _ in range(rounds):
+        connection._discovery_cache.clear()
+        start = time.perf_counter()
+        for _device, _record in connection._discovery_records():
+            pass
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entities", type=int, default=1000)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    connection = build_connection(args.entities)
+    with unmemoized_identity():
+        baseline = run(connection, args.rounds)
+    memoized = run(connection, args.rounds)
+    print(f"{args.entities} entities: {baseline * 1e3:7.2f} ms unmemoized, {memoized * 1e3:7.2f} ms memoized "
+          f"({baseline / memoized:.2f}x, best of {args.rounds})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Import time of jhomeassistant entry points, measured with ``python -X importtime``.
+
+Every statement runs in a fresh interpreter several times; the report shows the best cumulative
+import time of the ``jhomeassistant`` package, how many of its modules were loaded, and the
+slowest modules by self time, so eager-import regressions are visible at a glance.
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_import.py [--rounds 5] [--top 5] [statement ...]
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+from dataclasses import dataclass
+from typing import List
+
+PACKAGE = "jhomeassistant"
+DEFAULT_STATEMENTS = [
+    "import jhomeassistant",
+    "from jhomeassistant.types import Component",
+    "from jhomeassistant import HomeAssistantConnection, HomeAssistantDevice",
+    "from jhomeassistant.entities import SensorEntity",
+]
+
+_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)$")
+
+
+@dataclass
+class ImportRecord:
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def parse_importtime(stderr: str) -> List[ImportRecord]:
+    """Parse the ``-X importtime`` report (one line per module, children listed before their parent)."""
+    records = []
+    for line in stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            records.append(ImportRecord(module, int(self_us), int(cumulative_us), (len(indent) - 1) // 2))
+    return records
+
+
+def measure(statement: str) -> List[ImportRecord]:
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [os.getcwd(), os.environ.get("PYTHONPATH")]))}
+    completed = subprocess.run([sys.executable, "-X", "importtime", "-c", statement],
+                               capture_output=True, text=True, env=env, check=True)
+    return parse_importtime(completed.stderr)
+
+
+def _in_package(record: ImportRecord) -> bool:
+    return record.module.split(".")[0] == PACKAGE
+
+
+def package_time_us(records: List[ImportRecord]) -> int:
+    """Cumulative time of all package modules that were not imported by another package module."""
+    total = 0
+    for index, record in enumerate(records):
+        # A module's importer is the next line with a smaller depth.
+        parent = next((r for r in records[index + 1:] if r.depth < record.depth), None)
+        if _in_package(record) and (parent is None or not _in_package(parent)):
+            total += record.cumulative_us
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("statements", nargs="*", default=DEFAULT_STATEMENTS)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--top", type=int, default=5)
+    args = parser.parse_args()
+
+    for statement in args.statements:
+        runs = [measure(statement) for _ in range(args.rounds)]
+        best = min(runs, key=package_time_us)
+        modules = [r for r in best if _in_package(r)]
+        slowest = sorted(modules, key=lambda r: r.self_us, reverse=True)[:args.top]
+        print(f"{statement}\n    {package_time_us(best) / 1e3:7.2f} ms, {len(modules)} {PACKAGE} modules "
+              f"(best of {args.rounds})")
+        for record in slowest:
+            print(f"    {record.self_us / 1e3:7.2f} ms self  {record.module}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,29 @@
+from typing import TYPE_CHECKING
 
-from . import types
-from . import entities
-from .homeassistant_device import HomeAssistantDevice
-from .homeassistant_connection import HomeAssistantConnection
-from .homeassistant_origin import HomeAssistantOrigin
-from .homeassistant_runtime import HomeAssistantRuntime
+from jhomeassistant.lazy_import import lazy_exports
 
-__all__ = ["HomeAssistantDevice", "HomeAssistantConnection", "HomeAssistantOrigin", "HomeAssistantRuntime"]
+if TYPE_CHECKING:
+    from . import types
+    from . import entities
+    from .homeassistant_device import HomeAssistantDevice
+    from .homeassistant_connection import HomeAssistantConnection
+    from .homeassistant_origin import HomeAssistantOrigin
+    from .homeassistant_runtime import HomeAssistantRuntime
+    from .homeassistant_schedule_group import HomeAssistantScheduleGroup
+
+# Submodules and classes are imported on first attribute access to keep "import jhomeassistant" cheap.
+_EXPORTS = {
+    "types": ".types",
+    "entities": ".entities",
+    "HomeAssistantDevice": ".homeassistant_device",
+    "HomeAssistantConnection": ".homeassistant_connection",
+    "HomeAssistantOrigin": ".homeassistant_origin",
+    "HomeAssistantRuntime": ".homeassistant_runtime",
+    "HomeAssistantScheduleGroup": ".homeassistant_schedule_group",
+}
+
+__all__ = ["HomeAssistantDevice", "HomeAssistantConnection", "HomeAssistantOrigin", "HomeAssistantRuntime",
+           "HomeAssistantScheduleGroup"]
 __version__ = "0.3.2"
+
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS, globals())
@@ -1,8 +1,28 @@
-from .homeassistant_entity_base import HomeAssistantEntityBase
-from .stateful_entity import StatefulEntity
-from .commandable_entity import CommandableEntity
-from .button_entity import ButtonEntity
-from .select_entity import SelectEntity
-from .sensor_entity import SensorEntity
-from .event_entity import EventEntity
-from .update_entity import UpdateEntity
+from typing import TYPE_CHECKING
+
+from jhomeassistant.lazy_import import lazy_exports
+
+if TYPE_CHECKING:
+    from .homeassistant_entity_base import HomeAssistantEntityBase
+    from .stateful_entity import StatefulEntity
+    from .commandable_entity import CommandableEntity
+    from .button_entity import ButtonEntity
+    from .select_entity import SelectEntity
+    from .sensor_entity import SensorEntity
+    from .event_entity import EventEntity
+    from .update_entity import UpdateEntity
+
+_EXPORTS = {
+    "HomeAssistantEntityBase": ".homeassistant_entity_base",
+    "StatefulEntity": ".stateful_entity",
+    "CommandableEntity": ".commandable_entity",
+    "ButtonEntity": ".button_entity",
+    "SelectEntity": ".select_entity",
+    "SensorEntity": ".sensor_entity",
+    "EventEntity": ".event_entity",
+    "UpdateEntity": ".update_entity",
+}
+
+__all__ = list(_EXPORTS)
+
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS, globals())
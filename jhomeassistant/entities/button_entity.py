@@ -2,7 +2,7 @@ from __future__ import annotations
 from typing import Callable
 
 from jhomeassistant.entities.commandable_entity import CommandableEntity
-from jhomeassistant.helper.abbreviations import Abbreviation
+from jhomeassistant.helper.abbreviations import Abbreviation, KeyTable
 from jhomeassistant.types.component import Component
 from jhomeassistant.types.device_classes import ButtonDeviceClass
 
@@ -19,9 +19,8 @@ class ButtonEntity(CommandableEntity):
                          command_topic=command_topic, on_command=on_press)
         self._device_class = device_class
 
-    @property
-    def internal_discovery_payload(self) -> dict:
-        payload = super().internal_discovery_payload
+    def internal_discovery_payload(self, keys: KeyTable) -> dict:
+        payload = super().internal_discovery_payload(keys)
         if self._device_class is not ButtonDeviceClass.NONE:
-            payload[Abbreviation.DEVICE_CLASS] = self._device_class.value
+            payload[keys[Abbreviation.DEVICE_CLASS]] = self._device_class.value
         return payload
@@ -3,7 +3,7 @@ from typing import Any, Callable
 
 from jhomeassistant.entities.homeassistant_entity_base import HomeAssistantEntityBase, MQTTConnection
 from jhomeassistant.helper import validate_topic
-from jhomeassistant.helper.abbreviations import Abbreviation
+from jhomeassistant.helper.abbreviations import Abbreviation, KeyTable
 from jhomeassistant.types.component import Component
 
 
@@ -24,9 +24,8 @@ class CommandableEntity(HomeAssistantEntityBase):
         if self._command_topic is not None:
             connection.unsubscribe(self._command_topic)
 
-    @property
-    def internal_discovery_payload(self) -> dict:
-        payload = super().internal_discovery_payload
+    def internal_discovery_payload(self, keys: KeyTable) -> dict:
+        payload = super().internal_discovery_payload(keys)
         if self._command_topic is not None:
-            payload[Abbreviation.COMMAND_TOPIC] = self._command_topic
+            payload[keys[Abbreviation.COMMAND_TOPIC]] = self._command_topic
         return payload
@@ -6,7 +6,7 @@ from typing import Any, List
 from jmqtt import QualityOfService as QoS
 
 from jhomeassistant.entities.stateful_entity import StatefulEntity
-from jhomeassistant.helper.abbreviations import Abbreviation
+from jhomeassistant.helper.abbreviations import Abbreviation, KeyTable
 from jhomeassistant.types.component import Component
 from jhomeassistant.types.device_classes import EventDeviceClass
 
@@ -31,14 +31,13 @@ class EventEntity(StatefulEntity):
         retain: bool = False,
         wait_for_publish: bool = False,
         **attributes: Any,
-    ) -> None:
+    ):
         payload = json.dumps({"event_type": event_type, **attributes}, separators=(",", ":"))
-        self._publish_state(payload, qos, retain, wait_for_publish)
+        return self._publish_state(payload, qos, retain, wait_for_publish)
 
-    @property
-    def internal_discovery_payload(self) -> dict:
-        payload = super().internal_discovery_payload
-        payload[Abbreviation.EVENT_TYPES] = self._event_types
+    def internal_discovery_payload(self, keys: KeyTable) -> dict:
+        payload = super().internal_discovery_payload(keys)
+        payload[keys[Abbreviation.EVENT_TYPES]] = self._event_types
         if self._device_class is not EventDeviceClass.NONE:
-            payload[Abbreviation.DEVICE_CLASS] = self._device_class.value
+            payload[keys[Abbreviation.DEVICE_CLASS]] = self._device_class.value
         return payload
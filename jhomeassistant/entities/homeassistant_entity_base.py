@@ -6,25 +6,39 @@ from jmqtt import MQTTConnectionV3, MQTTConnectionV5, client_identity
 from jhomeassistant.features import Availability
 from jhomeassistant.features.availability.availability_source import AvailabilitySource
 from jhomeassistant.helper import validate_non_empty_string
-from jhomeassistant.helper.abbreviations import Abbreviation
-from jhomeassistant.helper.scheduler import Schedule
+from jhomeassistant.helper.abbreviations import Abbreviation, KeyTable
+from jhomeassistant.helper.dirty_tracking import DirtyTracked
+from jhomeassistant.helper.scheduler import AdaptiveInterval, Schedule
+from jhomeassistant.types.catch_up_policy import CatchUpPolicy
 from jhomeassistant.types.component import Component
+from jhomeassistant.types.overrun_policy import OverrunPolicy
 
 MQTTConnection = Union[MQTTConnectionV3, MQTTConnectionV5]
 
 
-class HomeAssistantEntityBase:
+class HomeAssistantEntityBase(DirtyTracked):
+    _UNTRACKED_ATTRIBUTES = frozenset({"_get_connection", "_schedules", "_identifier_token"})
+
     def __init__(self, component: Component, name: str, **kwargs):
         validate_non_empty_string(name, "Entity 'name'")
         self._schedules: List[Schedule] = []
         self._name = name
         self._component = component
         self._get_connection: Callable[[], MQTTConnection] | None = None
+        # (name, token) of the last identifier computation; recomputed when the name changes.
+        self._identifier_token: tuple | None = None
 
         self.availability = Availability(source=AvailabilitySource.ENTITY)
 
-    def add_schedule(self, interval: float, function: Callable[[MQTTConnection], None]):
-        self._schedules.append(Schedule(interval, function))
+    def add_schedule(self, interval: float, function: Callable[[MQTTConnection], None], max_concurrency: int = 1,
+                     overrun: OverrunPolicy = OverrunPolicy.SKIP, timeout: float | None = None,
+                     phase: float | None = None, jitter: float = 0.0, catch_up: CatchUpPolicy = CatchUpPolicy.SKIP,
+                     adaptive: AdaptiveInterval | None = None):
+        """Run function every interval seconds; see Schedule for the options.
+        max_concurrency, overrun and timeout apply when the connection runs schedules on an executor.
+        With adaptive, function returns the polled value and the interval follows its volatility."""
+        self._schedules.append(Schedule(interval, function, max_concurrency, overrun, timeout, phase, jitter, catch_up,
+                                        adaptive))
         return self
 
     def mqtt_connected(self, get_connection: Callable[[], MQTTConnection]) -> None:
@@ -39,9 +53,16 @@ class HomeAssistantEntityBase:
     def schedules(self):
         return self._schedules
 
+    @property
+    def internal_revision(self) -> int:
+        return max(self._revision, self.availability.internal_revision)
+
     @property
     def identifier(self):
-        return client_identity.hashing.build_urlsafe_token(self._name)
+        cached = self._identifier_token
+        if cached is None or cached[0] != self._name:
+            cached = self._identifier_token = (self._name, client_identity.hashing.build_urlsafe_token(self._name))
+        return cached[1]
 
     @property
     def name(self):
@@ -51,12 +72,11 @@ class HomeAssistantEntityBase:
     def platform(self):
         return self._component
 
-    @property
-    def internal_discovery_payload(self):
+    def internal_discovery_payload(self, keys: KeyTable) -> dict:
         return {
-            Abbreviation.PLATFORM: self._component.value,
-            Abbreviation.NAME: self._name,
-            **self.availability.internal_to_dict()
+            keys[Abbreviation.PLATFORM]: self._component.value,
+            keys[Abbreviation.NAME]: self._name,
+            **self.availability.internal_to_dict(keys)
         }
 
     def home_assistant_birth(self, connection: MQTTConnection):
@@ -5,7 +5,7 @@ from jmqtt import QualityOfService as QoS
 
 from jhomeassistant.entities.commandable_entity import CommandableEntity
 from jhomeassistant.entities.stateful_entity import StatefulEntity
-from jhomeassistant.helper.abbreviations import Abbreviation
+from jhomeassistant.helper.abbreviations import Abbreviation, KeyTable
 from jhomeassistant.types.component import Component
 from jhomeassistant.types.entity_category import EntityCategory
 
@@ -47,23 +47,22 @@ class SelectEntity(StatefulEntity, CommandableEntity):
         qos: QoS = QoS.AtMostOnce,
         retain: bool = False,
         wait_for_publish: bool = False,
-    ) -> None:
+    ):
         if option not in self._options:
             raise ValueError(f"Option '{option}' not in options: {self._options}")
-        self._publish_state(option, qos, retain, wait_for_publish)
+        return self._publish_state(option, qos, retain, wait_for_publish)
 
-    @property
-    def internal_discovery_payload(self) -> dict:
-        payload = super().internal_discovery_payload
-        payload[Abbreviation.OPTIONS] = self._options
+    def internal_discovery_payload(self, keys: KeyTable) -> dict:
+        payload = super().internal_discovery_payload(keys)
+        payload[keys[Abbreviation.OPTIONS]] = self._options
         if self._entity_category is not None:
-            payload[Abbreviation.ENTITY_CATEGORY] = self._entity_category.value
+            payload[keys[Abbreviation.ENTITY_CATEGORY]] = self._entity_category.value
         if self._retain is not None:
-            payload[Abbreviation.RETAIN] = self._retain
+            payload[keys[Abbreviation.RETAIN]] = self._retain
         if self._optimistic is not None:
-            payload[Abbreviation.OPTIMISTIC] = self._optimistic
+            payload[keys[Abbreviation.OPTIMISTIC]] = self._optimistic
         if self._value_template is not None:
-            payload[Abbreviation.VALUE_TEMPLATE] = self._value_template
+            payload[keys[Abbreviation.VALUE_TEMPLATE]] = self._value_template
         if self._command_template is not None:
-            payload[Abbreviation.COMMAND_TEMPLATE] = self._command_template
+            payload[keys[Abbreviation.COMMAND_TEMPLATE]] = self._command_template
         return payload
@@ -4,7 +4,7 @@ from typing import Union
 from jmqtt import QualityOfService as QoS
 
 from jhomeassistant.entities.stateful_entity import StatefulEntity
-from jhomeassistant.helper.abbreviations import Abbreviation
+from jhomeassistant.helper.abbreviations import Abbreviation, KeyTable
 from jhomeassistant.types.component import Component
 from jhomeassistant.types.device_classes import SensorDeviceClass
 from jhomeassistant.types.entity_category import EntityCategory
@@ -33,18 +33,17 @@ class SensorEntity(StatefulEntity):
         qos: QoS = QoS.AtMostOnce,
         retain: bool = False,
         wait_for_publish: bool = False,
-    ) -> None:
-        self._publish_state(str(value), qos, retain, wait_for_publish)
+    ):
+        return self._publish_state(str(value), qos, retain, wait_for_publish)
 
-    @property
-    def internal_discovery_payload(self) -> dict:
-        payload = super().internal_discovery_payload
+    def internal_discovery_payload(self, keys: KeyTable) -> dict:
+        payload = super().internal_discovery_payload(keys)
         if self._device_class is not None:
-            payload[Abbreviation.DEVICE_CLASS] = self._device_class.value
+            payload[keys[Abbreviation.DEVICE_CLASS]] = self._device_class.value
         if self._unit is not None:
-            payload[Abbreviation.UNIT_OF_MEASUREMENT] = self._unit.value
+            payload[keys[Abbreviation.UNIT_OF_MEASUREMENT]] = self._unit.value
         if self._value_template is not None:
-            payload[Abbreviation.VALUE_TEMPLATE] = self._value_template
+            payload[keys[Abbreviation.VALUE_TEMPLATE]] = self._value_template
         if self._entity_category is not None:
-            payload[Abbreviation.ENTITY_CATEGORY] = self._entity_category.value
+            payload[keys[Abbreviation.ENTITY_CATEGORY]] = self._entity_category.value
         return payload
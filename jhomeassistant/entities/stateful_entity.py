@@ -5,7 +5,7 @@ from jmqtt import QualityOfService as QoS
 
 from jhomeassistant.entities.homeassistant_entity_base import HomeAssistantEntityBase
 from jhomeassistant.helper import validate_topic
-from jhomeassistant.helper.abbreviations import Abbreviation
+from jhomeassistant.helper.abbreviations import Abbreviation, KeyTable
 from jhomeassistant.types.component import Component
 
 
@@ -16,11 +16,10 @@ class StatefulEntity(HomeAssistantEntityBase):
         super().__init__(component, name, **kwargs)
         self._state_topic: str = validate_topic(state_topic)
 
-    @property
-    def internal_discovery_payload(self) -> dict:
+    def internal_discovery_payload(self, keys: KeyTable) -> dict:
         return {
-            **super().internal_discovery_payload,
-            Abbreviation.STATE_TOPIC: self._state_topic,
+            **super().internal_discovery_payload(keys),
+            keys[Abbreviation.STATE_TOPIC]: self._state_topic,
         }
 
     def _publish_state(
@@ -29,5 +28,6 @@ class StatefulEntity(HomeAssistantEntityBase):
         qos: QoS = QoS.AtMostOnce,
         retain: bool = False,
         wait_for_publish: bool = False,
-    ) -> None:
-        self._get_connection().publish(self._state_topic, payload, qos, retain, wait_for_publish=wait_for_publish)
+    ):
+        """Returns the MQTT message info, so callers can await several publishes together."""
+        return self._get_connection().publish(self._state_topic, payload, qos, retain, wait_for_publish=wait_for_publish)
@@ -7,7 +7,7 @@ from jmqtt import QualityOfService as QoS
 
 from jhomeassistant.entities.commandable_entity import CommandableEntity
 from jhomeassistant.entities.stateful_entity import StatefulEntity
-from jhomeassistant.helper.abbreviations import Abbreviation
+from jhomeassistant.helper.abbreviations import Abbreviation, KeyTable
 from jhomeassistant.types.component import Component
 from jhomeassistant.types.device_classes import UpdateDeviceClass
 
@@ -39,18 +39,17 @@ class UpdateEntity(StatefulEntity, CommandableEntity):
         qos: QoS = QoS.AtMostOnce,
         retain: bool = False,
         wait_for_publish: bool = False,
-    ) -> None:
+    ):
         payload = json.dumps({
             "installed_version": installed_version,
             "latest_version": latest_version,
         }, separators=(",", ":"))
-        self._publish_state(payload, qos, retain, wait_for_publish)
+        return self._publish_state(payload, qos, retain, wait_for_publish)
 
-    @property
-    def internal_discovery_payload(self) -> dict:
-        payload = super().internal_discovery_payload
+    def internal_discovery_payload(self, keys: KeyTable) -> dict:
+        payload = super().internal_discovery_payload(keys)
         if self._device_class is not UpdateDeviceClass.NONE:
-            payload[Abbreviation.DEVICE_CLASS] = self._device_class.value
+            payload[keys[Abbreviation.DEVICE_CLASS]] = self._device_class.value
         if self._command_topic is not None:
-            payload[Abbreviation.PAYLOAD_INSTALL] = self._payload_install
+            payload[keys[Abbreviation.PAYLOAD_INSTALL]] = self._payload_install
         return payload
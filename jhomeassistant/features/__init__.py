@@ -1,3 +1,18 @@
-from .topic import TopicConfig
-from .availability.availability_item import AvailabilityItem
-from .availability.availability import Availability
+from typing import TYPE_CHECKING
+
+from jhomeassistant.lazy_import import lazy_exports
+
+if TYPE_CHECKING:
+    from .topic import TopicConfig
+    from .availability.availability_item import AvailabilityItem
+    from .availability.availability import Availability
+
+_EXPORTS = {
+    "TopicConfig": ".topic",
+    "AvailabilityItem": ".availability.availability_item",
+    "Availability": ".availability.availability",
+}
+
+__all__ = list(_EXPORTS)
+
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS, globals())
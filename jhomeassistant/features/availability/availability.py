@@ -8,13 +8,14 @@ from .availability_source import AvailabilitySource
 from jhomeassistant.setup_logging import get_logger
 from jhomeassistant.types import AvailabilityMode
 from jhomeassistant.helper import validate_topic
-from jhomeassistant.helper.abbreviations import Abbreviation
+from jhomeassistant.helper.abbreviations import Abbreviation, KeyTable
+from jhomeassistant.helper.dirty_tracking import DirtyTracked
 
 
 logger = get_logger("Availability")
 
 
-class Availability:
+class Availability(DirtyTracked):
     def __init__(self, source: AvailabilitySource, topic: str | None = None):
         self._source = source
         self._mode = None
@@ -36,6 +37,7 @@ class Availability:
         if item is None:
             raise KeyError(f"Topic {topic!r} not found.")
         self._items.remove(item)
+        self.mark_dirty()
         logger.info(f"Removed topic={topic!r}")
         return self
 
@@ -52,6 +54,7 @@ class Availability:
             raise ValueError(f"Availability for topic {topic!r} already exists. Modify it via Availability[{topic!r}] or Availability[index].")
 
         self._items.append(AvailabilityItem(topic, payload_available, payload_not_available, value_template, self._source))
+        self.mark_dirty()
         logger.info(f"Added availability topic={topic!r}.")
         return self
 
@@ -67,20 +70,30 @@ class Availability:
     def active(self):
         return len(self._items) > 0
 
+    @property
+    def internal_revision(self) -> int:
+        return max(self._revision, max((i.internal_revision for i in self._items), default=0))
+
     def internal_merge(self, other: Availability):
-        """Merge availability from other into self. Idempotent: clears previously merged items before re-merging."""
-        self._items = [i for i in self._items if i._source == self._source]
+        """Merge availability from other into self. Idempotent: clears previously merged items before re-merging.
+        Only marks self dirty if the merged item list actually changed."""
+        items = [i for i in self._items if i._source == self._source]
+        own_topics = {i.topic for i in items}
         for item in other:
-            if self[item.topic] is None:
-                self._items.append(item)
+            if item.topic not in own_topics:
+                items.append(item)
+                own_topics.add(item.topic)
             else:
                 logger.warning(f"Duplicate availability topic during merge. Preferring own availability item: {self[item.topic]!r}")
 
-    def internal_to_dict(self):
+        if len(items) != len(self._items) or any(a is not b for a, b in zip(items, self._items)):
+            self._items = items
+
+    def internal_to_dict(self, keys: KeyTable):
         result = {}
         if len(self._items) > 0:
-            result[Abbreviation.AVAILABILITY] = [i.internal_to_dict() for i in self._items]
+            result[keys[Abbreviation.AVAILABILITY]] = [i.internal_to_dict(keys) for i in self._items]
         if self._mode is not None:
-            result[Abbreviation.AVAILABILITY_MODE] = self._mode
+            result[keys[Abbreviation.AVAILABILITY_MODE]] = self._mode
 
         return result
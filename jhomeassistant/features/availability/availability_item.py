@@ -3,7 +3,7 @@ from __future__ import annotations
 from jhomeassistant.features import TopicConfig
 from jhomeassistant.features.availability.availability_source import AvailabilitySource
 from jhomeassistant.helper import validate_non_empty_string
-from jhomeassistant.helper.abbreviations import Abbreviation
+from jhomeassistant.helper.abbreviations import Abbreviation, KeyTable
 
 
 class AvailabilityItem(TopicConfig):
@@ -22,15 +22,15 @@ class AvailabilityItem(TopicConfig):
     def value_template(self, value_template: str | None):
         self._value_template = validate_non_empty_string(value_template, "Origin 'value_template'", True)
 
-    def internal_to_dict(self):
-        result = {Abbreviation.TOPIC: self.topic}
+    def internal_to_dict(self, keys: KeyTable):
+        result = {keys[Abbreviation.TOPIC]: self.topic}
 
         if self.payload_available != TopicConfig.DEFAULT_AVAILABLE:
-            result[Abbreviation.PAYLOAD_AVAILABLE] = self.payload_available
+            result[keys[Abbreviation.PAYLOAD_AVAILABLE]] = self.payload_available
         if self.payload_not_available != TopicConfig.DEFAULT_NOT_AVAILABLE:
-            result[Abbreviation.PAYLOAD_NOT_AVAILABLE] = self.payload_not_available
+            result[keys[Abbreviation.PAYLOAD_NOT_AVAILABLE]] = self.payload_not_available
         if self.value_template is not None:
-            result[Abbreviation.VALUE_TEMPLATE] = self.value_template
+            result[keys[Abbreviation.VALUE_TEMPLATE]] = self.value_template
 
         return result
 
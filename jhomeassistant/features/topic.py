@@ -1,9 +1,10 @@
 from __future__ import annotations
 
 from jhomeassistant.helper import validate_topic, validate_non_empty_string
+from jhomeassistant.helper.dirty_tracking import DirtyTracked
 
 
-class TopicConfig:
+class TopicConfig(DirtyTracked):
     DEFAULT_AVAILABLE = "online"
     DEFAULT_NOT_AVAILABLE = "offline"
 
@@ -1,3 +1,24 @@
-from .validation import (validate_discovery_prefix, validate_entity_specification, validate_icon,
-                         validate_topic, validate_non_empty_string)
-from .naming import get_default_entity_id
+from typing import TYPE_CHECKING
+
+from jhomeassistant.lazy_import import lazy_exports
+
+if TYPE_CHECKING:
+    from .validation import (validate_discovery_prefix, validate_entity_specification, validate_icon,
+                             validate_topic, validate_non_empty_string)
+    from .naming import get_default_entity_id
+    from .device_facts_provider import device_facts, DeviceFactsProvider
+
+_EXPORTS = {
+    "validate_discovery_prefix": ".validation",
+    "validate_entity_specification": ".validation",
+    "validate_icon": ".validation",
+    "validate_topic": ".validation",
+    "validate_non_empty_string": ".validation",
+    "get_default_entity_id": ".naming",
+    "device_facts": ".device_facts_provider",
+    "DeviceFactsProvider": ".device_facts_provider",
+}
+
+__all__ = list(_EXPORTS)
+
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS, globals())
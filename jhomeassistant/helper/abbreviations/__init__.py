@@ -2,3 +2,4 @@ from .abbriviation_resolver import resolve_abbreviation
 from .device_abbreviation_enum import DeviceAbbreviation
 from .origin_abbreviation_enum import OriginAbbreviation
 from .abbreviation_enum import Abbreviation
+from .key_tables import KeyTable, FULL_KEYS, ABBREVIATED_KEYS, get_key_table
@@ -1,9 +1,7 @@
 from enum import Enum
 
+from .key_tables import get_key_table
+
 
 def resolve_abbreviation(value: Enum, abbreviated):
-    first, second = value.value
-    if abbreviated:
-        return second
-    else:
-        return first
+    return get_key_table(abbreviated)[value]
@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+from enum import Enum
+from typing import Dict
+
+from .abbreviation_enum import Abbreviation
+from .device_abbreviation_enum import DeviceAbbreviation
+from .origin_abbreviation_enum import OriginAbbreviation
+
+KeyTable = Dict[Enum, str]
+
+
+def _build_key_table(abbreviated: bool) -> KeyTable:
+    index = 1 if abbreviated else 0
+    return {
+        member: member.value[index]
+        for enum in (Abbreviation, DeviceAbbreviation, OriginAbbreviation)
+        for member in enum
+    }
+
+
+FULL_KEYS: KeyTable = _build_key_table(False)
+ABBREVIATED_KEYS: KeyTable = _build_key_table(True)
+
+
+def get_key_table(abbreviated: bool) -> KeyTable:
+    """Return the precompiled Enum -> discovery key table for the requested mode."""
+    return ABBREVIATED_KEYS if abbreviated else FULL_KEYS
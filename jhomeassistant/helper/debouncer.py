@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Callable, Dict, Generic, Hashable, List, TypeVar
+
+from jhomeassistant.setup_logging import get_logger
+
+logger = get_logger("Debouncer")
+
+K = TypeVar("K", bound=Hashable)
+
+
+class Debouncer(Generic[K]):
+    """
+    Collapse repeated requests for the same key into one callback invocation.
+
+    A key becomes due ``window`` seconds after its first pending request; later requests for the
+    same key within that window are absorbed. A background thread hands due keys to ``callback``
+    in request order. ``flush()`` hands over everything pending right away and returns once the
+    callback (and any background invocation already in progress) has finished.
+    """
+
+    def __init__(self, window: float, callback: Callable[[List[K]], None], name: str = "jhomeassistant-debouncer"):
+        if window <= 0:
+            raise ValueError("Debounce window must be positive.")
+        self.window = window
+        self._callback = callback
+        self._name = name
+
+        # Due times grow with insertion order, so the first entry is always the next one due.
+        self._pending: Dict[K, float] = {}
+        self._condition = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._closed = False
+
+    def request(self, key: K) -> None:
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("Debouncer is closed.")
+            self._pending.setdefault(key, time.monotonic() + self.window)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=self._name, daemon=True)
+                self._thread.start()
+            self._condition.notify()
+
+    def discard(self, key: K) -> None:
+        with self._condition:
+            self._pending.pop(key, None)
+
+    @property
+    def pending(self) -> int:
+        with self._condition:
+            return len(self._pending)
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while True:
+                    if self._closed:
+                        return
+                    if not self._pending:
+                        self._condition.wait()
+                        continue
+                    delay = next(iter(self._pending.values())) - time.monotonic()
+                    if delay <= 0:
+                        break
+                    self._condition.wait(delay)
+            self._flush(due_only=True)
+
+    def _flush(self, due_only: bool) -> None:
+        with self._flush_lock:
+            with self._condition:
+                if due_only:
+                    now = time.monotonic()
+                    keys = []
+                    for key, due in self._pending.items():
+                        if due > now:
+                            break
+                        keys.append(key)
+                    for key in keys:
+                        del self._pending[key]
+                else:
+                    keys = list(self._pending)
+                    self._pending.clear()
+            if not keys:
+                return
+            try:
+                self._callback(keys)
+            except Exception as exc:
+                logger.exception(f"Debounced flush of {len(keys)} keys failed: {exc}")
+
+    def flush(self) -> None:
+        """Hand every pending key to the callback now and wait until it returned."""
+        self._flush(due_only=False)
+
+    def close(self) -> None:
+        """Stop the background thread and flush pending keys.
+
+        The debouncer is closed before the final flush, so a request() racing with close() raises
+        (and its caller publishes directly) instead of landing after the last flush."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self.flush()
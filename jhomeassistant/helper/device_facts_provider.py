@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from typing import Callable, List, Optional, Tuple
+
+from jmqtt import client_identity
+
+from jhomeassistant.setup_logging import get_logger
+
+logger = get_logger("DeviceFacts")
+
+DeviceFacts = Tuple[Optional[str], List[Tuple[str, str]]]
+
+
+class DeviceFactsProvider:
+    """
+    Process-wide memo of the host's device facts (serial number and network connections).
+
+    Facts are collected on the first ``get()`` only, so devices with an explicit identifier never
+    trigger a hardware scan. With ``use_cache_file`` the facts are also kept on disk and reused by
+    later processes until they are older than ``ttl`` seconds. ``refresh()`` collects them again.
+    """
+
+    def __init__(self, collector: Callable[[], DeviceFacts] | None = None):
+        # None looks the collector up on every collection, so it can still be replaced on client_identity.facts.
+        self._collector = collector
+        self._facts: DeviceFacts | None = None
+        self._lock = threading.Lock()
+        self._cache_path: str | os.PathLike | None = None
+        self._cache_ttl: float | None = None
+
+    def use_cache_file(self, path: str | os.PathLike | None, ttl: float | None = 24 * 3600) -> DeviceFactsProvider:
+        """Persist collected facts in path (JSON) and reuse them for ttl seconds (None: no expiry).
+        Pass None as path to disable."""
+        if ttl is not None and ttl <= 0:
+            raise ValueError("Device facts cache ttl must be positive.")
+        with self._lock:
+            self._cache_path = path
+            self._cache_ttl = ttl
+        return self
+
+    def get(self) -> DeviceFacts:
+        """Return the memoized facts, reading the cache file or collecting them on first use."""
+        with self._lock:
+            if self._facts is None:
+                self._facts = self._read_cache_file()
+            if self._facts is None:
+                self._facts = self._collect()
+            return self._copy(self._facts)
+
+    def refresh(self) -> DeviceFacts:
+        """Collect the facts again (e.g. after a network interface changed) and update the cache file.
+        Devices created before keep the identifiers they were created with."""
+        with self._lock:
+            self._facts = self._collect()
+            return self._copy(self._facts)
+
+    def invalidate(self) -> None:
+        """Forget the memoized facts; the next get() reads the cache file or collects again."""
+        with self._lock:
+            self._facts = None
+
+    @staticmethod
+    def _copy(facts: DeviceFacts) -> DeviceFacts:
+        serial_number, connections = facts
+        return serial_number, list(connections)
+
+    def _collect(self) -> DeviceFacts:
+        collector = self._collector or client_identity.facts.collect_device_facts
+        serial_number, connections = collector()
+        facts = serial_number, [tuple(connection) for connection in connections]
+        self._write_cache_file(facts)
+        return facts
+
+    def _read_cache_file(self) -> DeviceFacts | None:
+        if self._cache_path is None:
+            return None
+        try:
+            with open(self._cache_path, "r", encoding="utf-8") as file:
+                cached = json.load(file)
+            age = time.time() - cached["collected_at"]
+            if self._cache_ttl is not None and not 0 <= age <= self._cache_ttl:
+                logger.debug(f"Device facts cache {self._cache_path} expired ({age:.0f}s old)")
+                return None
+            return cached["serial_number"], [tuple(connection) for connection in cached["connections"]]
+        except FileNotFoundError:
+            return None
+        except Exception as exc:
+            logger.warning(f"Ignoring unreadable device facts cache {self._cache_path}: {exc}")
+            return None
+
+    def _write_cache_file(self, facts: DeviceFacts) -> None:
+        if self._cache_path is None:
+            return
+        serial_number, connections = facts
+        temporary = f"{os.fspath(self._cache_path)}.tmp"
+        try:
+            with open(temporary, "w", encoding="utf-8") as file:
+                json.dump({"collected_at": time.time(), "serial_number": serial_number,
+                           "connections": [list(connection) for connection in connections]}, file)
+            os.replace(temporary, self._cache_path)
+        except Exception as exc:
+            logger.warning(f"Failed to write device facts cache {self._cache_path}: {exc}")
+
+
+device_facts = DeviceFactsProvider()
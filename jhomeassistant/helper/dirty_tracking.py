@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+import itertools
+
+_revisions = itertools.count(1)
+
+
+def next_revision() -> int:
+    """Return a new process-wide, strictly increasing revision number."""
+    return next(_revisions)
+
+
+class DirtyTracked:
+    """
+    Mixin that stamps a fresh revision on every attribute assignment.
+
+    Consumers remember the revision they serialized and treat the object as dirty once
+    ``internal_revision`` moves past it. Because revisions are process-wide, the highest
+    revision of an object tree tells whether anything inside it changed, even when parts
+    of the tree (e.g. merged availability items) are shared between several owners.
+    Attributes listed in ``_UNTRACKED_ATTRIBUTES`` hold runtime state that never reaches
+    a discovery payload and do not mark the object dirty.
+    """
+    _UNTRACKED_ATTRIBUTES: frozenset = frozenset()
+    _revision: int = 0
+
+    def __setattr__(self, name, value):
+        object.__setattr__(self, name, value)
+        if name not in self._UNTRACKED_ATTRIBUTES:
+            object.__setattr__(self, "_revision", next(_revisions))
+
+    def mark_dirty(self) -> None:
+        """Mark the object as changed, e.g. after mutating one of its lists in place."""
+        object.__setattr__(self, "_revision", next(_revisions))
+
+    @property
+    def internal_revision(self) -> int:
+        return self._revision
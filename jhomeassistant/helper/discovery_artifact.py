@@ -0,0 +1,287 @@
+from __future__ import annotations
+
+import bisect
+import hashlib
+import io
+import mmap
+import os
+import pickle
+import struct
+from enum import Enum
+from typing import Callable, Dict, Iterable, List, Tuple
+
+from jhomeassistant.helper.discovery_cache import payload_digest
+from jhomeassistant.helper.dirty_tracking import DirtyTracked
+from jhomeassistant.setup_logging import get_logger
+
+logger = get_logger("DiscoveryArtifact")
+
+# Bump whenever the file or payload layout changes so older artifacts and fingerprints stop matching.
+ARTIFACT_VERSION = 2
+
+_MAGIC = b"JHADISC\x00"
+_SEGMENT = struct.Struct("<8sIIIQ")   # magic, version, record count, message count, segment size
+_RECORD = struct.Struct("<16sII")     # input fingerprint, first message of the segment, message count
+_MESSAGE = struct.Struct("<16sQIQI")  # content hash, topic offset/length, payload offset/length
+
+# Message count of a record that removes its fingerprint from the artifact.
+_REMOVED = 0xFFFFFFFF
+
+Messages = List[Tuple[str, bytes]]
+
+
+# Pickle protocol of the digest streams; part of the fingerprint, like ARTIFACT_VERSION.
+_PICKLE_PROTOCOL = 4
+
+# Attribute holding the (internal_revision, digest) an object's discovery inputs were last hashed at.
+_DIGEST_ATTRIBUTE = "_discovery_digest"
+
+
+def _discovery_input(*values):
+    """Stand-in callable of reduced objects in the digest streams; the streams are never unpickled."""
+    raise TypeError("Discovery fingerprints cannot be unpickled.")
+
+
+def _reducer_for(kind: type) -> Callable:
+    """Reduce function for objects of kind in a digest stream, see _DigestPickler."""
+    if issubclass(kind, DirtyTracked):
+        skipped = kind._UNTRACKED_ATTRIBUTES | {"_revision", _DIGEST_ATTRIBUTE}
+
+        def reduce_tracked(obj):
+            state = dict(vars(obj))
+            for name in skipped:
+                state.pop(name, None)
+            return _discovery_input, (kind.__qualname__, state)
+        return reduce_tracked
+    if issubclass(kind, Enum):
+        return lambda obj: (_discovery_input, (kind.__qualname__, obj._name_))
+    if "__call__" in dir(kind):
+        # Callbacks, classes, ...: code is no discovery input.
+        return lambda obj: (_discovery_input, ())
+    if kind.__repr__ is object.__repr__:
+        # The default repr contains the object's address; use its data instead.
+        return lambda obj: (_discovery_input, (kind.__qualname__, dict(vars(obj))))
+    return lambda obj: (_discovery_input, (kind.__qualname__, repr(obj)))
+
+
+_reducers: Dict[type, Callable] = {}
+
+
+class _DigestPickler(pickle.Pickler):
+    """
+    Serializes the discovery inputs of an object tree: DirtyTracked objects are reduced to their
+    tracked attributes, enums to their class and member name, callables to a placeholder and other
+    objects to their data or repr. The stream holds no addresses, so the same tree built by another
+    process gives the same bytes, and the memo writes objects shared inside the tree (merged
+    availability items, enum members) only once.
+    """
+
+    def __init__(self, file):
+        super().__init__(file, _PICKLE_PROTOCOL)
+
+    def reducer_override(self, obj):
+        if obj is _discovery_input:
+            return NotImplemented
+        reduce = _reducers.get(type(obj))
+        if reduce is None:
+            reduce = _reducers[type(obj)] = _reducer_for(type(obj))
+        return reduce(obj)
+
+
+def _digest(obj: DirtyTracked) -> bytes:
+    """Hash of the discovery inputs of obj and the objects nested in it, kept on obj until its
+    internal_revision moves (which covers the nested objects, as the discovery cache relies on too)."""
+    revision = obj.internal_revision
+    cached = vars(obj).get(_DIGEST_ATTRIBUTE)
+    if cached is not None and cached[0] == revision:
+        return cached[1]
+    stream = io.BytesIO()
+    _DigestPickler(stream).dump(obj)
+    digest = hashlib.blake2b(stream.getbuffer(), digest_size=16).digest()
+    # Bypasses DirtyTracked.__setattr__: caching a digest is no change.
+    object.__setattr__(obj, _DIGEST_ATTRIBUTE, (revision, digest))
+    return digest
+
+
+def discovery_fingerprint(context, *objects: DirtyTracked) -> bytes | None:
+    """Hash of everything a discovery payload is built from: the connection-level context and the
+    discovery inputs of the given objects (runtime-only attributes and callables are skipped).
+    Each object's digest is kept until its revision moves, so an origin shared by many devices, or a
+    device that did not change, is serialized only once.
+    Returns None if the inputs cannot be serialized, e.g. because they contain a cycle."""
+    try:
+        stream = pickle.dumps((ARTIFACT_VERSION, context, [_digest(obj) for obj in objects]), _PICKLE_PROTOCOL)
+    except Exception as exc:
+        logger.debug(f"Cannot fingerprint discovery inputs: {exc}")
+        return None
+    return hashlib.blake2b(stream, digest_size=16).digest()
+
+
+def _segment(records: Iterable[Tuple[bytes, Messages]], removed: Iterable[bytes], offset: int) -> bytes:
+    """One artifact segment starting at file offset offset: the given records plus removal records."""
+    records, removed = list(records), list(removed)
+    message_count = sum(len(messages) for _fingerprint, messages in records)
+    blob_offset = (offset + _SEGMENT.size + (len(records) + len(removed)) * _RECORD.size
+                   + message_count * _MESSAGE.size)
+
+    record_table, message_table, blob = bytearray(), bytearray(), bytearray()
+    first = 0
+    for fingerprint, messages in records:
+        record_table += _RECORD.pack(fingerprint, first, len(messages))
+        first += len(messages)
+        for topic, payload in messages:
+            topic_bytes = topic.encode("utf-8")
+            topic_offset = blob_offset + len(blob)
+            blob += topic_bytes
+            payload_offset = blob_offset + len(blob)
+            blob += payload
+            message_table += _MESSAGE.pack(payload_digest(payload), topic_offset, len(topic_bytes),
+                                           payload_offset, len(payload))
+    for fingerprint in removed:
+        record_table += _RECORD.pack(fingerprint, 0, _REMOVED)
+
+    size = blob_offset + len(blob) - offset
+    return b"".join((_SEGMENT.pack(_MAGIC, ARTIFACT_VERSION, len(records) + len(removed), message_count, size),
+                     record_table, message_table, blob))
+
+
+class DiscoveryArtifact:
+    """
+    Memory-mapped file of compiled discovery payloads keyed by input fingerprint.
+
+    The file is a sequence of segments. Each has a header, a record table (fingerprint -> range of
+    messages, or removal of the fingerprint), a message table (content hash, topic and payload location)
+    and a blob with the topics and payloads. Saving appends a segment with the changed records only;
+    later segments override earlier ones, and a torn last segment is ignored. Loading only parses the
+    record tables; payloads are sliced out of the mapping on demand and checked against their content hash.
+    """
+
+    def __init__(self, path: str | os.PathLike):
+        self._path = path
+        self._file = open(path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            # Global index of the first message and offset of the message table, per segment.
+            self._first_messages: List[int] = []
+            self._message_tables: List[int] = []
+            self._message_count = 0
+            self._records: Dict[bytes, Tuple[int, int]] = {}
+            self._stored_records = 0
+            self._end = 0
+            while self._end < len(self._map):
+                if not self._read_segment(self._end):
+                    if self._end == 0:
+                        raise ValueError(f"{path} is not a discovery artifact of version {ARTIFACT_VERSION}.")
+                    logger.debug(f"Ignoring a torn segment at the end of discovery artifact {path}")
+                    break
+        except Exception:
+            self.close()
+            raise
+
+    def _read_segment(self, offset: int) -> bool:
+        """Index the segment at offset. False if it is not a complete segment of this version."""
+        if offset + _SEGMENT.size > len(self._map):
+            return False
+        magic, version, record_count, message_count, size = _SEGMENT.unpack_from(self._map, offset)
+        records_offset = offset + _SEGMENT.size
+        messages_offset = records_offset + record_count * _RECORD.size
+        if (magic != _MAGIC or version != ARTIFACT_VERSION or offset + size > len(self._map)
+                or messages_offset + message_count * _MESSAGE.size > offset + size):
+            return False
+        records = list(_RECORD.iter_unpack(self._map[records_offset:messages_offset]))
+        if any(count != _REMOVED and first + count > message_count for _fingerprint, first, count in records):
+            return False
+
+        for fingerprint, first, count in records:
+            if count == _REMOVED:
+                self._records.pop(fingerprint, None)
+            else:
+                self._records[fingerprint] = (self._message_count + first, count)
+        self._first_messages.append(self._message_count)
+        self._message_tables.append(messages_offset)
+        self._message_count += message_count
+        self._stored_records += record_count
+        self._end = offset + size
+        return True
+
+    def __len__(self):
+        return len(self._records)
+
+    def __contains__(self, fingerprint: bytes) -> bool:
+        return fingerprint in self._records
+
+    def __iter__(self):
+        return iter(self._records)
+
+    @property
+    def stored_records(self) -> int:
+        """Records in the file, including overridden and removal records."""
+        return self._stored_records
+
+    def get(self, fingerprint: bytes) -> Messages | None:
+        """Messages compiled from the given input fingerprint, or None if unknown or corrupt."""
+        location = self._records.get(fingerprint)
+        if location is None:
+            return None
+        first, count = location
+        messages = []
+        for index in range(first, first + count):
+            message = self.message(index)
+            if message is None:
+                return None
+            messages.append(message)
+        return messages
+
+    def _message_entry(self, index: int) -> tuple:
+        segment = bisect.bisect_right(self._first_messages, index) - 1
+        return _MESSAGE.unpack_from(self._map, self._message_tables[segment]
+                                    + (index - self._first_messages[segment]) * _MESSAGE.size)
+
+    def message(self, index: int) -> Tuple[str, bytes] | None:
+        """The message with the given index (see indexed_topics()), or None if it is corrupt."""
+        content_hash, topic_offset, topic_length, payload_offset, payload_length = self._message_entry(index)
+        payload = self._map[payload_offset:payload_offset + payload_length]
+        if len(payload) != payload_length or payload_digest(payload) != content_hash:
+            return None
+        try:
+            return self._map[topic_offset:topic_offset + topic_length].decode("utf-8"), payload
+        except UnicodeDecodeError:
+            return None
+
+    def indexed_topics(self) -> List[Tuple[int, str]]:
+        """(message index, topic) of every message of the current records, in the order they were written."""
+        topics = []
+        for first, count in sorted(self._records.values()):
+            for index in range(first, first + count):
+                _content_hash, topic_offset, topic_length, _payload_offset, _payload_length = self._message_entry(index)
+                topics.append((index, self._map[topic_offset:topic_offset + topic_length].decode("utf-8", "replace")))
+        return topics
+
+    def topics(self) -> List[str]:
+        """Every topic stored in the artifact, i.e. the discovery topics the writing process had published."""
+        return [topic for _index, topic in self.indexed_topics()]
+
+    def append(self, records: Iterable[Tuple[bytes, Messages]], removed: Iterable[bytes] = ()) -> None:
+        """Close the artifact and append a segment that adds records and removes the removed fingerprints.
+        A torn segment left by an interrupted append is overwritten."""
+        end = self._end
+        self.close()
+        with open(self._path, "r+b") as file:
+            file.truncate(end)
+            file.seek(end)
+            file.write(_segment(records, removed, end))
+
+    def close(self) -> None:
+        mapping = getattr(self, "_map", None)
+        if mapping is not None:
+            mapping.close()
+            self._map = None
+        self._file.close()
+
+    @staticmethod
+    def write(path: str | os.PathLike, records: Iterable[Tuple[bytes, Messages]]) -> None:
+        """Write an artifact with a single segment atomically (temporary file + rename)."""
+        temporary = f"{os.fspath(path)}.tmp"
+        with open(temporary, "wb") as file:
+            file.write(_segment(records, (), 0))
+        os.replace(temporary, path)
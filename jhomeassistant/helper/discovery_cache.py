@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import hashlib
+import threading
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Dict, Hashable, Iterable, List, Tuple
+
+if TYPE_CHECKING:
+    from jhomeassistant.homeassistant_device import HomeAssistantDevice
+
+
+def payload_digest(payload) -> bytes:
+    """Content hash used to compare discovery payloads, e.g. against retained broker state."""
+    if isinstance(payload, str):
+        payload = payload.encode("utf-8")
+    return hashlib.blake2b(payload, digest_size=16).digest()
+
+
+@dataclass
+class DiscoveryCacheEntry:
+    """One retained discovery message. An empty payload deletes a topic the device no longer uses."""
+    topic: str
+    payload: bytes
+    published_payload: bytes | None = None
+    # The last publish was not acknowledged in time; the broker may or may not hold published_payload.
+    unconfirmed: bool = False
+
+    @property
+    def changed(self) -> bool:
+        """True if the payload differs from the one last handed to the broker, or that publish was not acknowledged."""
+        return self.unconfirmed or self.payload != self.published_payload
+
+    @property
+    def is_delete(self) -> bool:
+        return not self.payload
+
+
+@dataclass
+class DeviceDiscoveryRecord:
+    revision: int
+    context: Hashable
+    entries: List[DiscoveryCacheEntry]
+    # Input fingerprint (see discovery_artifact), computed when a discovery artifact is read or written.
+    fingerprint: bytes | None = None
+
+    def pending(self, force: bool = False) -> List[DiscoveryCacheEntry]:
+        """Entries that need publishing; with force also the unchanged ones (but no finished deletes)."""
+        return [entry for entry in self.entries if entry.changed or (force and not entry.is_delete)]
+
+    def add_deletes(self, topics: Iterable[str]) -> None:
+        """Add delete entries for topics a previous process published but this record no longer produces.
+        Like the deletes of store(), they go before the messages."""
+        known = {entry.topic for entry in self.entries}
+        self.entries[:0] = [DiscoveryCacheEntry(topic, b"") for topic in dict.fromkeys(topics) if topic not in known]
+
+    @property
+    def messages(self) -> List[Tuple[str, bytes]]:
+        return [(entry.topic, entry.payload) for entry in self.entries if not entry.is_delete]
+
+    @property
+    def published_topics(self) -> List[str]:
+        """Topics that currently hold (or are about to lose) a retained payload of this device."""
+        return [entry.topic for entry in self.entries if entry.published_payload]
+
+
+class DiscoveryCache:
+    """
+    Serialized discovery messages per device.
+
+    A record stays valid while the device tree's revision (see ``DirtyTracked``) and the
+    connection-level context (discovery prefix, abbreviation mode, ...) are unchanged. Each entry
+    remembers the last payload that was published to its topic, so republishing can skip unchanged
+    messages, and topics that were published before but are no longer produced get a delete entry.
+    """
+
+    def __init__(self):
+        self._records: Dict[HomeAssistantDevice, DeviceDiscoveryRecord] = {}
+        self._lock = threading.Lock()
+
+    def get(self, device: HomeAssistantDevice, revision: int, context: Hashable) -> DeviceDiscoveryRecord | None:
+        """Return the cached record, or None if the device is dirty or was never serialized."""
+        with self._lock:
+            record = self._records.get(device)
+        if record is None or record.revision < revision or record.context != context:
+            return None
+        return record
+
+    def peek(self, device: HomeAssistantDevice) -> DeviceDiscoveryRecord | None:
+        """Return the last stored record, even if the device changed since."""
+        with self._lock:
+            return self._records.get(device)
+
+    def store(self, device: HomeAssistantDevice, revision: int, context: Hashable,
+              messages: List[Tuple[str, bytes]], fingerprint: bytes | None = None) -> DeviceDiscoveryRecord:
+        with self._lock:
+            previous = self._records.get(device)
+            published = {} if previous is None else {e.topic: (e.published_payload, e.unconfirmed) for e in previous.entries}
+            entries = [DiscoveryCacheEntry(topic, payload, *published.pop(topic, (None, False))) for topic, payload in messages]
+            # Deletes go first, so Home Assistant drops what a topic no longer holds before it sees the new messages.
+            entries[:0] = [DiscoveryCacheEntry(topic, b"", payload, unconfirmed)
+                           for topic, (payload, unconfirmed) in published.items() if payload or unconfirmed]
+            record = DeviceDiscoveryRecord(revision, context, entries, fingerprint)
+            self._records[device] = record
+        return record
+
+    def mark_published(self, entry: DiscoveryCacheEntry) -> None:
+        entry.published_payload = entry.payload
+        entry.unconfirmed = False
+
+    def mark_unacknowledged(self, entry: DiscoveryCacheEntry) -> None:
+        """The publish of entry timed out or failed: keep it pending so the next republish sends it again."""
+        entry.unconfirmed = True
+
+    def discard(self, device: HomeAssistantDevice) -> DeviceDiscoveryRecord | None:
+        with self._lock:
+            return self._records.pop(device, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._records.clear()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._records)
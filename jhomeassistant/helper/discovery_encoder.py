@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import json
+import threading
+from json.encoder import encode_basestring_ascii
+from typing import TYPE_CHECKING, Dict, Iterable, List, Mapping, Tuple
+
+from jhomeassistant.helper.abbreviations import Abbreviation, KeyTable
+from jhomeassistant.helper.discovery_minimizer import DiscoveryMinimizer
+
+if TYPE_CHECKING:
+    from jhomeassistant.homeassistant_device import HomeAssistantDevice
+    from jhomeassistant.homeassistant_origin import HomeAssistantOrigin
+
+# Same encoder configuration json.dumps(..., separators=(",", ":")) uses, so fragments are byte-identical.
+# Discovery payloads are plain trees, so the circular reference check is skipped.
+_encode_value = json.JSONEncoder(separators=(",", ":"), check_circular=False).encode
+
+
+class DiscoveryEncoder:
+    """
+    Single-pass encoder for device discovery payloads.
+
+    Walks origin -> device -> entity and writes the payload straight into a reusable per-thread
+    buffer: the root and the components map are written key by key, while each component and
+    root value is encoded as one fragment. The device-level dict is never materialized and the
+    output is byte-identical to ``json.dumps(payload, separators=(",", ":")).encode()``.
+    """
+
+    def __init__(self, keys: KeyTable, minimizer: DiscoveryMinimizer | None = None):
+        self._keys = keys
+        self._minimizer = minimizer
+        self._components_key = keys[Abbreviation.COMPONENTS]
+        self._local = threading.local()
+
+    def _buffer(self) -> bytearray:
+        buffer = getattr(self._local, "buffer", None)
+        if buffer is None:
+            buffer = self._local.buffer = bytearray()
+        else:
+            del buffer[:]
+        return buffer
+
+    def _device_sections(self, origin: HomeAssistantOrigin, device: HomeAssistantDevice, discovery_prefix: str):
+        discovery_topic, sections = origin.internal_device_discovery_sections(device, discovery_prefix, self._keys)
+        if self._minimizer is not None:
+            sections = self._minimizer.minimize_sections(sections)
+        return discovery_topic, sections
+
+    def encode_device(self, origin: HomeAssistantOrigin, device: HomeAssistantDevice, discovery_prefix: str) -> Tuple[str, bytes]:
+        discovery_topic, sections = self._device_sections(origin, device, discovery_prefix)
+        return discovery_topic, self.encode_sections(sections)
+
+    def encode_device_parts(self, origin: HomeAssistantOrigin, device: HomeAssistantDevice, discovery_prefix: str,
+                            max_payload_size: int, layout: Mapping[str, int] | None = None) -> List[Tuple[str, bytes]]:
+        """Encode the device discovery, splitting the components across several device-discovery
+        objects when the payload would exceed max_payload_size bytes. Every part repeats the root
+        sections (device block, origin, availability, ...). A payload that fits is byte-identical
+        to encode_device; a single component larger than the budget gets a part of its own.
+
+        layout maps component unique_ids to the part they were last published in. Those components
+        stay in their part; new ones go to the last part with room, and components only move if their
+        part outgrew the budget. Parts that lose components come first, so Home Assistant has dropped a
+        moved component from its old part before it sees it in the new one."""
+        discovery_topic, sections = self._device_sections(origin, device, discovery_prefix)
+
+        head, tail = bytearray(b"{"), bytearray()
+        target, separator, components = head, "", ()
+        for key, value in sections.items():
+            if key == self._components_key:
+                head += f"{separator}{encode_basestring_ascii(key)}:{{".encode("ascii")
+                components = value.items() if isinstance(value, dict) else value
+                target = tail
+                tail += b"}"
+            else:
+                target += f"{separator}{encode_basestring_ascii(key)}:{_encode_value(value)}".encode("ascii")
+            separator = ","
+        tail += b"}"
+        overhead = len(head) + len(tail)
+
+        fragments = [(unique_id, f"{encode_basestring_ascii(unique_id)}:{_encode_value(component)}".encode("ascii"))
+                     for unique_id, component in components]
+        layout = layout or {}
+        assignment: Dict[str, int] = {}
+        sizes: Dict[int, int] = {}
+        unplaced = []
+        for unique_id, fragment in fragments:
+            part = layout.get(unique_id)
+            if part is None:
+                unplaced.append((unique_id, fragment))
+                continue
+            assignment[unique_id] = part
+            sizes[part] = sizes.get(part, overhead - 1) + 1 + len(fragment)
+
+        # Parts that outgrew the budget give up their last components (but keep at least one).
+        for unique_id, fragment in reversed(fragments):
+            part = assignment.get(unique_id)
+            if part is not None and sizes[part] > max_payload_size and sizes[part] - 1 - len(fragment) > overhead - 1:
+                del assignment[unique_id]
+                sizes[part] -= 1 + len(fragment)
+                unplaced.append((unique_id, fragment))
+        position = {unique_id: index for index, (unique_id, _fragment) in enumerate(fragments)}
+        unplaced.sort(key=lambda item: position[item[0]])
+
+        for unique_id, fragment in unplaced:
+            part = next((index for index in sorted(sizes, reverse=True)
+                         if sizes[index] + 1 + len(fragment) <= max_payload_size), None)
+            if part is None:
+                part = max(sizes, default=-1) + 1
+            assignment[unique_id] = part
+            sizes[part] = sizes.get(part, overhead - 1) + 1 + len(fragment)
+
+        parts: Dict[int, List[bytes]] = {}
+        for unique_id, fragment in fragments:
+            parts.setdefault(assignment[unique_id], []).append(fragment)
+        if not parts:
+            parts[0] = []
+        losing = {part for unique_id, part in layout.items() if assignment.get(unique_id) != part}
+
+        return [(discovery_topic if index == 0 else device.internal_discovery_topic(discovery_prefix, index),
+                 bytes(head) + b",".join(parts[index]) + bytes(tail))
+                for index in sorted(parts, key=lambda index: (index not in losing, index))]
+
+    def encode_components(self, origin: HomeAssistantOrigin, device: HomeAssistantDevice,
+                          discovery_prefix: str) -> List[Tuple[str, bytes]]:
+        """Encode one per-component discovery message per entity. The shared root sections are encoded
+        once and appended to every component; components with their own availability skip the shared one.
+        Each payload is byte-identical to ``json.dumps({**component, **root})``."""
+        root, components = origin.internal_component_discovery_sections(device, discovery_prefix, self._keys)
+        if self._minimizer is not None:
+            self._minimizer.drop_defaults(root)
+        availability_keys = (self._keys[Abbreviation.AVAILABILITY], self._keys[Abbreviation.AVAILABILITY_MODE])
+
+        shared = "".join(f",{encode_basestring_ascii(key)}:{_encode_value(value)}" for key, value in root.items())
+        shared_without_availability = "".join(f",{encode_basestring_ascii(key)}:{_encode_value(value)}"
+                                              for key, value in root.items() if key not in availability_keys)
+
+        messages = []
+        for topic, component in components:
+            if self._minimizer is not None:
+                self._minimizer.minimize_component(component)
+            own_availability = any(key in component for key in availability_keys)
+            suffix = shared_without_availability if own_availability else shared
+            messages.append((topic, f"{_encode_value(component)[:-1]}{suffix}}}".encode("ascii")))
+        return messages
+
+    def encode_sections(self, sections: dict) -> bytes:
+        """Encode a root payload whose components key maps to an iterable of (unique_id, payload) pairs."""
+        buffer = self._buffer()
+        buffer += b"{"
+        separator = ""
+        for key, value in sections.items():
+            if key == self._components_key:
+                buffer += f"{separator}{encode_basestring_ascii(key)}:".encode("ascii")
+                self._write_components(buffer, value)
+            else:
+                buffer += f"{separator}{encode_basestring_ascii(key)}:{_encode_value(value)}".encode("ascii")
+            separator = ","
+        buffer += b"}"
+        return bytes(buffer)
+
+    @staticmethod
+    def _write_components(buffer: bytearray, components: Iterable[Tuple[str, dict]]) -> None:
+        if isinstance(components, dict):
+            components = components.items()
+        buffer += b"{"
+        separator = ""
+        for unique_id, component in components:
+            buffer += f"{separator}{encode_basestring_ascii(unique_id)}:{_encode_value(component)}".encode("ascii")
+            separator = ","
+        buffer += b"}"
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+from collections import Counter
+from os.path import commonprefix
+from typing import Iterable, List, Tuple
+
+from jhomeassistant.helper.abbreviations import Abbreviation, KeyTable
+
+TOPIC_BASE = "~"
+
+# Values Home Assistant assumes when the key is missing, for every platform that accepts the key.
+_HA_DEFAULTS = {
+    Abbreviation.AVAILABILITY_MODE: "latest",
+    Abbreviation.ENABLED_BY_DEFAULT: True,
+    Abbreviation.ENCODING: "utf-8",
+    Abbreviation.FORCE_UPDATE: False,
+    Abbreviation.PAYLOAD_AVAILABLE: "online",
+    Abbreviation.PAYLOAD_NOT_AVAILABLE: "offline",
+    Abbreviation.PAYLOAD_INSTALL: "install",
+    Abbreviation.PAYLOAD_OFF: "OFF",
+    Abbreviation.PAYLOAD_ON: "ON",
+    Abbreviation.PAYLOAD_PRESS: "PRESS",
+    Abbreviation.RETAIN: False,
+}
+
+# Defaults that only hold when the payload has a state topic: without one, Home Assistant treats the
+# entity as optimistic, so an explicit ``optimistic: false`` must be kept.
+_STATE_TOPIC_DEFAULTS = {
+    Abbreviation.OPTIMISTIC: False,
+}
+
+
+class DiscoveryMinimizer:
+    """
+    Shrinks discovery payloads without changing what Home Assistant ends up with.
+
+    - Availability shared by the components moves to the device root, where Home Assistant
+      applies it to every component that has none of its own.
+    - The longest common prefix of a component's own topics becomes its ``~`` base topic. Home
+      Assistant does not pass ``~`` from the device root down to the components, so the base topic
+      is never factored at the root.
+    - Keys whose value equals Home Assistant's default are dropped.
+    """
+
+    def __init__(self, keys: KeyTable):
+        self._defaults = {keys[abbreviation]: value for abbreviation, value in _HA_DEFAULTS.items()}
+        self._defaults["qos"] = 0
+        self._state_topic_defaults = {keys[abbreviation]: value for abbreviation, value in _STATE_TOPIC_DEFAULTS.items()}
+        self._state_topic_key = keys[Abbreviation.STATE_TOPIC]
+        self._topic_keys = frozenset(keys[a] for a in Abbreviation if a.value[0].endswith("topic"))
+        self._availability_key = keys[Abbreviation.AVAILABILITY]
+        self._availability_mode_key = keys[Abbreviation.AVAILABILITY_MODE]
+        self._item_topic_key = keys[Abbreviation.TOPIC]
+        self._components_key = keys[Abbreviation.COMPONENTS]
+
+    def minimize_sections(self, sections: dict) -> dict:
+        """Minimize a device discovery root in place; the components are materialized into a dict."""
+        components = sections[self._components_key]
+        components = dict(components.items() if isinstance(components, dict) else components)
+        sections[self._components_key] = components
+
+        self._hoist_availability(sections, list(components.values()))
+        self.drop_defaults(sections)
+        for component in components.values():
+            self.minimize_component(component)
+        return sections
+
+    def minimize_component(self, component: dict) -> dict:
+        """Minimize a single per-component payload in place (defaults and ``~`` over its own topics)."""
+        self.drop_defaults(component)
+        self._factor_topic_base(component, [component])
+        return component
+
+    def drop_defaults(self, payload: dict) -> None:
+        defaults = self._defaults.items()
+        if self._state_topic_key in payload:
+            defaults = [*defaults, *self._state_topic_defaults.items()]
+        for key, default in defaults:
+            if key in payload and payload[key] == default and type(payload[key]) is type(default):
+                del payload[key]
+        for item in payload.get(self._availability_key, ()):
+            self.drop_defaults(item)
+
+    def _availability_of(self, payload: dict) -> Tuple[str, str] | None:
+        if self._availability_key not in payload and self._availability_mode_key not in payload:
+            return None
+        # Encoded to compare the nested item lists by value and to use them as Counter keys.
+        return repr(payload.get(self._availability_key)), repr(payload.get(self._availability_mode_key))
+
+    def _pop_availability(self, payload: dict) -> None:
+        payload.pop(self._availability_key, None)
+        payload.pop(self._availability_mode_key, None)
+
+    def _hoist_availability(self, root: dict, components: List[dict]) -> None:
+        shared = self._availability_of(root)
+        if shared is None:
+            # Without root availability every component must define its own before one can be hoisted.
+            signatures = [self._availability_of(component) for component in components]
+            if not components or None in signatures:
+                return
+            shared, _count = Counter(signatures).most_common(1)[0]
+            donor = components[signatures.index(shared)]
+            root.update({key: donor[key] for key in (self._availability_key, self._availability_mode_key) if key in donor})
+
+        for component in components:
+            if self._availability_of(component) == shared:
+                self._pop_availability(component)
+
+    def _topic_references(self, payloads: Iterable[dict]) -> List[Tuple[dict, str]]:
+        references = []
+        for payload in payloads:
+            references += [(payload, key) for key in self._topic_keys.intersection(payload) if isinstance(payload[key], str)]
+            for item in payload.get(self._availability_key, ()):
+                if isinstance(item.get(self._item_topic_key), str):
+                    references.append((item, self._item_topic_key))
+        return references
+
+    def _factor_topic_base(self, target: dict, payloads: List[dict]) -> None:
+        if TOPIC_BASE in target:
+            return
+        references = self._topic_references(payloads)
+        values = [holder[key] for holder, key in references]
+        if len(values) < 2 or any(value.startswith(TOPIC_BASE) or value.endswith(TOPIC_BASE) for value in values):
+            return
+
+        base = commonprefix(values)
+        base = base[:max(base.rfind("/"), 0)]
+        # Each topic saves len(base) - 1 characters; the "~" entry itself costs len(base) + 7.
+        if not base or len(values) * (len(base) - 1) <= len(base) + 7:
+            return
+
+        for holder, key in references:
+            holder[key] = TOPIC_BASE + holder[key][len(base):]
+        target[TOPIC_BASE] = base
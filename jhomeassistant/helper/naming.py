@@ -1,12 +1,27 @@
 from __future__ import annotations
 
-from slugify import slugify
+import re
+from functools import lru_cache
 
 from jhomeassistant.types import Component
 
+_MAX_ENTITY_ID_LENGTH = 255
+_MIN_DEVICE_SLUG_LENGTH = 20
 
+# The subset of python-slugify's pipeline that applies to ASCII input: digit-grouping commas are
+# dropped, every other run of disallowed characters (quotes and dashes included) becomes one separator.
+_NUMBER_GROUPING = re.compile(r"(?<=\d),(?=\d)")
+_DISALLOWED = re.compile(r"[^a-z0-9_]+")
+
+
+@lru_cache(maxsize=4096)
 def ha_slugify(name: str) -> str:
     """ASCII transliterate, lowercase, allow [a-z0-9_], collapse/trim underscores."""
+    # "&" may start an HTML entity that decodes to a non-ASCII character, so leave it to python-slugify.
+    if name.isascii() and "&" not in name:
+        return _DISALLOWED.sub("_", _NUMBER_GROUPING.sub("", name.lower())).strip("_")
+
+    from slugify import slugify  # Imported on first use: loading the transliteration tables is slow.
     s = slugify(name, lowercase=True, separator="_", regex_pattern=r"[^a-z0-9_]+")
     s = s.strip("_")
     return s
@@ -14,6 +29,8 @@ def ha_slugify(name: str) -> str:
 
 def get_default_entity_id(component: Component, device_name, entity_name):
     device_name, entity_name = ha_slugify(device_name), ha_slugify(entity_name)
-    while len(f"{component.value}.{device_name}_{entity_name}") > 255 and len(device_name) > 20:
-        device_name = device_name[:-1]
-    return f"{component.value}.{device_name}_{entity_name}"[:255]
+    # Shorten the device part (down to 20 characters) so that "<component>.<device>_<entity>" fits.
+    if len(device_name) > _MIN_DEVICE_SLUG_LENGTH:
+        budget = _MAX_ENTITY_ID_LENGTH - len(component.value) - len(entity_name) - 2
+        device_name = device_name[:max(_MIN_DEVICE_SLUG_LENGTH, budget)]
+    return f"{component.value}.{device_name}_{entity_name}"[:_MAX_ENTITY_ID_LENGTH]
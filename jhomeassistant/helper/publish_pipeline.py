@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field, replace
+from typing import Callable, Deque, Generic, Iterable, List, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+@dataclass
+class PublishResult(Generic[T]):
+    acknowledged: List[T] = field(default_factory=list)
+    timed_out: List[T] = field(default_factory=list)
+
+    @property
+    def complete(self) -> bool:
+        return not self.timed_out
+
+
+def _remaining(deadline: float | None) -> float | None:
+    return None if deadline is None else max(0.0, deadline - time.monotonic())
+
+
+def _await_publish(info, deadline: float | None) -> bool:
+    info.wait_for_publish(_remaining(deadline))
+    return info.is_published()
+
+
+def wait_for_all(messages: Iterable[Tuple[T, object]], timeout: float | None) -> PublishResult[T]:
+    """Wait for several publishes with one overall deadline instead of one timeout per message.
+
+    ``messages`` are (item, message info) pairs; the result lists the items whose publish was
+    acknowledged and those still pending once ``timeout`` seconds (None = no limit) have passed."""
+    deadline = None if timeout is None else time.monotonic() + timeout
+    result: PublishResult[T] = PublishResult()
+    for item, info in messages:
+        if _await_publish(info, deadline):
+            result.acknowledged.append(item)
+        else:
+            result.timed_out.append(item)
+    return result
+
+
+@dataclass(frozen=True)
+class DiscoveryProgress:
+    total: int
+    sent: int = 0
+    acknowledged: int = 0
+    timed_out: int = 0
+
+    @property
+    def in_flight(self) -> int:
+        return self.sent - self.acknowledged - self.timed_out
+
+    @property
+    def done(self) -> bool:
+        return self.acknowledged + self.timed_out >= self.total
+
+
+@dataclass
+class _Batch:
+    """State of one PublishPipeline.run, so concurrent runs do not share counters."""
+    progress: DiscoveryProgress
+    deadline: float | None
+    result: PublishResult = field(default_factory=PublishResult)
+    in_flight: Deque = field(default_factory=deque)
+
+
+class PublishPipeline:
+    """
+    Flow-controlled publishing of a batch of QoS>0 messages.
+
+    At most ``max_in_flight`` messages of a batch are left unacknowledged at any time: once the window
+    is full the oldest message is awaited before the next one is sent. ``publish_timeout`` is one
+    deadline for the whole batch; once it has passed, outstanding messages count as timed out. An
+    optional ``max_rate`` paces sends to that many messages per second, shared by all batches running
+    at the same time. ``on_progress`` is called with the batch's ``DiscoveryProgress`` snapshot after
+    every send and every acknowledgement or timeout.
+    """
+
+    def __init__(self, max_in_flight: int | None = None, max_rate: float | None = None,
+                 on_progress: Callable[[DiscoveryProgress], None] | None = None):
+        if max_in_flight is not None and max_in_flight < 1:
+            raise ValueError("max_in_flight must be at least 1.")
+        if max_rate is not None and max_rate <= 0:
+            raise ValueError("max_rate must be positive.")
+        self.max_in_flight = max_in_flight
+        self.max_rate = max_rate
+        self.on_progress = on_progress
+
+        # Snapshot of the batch that changed last; every batch keeps its own counters in _Batch.
+        self._progress = DiscoveryProgress(0)
+        self._lock = threading.Lock()
+        self._next_send_at = 0.0
+
+    @property
+    def progress(self) -> DiscoveryProgress:
+        """Snapshot of the most recently updated (or currently running) batch."""
+        with self._lock:
+            return self._progress
+
+    def _update(self, batch: _Batch, **counters) -> None:
+        with self._lock:
+            batch.progress = progress = replace(
+                batch.progress, **{k: getattr(batch.progress, k) + v for k, v in counters.items()})
+            self._progress = progress
+        if self.on_progress is not None:
+            self.on_progress(progress)
+
+    def _pace(self) -> None:
+        if self.max_rate is None:
+            return
+        # Reserve the next send slot under the lock, then sleep outside of it.
+        with self._lock:
+            now = time.monotonic()
+            send_at = max(self._next_send_at, now)
+            self._next_send_at = send_at + 1.0 / self.max_rate
+        if send_at > now:
+            time.sleep(send_at - now)
+
+    def _await_oldest(self, batch: _Batch) -> None:
+        item, info = batch.in_flight.popleft()
+        if _await_publish(info, batch.deadline):
+            batch.result.acknowledged.append(item)
+            self._update(batch, acknowledged=1)
+        else:
+            batch.result.timed_out.append(item)
+            self._update(batch, timed_out=1)
+
+    def run(self, publish: Callable[[T], object], items: Iterable[T], publish_timeout: float | None = None) -> PublishResult[T]:
+        """Publish every item through ``publish`` (which returns the message info) and wait for completion.
+        ``publish`` may return None to skip an item; skipped items are in neither result list.
+        Runs may overlap (e.g. a debounced flush during startup discovery); each has its own window."""
+        items = list(items)
+        batch = _Batch(DiscoveryProgress(len(items)),
+                       None if publish_timeout is None else time.monotonic() + publish_timeout)
+        with self._lock:
+            self._progress = batch.progress
+
+        for item in items:
+            if self.max_in_flight is not None and len(batch.in_flight) >= self.max_in_flight:
+                self._await_oldest(batch)
+            self._pace()
+            info = publish(item)
+            if info is None:
+                self._update(batch, total=-1)
+                continue
+            batch.in_flight.append((item, info))
+            self._update(batch, sent=1)
+
+        while batch.in_flight:
+            self._await_oldest(batch)
+        return batch.result
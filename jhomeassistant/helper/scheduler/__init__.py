@@ -1,2 +1,4 @@
+from .adaptive_interval import AdaptiveInterval
+from .schedule_stats import ScheduleStats
 from .schedule import Schedule
 from .scheduler import Scheduler
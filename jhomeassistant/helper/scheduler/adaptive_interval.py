@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from numbers import Real
+from typing import Any, Mapping
+
+
+@dataclass(frozen=True)
+class AdaptiveInterval:
+    """
+    Volatility-driven interval of a Schedule, based on the values its function returns.
+
+    When a returned value moved by more than ``threshold`` since the previous run (or changed at all,
+    for non-numeric values), the interval drops to ``minimum`` so fast changes are followed closely.
+    While values stay put it grows by ``growth`` per run up to ``maximum``. A mapping (e.g. from a
+    schedule group collector) counts as changed if any of its values changed. Runs returning None
+    leave the interval as it is.
+    """
+    minimum: float
+    maximum: float
+    threshold: float = 0.0
+    growth: float = 1.5
+
+    def __post_init__(self):
+        if not 0 < self.minimum <= self.maximum:
+            raise ValueError("AdaptiveInterval needs 0 < minimum <= maximum.")
+        if self.threshold < 0:
+            raise ValueError("AdaptiveInterval threshold must not be negative.")
+        if self.growth <= 1:
+            raise ValueError("AdaptiveInterval growth must be greater than 1.")
+
+    def clamp(self, interval: float) -> float:
+        return min(self.maximum, max(self.minimum, interval))
+
+    def changed(self, previous: Any, current: Any) -> bool:
+        if isinstance(current, Mapping):
+            if not isinstance(previous, Mapping):
+                return True
+            return any(key not in previous or self.changed(previous[key], value) for key, value in current.items())
+        if _is_number(current) and _is_number(previous):
+            return abs(current - previous) > self.threshold
+        return current != previous
+
+    def next_interval(self, interval: float, changed: bool) -> float:
+        if changed:
+            return self.minimum
+        return min(self.maximum, interval * self.growth)
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, Real) and not isinstance(value, bool)
@@ -1,10 +1,264 @@
+from __future__ import annotations
+
+import itertools
+import math
+import random
+import threading
+import time
+from concurrent.futures import Executor, Future
+from typing import Callable, Dict, List, Tuple
+
+from jhomeassistant.helper.scheduler.adaptive_interval import AdaptiveInterval
+from jhomeassistant.helper.scheduler.schedule_stats import ScheduleStats, _ScheduleCounters
+from jhomeassistant.setup_logging import get_logger
+from jhomeassistant.types.catch_up_policy import CatchUpPolicy
+from jhomeassistant.types.overrun_policy import OverrunPolicy
+
+logger = get_logger("Schedule")
+
+
 class Schedule:
-    def __init__(self, interval_sec: float, func):
+    def __init__(self, interval_sec: float, func, max_concurrency: int = 1,
+                 overrun: OverrunPolicy = OverrunPolicy.SKIP, timeout: float | None = None,
+                 phase: float | None = None, jitter: float = 0.0, catch_up: CatchUpPolicy = CatchUpPolicy.SKIP,
+                 adaptive: AdaptiveInterval | None = None):
+        """
+        Runs are fixed-rate: deadlines lie on a grid of ``interval_sec`` from the first run, so the time
+        a run takes does not shift later ones.
+
+        Args:
+            interval_sec: Seconds between two runs.
+            func: Called with the MQTT connection.
+            max_concurrency: Runs of this schedule that may be outstanding at once on an executor.
+            overrun: What happens to a due run while max_concurrency runs are outstanding.
+            timeout: Budget in seconds for one run on an executor. A run over budget is cancelled if it
+                has not started yet, otherwise reported and no longer counted against max_concurrency.
+            phase: Seconds after the scheduler start of the first run. None lets the scheduler spread
+                schedules with the same interval over its first seconds (see Scheduler's spread_window).
+            jitter: Each run starts up to this many seconds (uniformly random) after its grid tick.
+            catch_up: What happens to ticks missed while the schedule was late.
+            adaptive: Adapt the interval (starting at interval_sec) to how much the values returned by
+                func change between runs.
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1.")
+        if timeout is not None and timeout <= 0:
+            raise ValueError("Schedule timeout must be positive.")
+        if phase is not None and phase < 0:
+            raise ValueError("Schedule phase must not be negative.")
+        if jitter < 0:
+            raise ValueError("Schedule jitter must not be negative.")
         self._func = func
-        self._next_timestamp = 0.0
-        self._interval = max(0.0, interval_sec)
+        self.adaptive = adaptive
+        self._interval = max(0.0, interval_sec) if adaptive is None else adaptive.clamp(interval_sec)
+        self._last_value = None
+        self._has_value = False
+        self._on_reschedule: Callable[[Schedule], None] | None = None
+        self._watcher = None
+        self.phase = phase
+        self.jitter = jitter
+        self.catch_up = CatchUpPolicy(catch_up)
+        # Grid tick of the next run (None: not anchored yet, run immediately) and its jitter offset.
+        self._next_tick: float | None = None
+        self._offset = 0.0
+        self.max_concurrency = max_concurrency
+        self.overrun = OverrunPolicy(overrun)
+        self.timeout = timeout
+
+        self._lock = threading.Lock()
+        self._tokens = itertools.count()
+        # Outstanding executor runs: token -> (submitted at, future).
+        self._active: Dict[int, Tuple[float, Future | None]] = {}
+        self._queued = None
+        self.skipped_runs = 0
+        # Runs currently inside func: token -> [thread ident, started at, reported by the watchdog].
+        self._executing: Dict[int, list] = {}
+        self._counters = _ScheduleCounters()
+
+    @property
+    def interval(self) -> float:
+        """Current interval in seconds; varies between the AdaptiveInterval bounds for adaptive schedules."""
+        return self._interval
+
+    @property
+    def next_run(self) -> float:
+        """Monotonic timestamp from which the next run() executes the function (0.0: immediately)."""
+        if self._next_tick is None:
+            return 0.0
+        return self._next_tick + self._offset
+
+    @property
+    def name(self) -> str:
+        return getattr(self._func, "__qualname__", None) or repr(self._func)
+
+    @property
+    def budget(self) -> float | None:
+        """Run time after which the watchdog reports a run: the timeout, otherwise the interval."""
+        if self.timeout is not None:
+            return self.timeout
+        return self._interval or None
+
+    def stats(self) -> ScheduleStats:
+        with self._lock:
+            return self._counters.snapshot(self.name, self._interval, self.skipped_runs)
+
+    def internal_overdue_runs(self, now: float) -> List[Tuple[int, float]]:
+        """(thread ident, elapsed) of runs over budget that were not reported yet; marks them reported."""
+        budget = self.budget
+        if budget is None:
+            return []
+        overdue = []
+        with self._lock:
+            for run in self._executing.values():
+                if not run[2] and now - run[1] >= budget:
+                    run[2] = True
+                    overdue.append((run[0], now - run[1]))
+        return overdue
+
+    def internal_report_deadline(self, token: int) -> float | None:
+        """When the run with token goes over budget; None if it finished, was reported or has no budget."""
+        budget = self.budget
+        with self._lock:
+            run = self._executing.get(token)
+            if budget is None or run is None or run[2]:
+                return None
+            return run[1] + budget
+
+    def internal_anchor(self, first_tick: float, on_reschedule: Callable[[Schedule], None] | None = None,
+                        watcher=None) -> None:
+        """Place the first run at first_tick; later runs follow every interval after it.
+        on_reschedule is called when an adaptive interval change moves the next run; watcher (the
+        scheduler) is told when a run enters and leaves func."""
+        self._on_reschedule = on_reschedule
+        self._watcher = watcher
+        self._next_tick = first_tick
+        self._offset = random.uniform(0.0, self.jitter) if self.jitter else 0.0
+
+    def _advance(self, now: float) -> None:
+        if self._next_tick is None:
+            self._next_tick = now
+        self._next_tick += self._interval
+        if self._next_tick <= now and self.catch_up == CatchUpPolicy.SKIP and self._interval > 0:
+            # Jump to the first grid tick after now, dropping the missed ones.
+            self._next_tick += (math.floor((now - self._next_tick) / self._interval) + 1) * self._interval
+        self._offset = random.uniform(0.0, self.jitter) if self.jitter else 0.0
+
+    @property
+    def running(self) -> int:
+        """Number of outstanding runs on an executor."""
+        with self._lock:
+            return len(self._active)
 
     def run(self, now: float, connection):
-        if now >= self._next_timestamp:
-            self._func(connection)
-            self._next_timestamp = now + self._interval
+        deadline = self.next_run
+        if now >= deadline:
+            self._advance(now)
+            self._call(deadline or now, connection)
+
+    def _call(self, deadline: float, connection) -> None:
+        token = next(self._tokens)
+        started = time.monotonic()
+        with self._lock:
+            self._executing[token] = [threading.get_ident(), started, False]
+        watcher = self._watcher
+        if watcher is not None:
+            watcher.internal_run_started(self, token, started)
+        failed = True
+        try:
+            result = self._func(connection)
+            failed = False
+            if self.adaptive is not None and result is not None:
+                self._adapt(result, started)
+        finally:
+            duration = time.monotonic() - started
+            with self._lock:
+                del self._executing[token]
+                self._counters.record(started - deadline, duration, failed,
+                                      overrun=0 < self._interval < duration, finished_at=time.time())
+            if watcher is not None:
+                watcher.internal_run_finished(self, token)
+
+    def _adapt(self, value, started: float) -> None:
+        with self._lock:
+            previous, self._last_value = self._last_value, value
+            had_value, self._has_value = self._has_value, True
+            if not had_value:
+                return
+            interval = self.adaptive.next_interval(self._interval, self.adaptive.changed(previous, value))
+            if interval == self._interval:
+                return
+            logger.debug(f"Interval of {self.name} adapted from {self._interval:g}s to {interval:g}s")
+            self._interval = interval
+            # Re-base the grid on this run, so a shorter interval takes effect right away.
+            self._next_tick = started + interval
+            on_reschedule = self._on_reschedule
+        if on_reschedule is not None:
+            on_reschedule(self)
+
+    def internal_dispatch(self, now: float, connection, executor: Executor) -> None:
+        """Like run(), but hand the function to the executor and apply concurrency limit and overrun policy."""
+        deadline = self.next_run
+        if now < deadline:
+            return
+        self._advance(now)
+        deadline = deadline or now
+
+        with self._lock:
+            self._expire_runs(now)
+            if len(self._active) >= self.max_concurrency:
+                if self.overrun == OverrunPolicy.QUEUE_ONE and self._queued is None:
+                    self._queued = (deadline, connection, executor)
+                else:
+                    self.skipped_runs += 1
+                    logger.debug(f"Skipped run of {self._func!r}: {len(self._active)} runs still outstanding")
+                return
+            token = next(self._tokens)
+            self._active[token] = (now, None)
+        self._submit(token, now, deadline, connection, executor)
+
+    def _submit(self, token: int, submitted_at: float, deadline: float, connection, executor: Executor) -> None:
+        try:
+            future = executor.submit(self._execute, token, deadline, connection)
+        except Exception:
+            with self._lock:
+                self._active.pop(token, None)
+            raise
+        with self._lock:
+            if token in self._active:
+                self._active[token] = (submitted_at, future)
+
+    def _expire_runs(self, now: float) -> None:
+        if self.timeout is None:
+            return
+        for token, (submitted_at, future) in list(self._active.items()):
+            if now - submitted_at <= self.timeout:
+                continue
+            del self._active[token]
+            if future is not None and future.cancel():
+                logger.warning(f"Cancelled run of {self._func!r}: no worker within its {self.timeout}s budget")
+            else:
+                logger.warning(f"Run of {self._func!r} exceeded its {self.timeout}s budget and is no longer awaited")
+
+    def _execute(self, token: int, deadline: float, connection) -> None:
+        try:
+            if self.overrun == OverrunPolicy.CANCEL_LATE and time.monotonic() - deadline > self._interval:
+                with self._lock:
+                    self.skipped_runs += 1
+                logger.debug(f"Dropped late run of {self._func!r}")
+                return
+            self._call(deadline, connection)
+        except Exception as exc:
+            logger.exception(f"Scheduled run of {self._func!r} failed: {exc}")
+        finally:
+            with self._lock:
+                self._active.pop(token, None)
+                queued, self._queued = self._queued, None
+                if queued is not None:
+                    queued_token, submitted_at = next(self._tokens), time.monotonic()
+                    self._active[queued_token] = (submitted_at, None)
+            if queued is not None:
+                queued_deadline, queued_connection, executor = queued
+                try:
+                    self._submit(queued_token, submitted_at, queued_deadline, queued_connection, executor)
+                except Exception as exc:
+                    logger.debug(f"Could not start queued run of {self._func!r}: {exc}")
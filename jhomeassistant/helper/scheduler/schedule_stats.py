@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import bisect
+from dataclasses import dataclass
+from typing import Tuple
+
+# Upper bounds in seconds of the execution time histogram; the last bucket is unbounded.
+DURATION_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, float("inf"))
+
+
+@dataclass(frozen=True)
+class ScheduleStats:
+    """Snapshot of one schedule's counters. Durations and lateness are in seconds."""
+    name: str
+    interval: float
+    runs: int
+    failures: int
+    overruns: int
+    skipped: int
+    last_success: float | None
+    duration_histogram: Tuple[Tuple[float, int], ...]
+    duration_total: float
+    duration_max: float
+    lateness_total: float
+    lateness_max: float
+
+    @property
+    def duration_mean(self) -> float:
+        return self.duration_total / self.runs if self.runs else 0.0
+
+    @property
+    def lateness_mean(self) -> float:
+        return self.lateness_total / self.runs if self.runs else 0.0
+
+
+class _ScheduleCounters:
+    """Mutable counters behind ScheduleStats; the owning Schedule serializes access."""
+
+    def __init__(self):
+        self.runs = 0
+        self.failures = 0
+        self.overruns = 0
+        self.last_success: float | None = None
+        self.buckets = [0] * len(DURATION_BUCKETS)
+        self.duration_total = 0.0
+        self.duration_max = 0.0
+        self.lateness_total = 0.0
+        self.lateness_max = 0.0
+
+    def record(self, lateness: float, duration: float, failed: bool, overrun: bool, finished_at: float) -> None:
+        lateness = max(0.0, lateness)
+        self.runs += 1
+        self.buckets[bisect.bisect_left(DURATION_BUCKETS, duration)] += 1
+        self.duration_total += duration
+        self.duration_max = max(self.duration_max, duration)
+        self.lateness_total += lateness
+        self.lateness_max = max(self.lateness_max, lateness)
+        if failed:
+            self.failures += 1
+        else:
+            self.last_success = finished_at
+        if overrun:
+            self.overruns += 1
+
+    def snapshot(self, name: str, interval: float, skipped: int) -> ScheduleStats:
+        return ScheduleStats(name, interval, self.runs, self.failures, self.overruns, skipped, self.last_success,
+                             tuple(zip(DURATION_BUCKETS, self.buckets)), self.duration_total, self.duration_max,
+                             self.lateness_total, self.lateness_max)
@@ -1,43 +1,339 @@
 from __future__ import annotations
 
+import heapq
+import itertools
+import sys
 import time
 import threading
-from typing import Callable
+import traceback
+from collections import deque
+from collections.abc import MutableSequence
+from concurrent.futures import Executor
+from typing import Callable, Dict, Iterable, List
 
 from jhomeassistant.helper.scheduler import Schedule
+from jhomeassistant.setup_logging import get_logger
+
+logger = get_logger("Scheduler")
+
+# Lower bound between two runs of one task when run_forever is given a tick_resolution of 0.
+_MIN_PERIOD = 0.001
+
+# Default upper bound in seconds for the phase spread of tasks without an explicit phase.
+SPREAD_WINDOW = 5.0
+
+
+def _spread(index: int) -> float:
+    """Van der Corput sequence (0, 1/2, 1/4, 3/4, 1/8, ...): the n-th phase fraction, evenly filling [0, 1)
+    however many schedules join later."""
+    fraction, denominator = 0.0, 1
+    while index:
+        denominator *= 2
+        index, bit = divmod(index, 2)
+        fraction += bit / denominator
+    return fraction
+
+
+class _TaskList(MutableSequence):
+    """
+    Live list view of a scheduler's tasks, compatible with the plain ``tasks`` list of earlier versions.
+
+    Reads see the current tasks; appending, removing or assigning tasks goes through add_tasks /
+    remove_tasks, so the running loop picks the change up. Insert positions are ignored, since the
+    order of tasks carries no meaning.
+    """
+
+    def __init__(self, scheduler: Scheduler):
+        self._scheduler = scheduler
+
+    def __len__(self) -> int:
+        return len(self._scheduler.internal_tasks())
+
+    def __iter__(self):
+        return iter(self._scheduler.internal_tasks())
+
+    def __getitem__(self, index):
+        return self._scheduler.internal_tasks()[index]
+
+    def __setitem__(self, index, value) -> None:
+        old = self[index]
+        self._scheduler.remove_tasks(*(old if isinstance(index, slice) else [old]))
+        self._scheduler.add_tasks(*(value if isinstance(index, slice) else [value]))
+
+    def __delitem__(self, index) -> None:
+        old = self[index]
+        self._scheduler.remove_tasks(*(old if isinstance(index, slice) else [old]))
+
+    def insert(self, index: int, value: Schedule) -> None:
+        self._scheduler.add_tasks(value)
+
+    def extend(self, values: Iterable[Schedule]) -> None:
+        self._scheduler.add_tasks(*values)
+
+    def clear(self) -> None:
+        self._scheduler.remove_tasks(*self._scheduler.internal_tasks())
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (_TaskList, list)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return repr(self._scheduler.internal_tasks())
 
 
 class Scheduler:
-    def __init__(self, *tasks: Schedule):
-        self.tasks = list(tasks)
-        self._tasks_lock = threading.Lock()
+    """
+    Runs schedules at their deadlines on the monotonic clock.
+
+    Pending runs live in a heap keyed by deadline, so the loop sleeps until the earliest deadline
+    (or until ``add_tasks`` / ``remove_tasks`` / ``wake`` interrupt it) and only touches due tasks;
+    without tasks it sleeps until woken.
+    Removed tasks are tombstoned in the heap and skipped; the heap is compacted once it holds more
+    tombstones than live tasks.
+
+    A task added without an explicit phase starts within ``spread_window`` seconds (at most its
+    interval): tasks sharing an interval take the next van der Corput fraction of that window, so their
+    runs interleave instead of firing together, while even hourly tasks run promptly after a restart.
+    A spread_window of 0 starts them right away.
+
+    While run_forever is active, a watchdog thread logs the current stack of runs that exceed their
+    schedule's budget (timeout, otherwise interval), once per run. It keeps a heap of the budget
+    expiries of the runs in flight and sleeps until the earliest one, so it stays idle while no run is
+    in progress; ``watchdog=False`` disables it.
+
+    Without an executor, due schedules run one after another on the loop thread. With an executor
+    (e.g. a ``ThreadPoolExecutor``) they are submitted to it, honouring each schedule's concurrency
+    limit, overrun policy and timeout.
+    """
+
+    def __init__(self, *tasks: Schedule, executor: Executor | None = None, watchdog: bool = True,
+                 spread_window: float = SPREAD_WINDOW):
+        if spread_window < 0:
+            raise ValueError("spread_window must not be negative.")
+        self.executor = executor
+        self.watchdog = watchdog
+        self.spread_window = spread_window
+        # Heap entries are [deadline, sequence, task]; task None marks a removed entry.
+        self._heap: List[list] = []
+        self._entries: Dict[int, list] = {}
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        # interval -> schedules spread over it so far
+        self._phase_slots: Dict[float, int] = {}
+        # Watchdog heap entries are [budget expiry, sequence, task, token]; task None marks a finished run.
+        self._watch_heap: List[list] = []
+        self._watched: Dict[tuple, list] = {}
+        self._watch_condition = threading.Condition()
+        # Marker of the active run_forever call, None while not running; a watchdog thread exits once it changes.
+        self._watching: object | None = None
+        self.add_tasks(*tasks)
+
+    @property
+    def tasks(self) -> MutableSequence:
+        """The scheduled tasks, as a live list view (see _TaskList)."""
+        return _TaskList(self)
+
+    @tasks.setter
+    def tasks(self, tasks: Iterable[Schedule]) -> None:
+        tasks = list(tasks)
+        keep = {id(task) for task in tasks}
+        self.remove_tasks(*(task for task in self.internal_tasks() if id(task) not in keep))
+        self.add_tasks(*tasks)
+
+    def internal_tasks(self) -> List[Schedule]:
+        """Snapshot of the scheduled tasks in the order they were added."""
+        with self._condition:
+            return [entry[2] for entry in self._entries.values()]
+
+    def _push(self, task: Schedule, deadline: float) -> None:
+        entry = [deadline, next(self._sequence), task]
+        self._entries[id(task)] = entry
+        heapq.heappush(self._heap, entry)
 
     def add_tasks(self, *tasks: Schedule) -> None:
         if not tasks:
             return
-        with self._tasks_lock:
-            self.tasks.extend(tasks)
+        with self._condition:
+            now = time.monotonic()
+            for task in tasks:
+                if id(task) not in self._entries:
+                    self._anchor(task, now)
+                    self._push(task, task.next_run)
+            self._condition.notify_all()
+
+    def _anchor(self, task: Schedule, now: float) -> None:
+        interval = task.interval
+        if task.phase is not None:
+            first_tick = now + task.phase
+        elif interval <= 0:
+            first_tick = now
+        else:
+            index = self._phase_slots.get(interval, 0)
+            self._phase_slots[interval] = index + 1
+            first_tick = now + _spread(index) * min(interval, self.spread_window)
+        task.internal_anchor(first_tick, self._reschedule, self)
+
+    def _reschedule(self, task: Schedule) -> None:
+        """Move a task whose next run changed outside of the loop (adaptive interval) to its new deadline."""
+        with self._condition:
+            entry = self._entries.get(id(task))
+            if entry is None or entry[0] == task.next_run:
+                return
+            entry[2] = None
+            self._push(task, task.next_run)
+            self._condition.notify_all()
 
     def remove_tasks(self, *tasks: Schedule) -> None:
         if not tasks:
             return
-        targets = {id(t) for t in tasks}
-        with self._tasks_lock:
-            self.tasks = [t for t in self.tasks if id(t) not in targets]
+        with self._condition:
+            for task in tasks:
+                entry = self._entries.pop(id(task), None)
+                if entry is not None:
+                    entry[2] = None
+            if len(self._heap) > 2 * len(self._entries):
+                self._heap = [entry for entry in self._heap if entry[2] is not None]
+                heapq.heapify(self._heap)
+            self._condition.notify_all()
+
+    def wake(self) -> None:
+        """Interrupt the current sleep, e.g. to stop run_forever right after setting its stop_event."""
+        with self._condition:
+            self._condition.notify_all()
+
+    def _rearm(self, entry: list, now: float, min_period: float) -> None:
+        task = entry[2]
+        # Tasks removed while they ran are not re-armed.
+        if task is not None and self._entries.get(id(task)) is entry:
+            self._push(task, max(task.next_run, now + min_period))
+
+    def _pop_due(self, now: float) -> deque:
+        due = deque()
+        while self._heap and (self._heap[0][2] is None or self._heap[0][0] <= now):
+            entry = heapq.heappop(self._heap)
+            if entry[2] is not None:
+                due.append(entry)
+        return due
+
+    def internal_run_started(self, task: Schedule, token: int, started: float) -> None:
+        """Called by a schedule when a run enters its function: arm the watchdog for its budget."""
+        budget = task.budget
+        if budget is None:
+            return
+        with self._watch_condition:
+            if self._watching is not None:
+                self._arm(task, token, started + budget)
+
+    def internal_run_finished(self, task: Schedule, token: int) -> None:
+        """Called by a schedule when a run leaves its function: disarm the watchdog for it."""
+        with self._watch_condition:
+            entry = self._watched.pop((id(task), token), None)
+            if entry is None:
+                return
+            entry[2] = None
+            while self._watch_heap and self._watch_heap[0][2] is None:
+                heapq.heappop(self._watch_heap)
+            if len(self._watch_heap) > 2 * len(self._watched):
+                self._watch_heap = [entry for entry in self._watch_heap if entry[2] is not None]
+                heapq.heapify(self._watch_heap)
+
+    def _arm(self, task: Schedule, token: int, expiry: float) -> None:
+        entry = [expiry, next(self._sequence), task, token]
+        self._watched[(id(task), token)] = entry
+        heapq.heappush(self._watch_heap, entry)
+        if self._watch_heap[0] is entry:
+            self._watch_condition.notify_all()
+
+    def _report_overdue_runs(self, task: Schedule, now: float) -> None:
+        for thread_id, elapsed in task.internal_overdue_runs(now):
+            frame = sys._current_frames().get(thread_id)
+            stack = "".join(traceback.format_stack(frame)) if frame is not None else "  <stack not available>\n"
+            logger.warning(f"Schedule {task.name} has been running for {elapsed:.3f}s, "
+                           f"over its {task.budget}s budget. Current stack:\n{stack}")
+
+    def _watch(self, watching: object) -> None:
+        while True:
+            with self._watch_condition:
+                while self._watching is watching:
+                    # Sleep until the earliest budget expiry, or until a run starts while none is in flight.
+                    delay = self._watch_heap[0][0] - time.monotonic() if self._watch_heap else None
+                    if delay is not None and delay <= 0:
+                        break
+                    self._watch_condition.wait(delay)
+                if self._watching is not watching:
+                    return
+                _expiry, _sequence, task, token = heapq.heappop(self._watch_heap)
+                if task is None:
+                    continue
+                del self._watched[(id(task), token)]
+            try:
+                # The budget may have changed since the run started (adaptive interval).
+                expiry = task.internal_report_deadline(token)
+                now = time.monotonic()
+                if expiry is not None and expiry > now:
+                    with self._watch_condition:
+                        if self._watching is watching:
+                            self._arm(task, token, expiry)
+                else:
+                    self._report_overdue_runs(task, now)
+            except Exception as exc:
+                logger.debug(f"Scheduler watchdog check failed: {exc}")
 
     def run_forever(self, tick_resolution: float, get_connection: Callable, stop_event: threading.Event | None = None):
-        sleep_interval = max(0.001, tick_resolution)
+        """Run due schedules until stop_event is set.
+
+        The loop sleeps until the earliest deadline; a helper thread blocked on stop_event wakes it once the
+        event is set. tick_resolution is the shortest time between two runs of one task, so schedules with
+        a shorter (or zero) interval run once per tick_resolution.
+        """
+        if self.watchdog:
+            watching = object()
+            with self._watch_condition:
+                self._watching = watching
+            threading.Thread(target=self._watch, args=(watching,), name="jhomeassistant-schedule-watchdog",
+                             daemon=True).start()
+        if stop_event is not None:
+            threading.Thread(target=self._wake_on, args=(stop_event,), name="jhomeassistant-schedule-stop",
+                             daemon=True).start()
+        try:
+            self._run_loop(get_connection, stop_event, max(tick_resolution, _MIN_PERIOD))
+        finally:
+            with self._watch_condition:
+                self._watching = None
+                self._watch_heap.clear()
+                self._watched.clear()
+                self._watch_condition.notify_all()
+
+    def _wake_on(self, stop_event: threading.Event) -> None:
+        stop_event.wait()
+        self.wake()
+
+    def _run_loop(self, get_connection: Callable, stop_event: threading.Event | None, min_period: float) -> None:
         while True:
-            if stop_event is not None and stop_event.is_set():
-                break
-
-            now = time.time()
-            with self._tasks_lock:
-                snapshot = list(self.tasks)
-            for t in snapshot:
-                t.run(now, get_connection())
-
-            if stop_event is None:
-                time.sleep(sleep_interval)
-            else:
-                stop_event.wait(sleep_interval)
+            with self._condition:
+                # Checked under the condition, so a wake() right after setting stop_event cannot be missed.
+                if stop_event is not None and stop_event.is_set():
+                    break
+                now = time.monotonic()
+                due = self._pop_due(now)
+                if not due:
+                    self._condition.wait(self._heap[0][0] - now if self._heap else None)
+                    continue
+
+            try:
+                connection = get_connection()
+                while due:
+                    task = due[0][2]
+                    if task is None:
+                        pass
+                    elif self.executor is None:
+                        task.run(now, connection)
+                    else:
+                        task.internal_dispatch(now, connection, self.executor)
+                    with self._condition:
+                        self._rearm(due.popleft(), now, min_period)
+            finally:
+                with self._condition:
+                    for entry in due:
+                        self._rearm(entry, now, min_period)
@@ -1,6 +1,8 @@
 from __future__ import annotations
 
 import re
+import sys
+from functools import lru_cache
 from typing import List, Tuple, Any
 from jhomeassistant.setup_logging import get_logger
 from jhomeassistant.types.component import Component
@@ -10,6 +12,8 @@ from jhomeassistant.types.units.base import BaseUnit
 
 logger = get_logger("validation")
 
+_WHITESPACE = re.compile(r"\s")
+
 
 def validate_non_empty_string(value: str | None, field: str, allow_none=False) -> str | None:
     """
@@ -106,19 +110,30 @@ def validate_topic(topic: str, strict_mode: bool = False) -> str:
       - Avoid empty levels ('//').
 
     Returns the topic if valid, else raises ValueError.
+    Valid topics are cached (and interned) per (topic, strict_mode), so repeated validation is a
+    dictionary lookup and best-practice warnings are logged once per topic.
     """
+    if not isinstance(topic, str):
+        validate_non_empty_string(topic, "topic")
+    return _validate_topic_cached(topic, strict_mode)
+
 
+@lru_cache(maxsize=16384)
+def _validate_topic_cached(topic: str, strict_mode: bool) -> str:
     # ---- Spec-enforced ----
     validate_non_empty_string(topic, "topic")
     if "\x00" in topic:
         raise ValueError("topic is invalid: null character is not allowed.")
 
-    try:
-        encoded = topic.encode("utf-8")
-    except UnicodeEncodeError:
-        raise ValueError("topic is invalid: must be UTF-8 encodable.")
+    if topic.isascii():
+        encoded_length = len(topic)
+    else:
+        try:
+            encoded_length = len(topic.encode("utf-8"))
+        except UnicodeEncodeError:
+            raise ValueError("topic is invalid: must be UTF-8 encodable.")
 
-    if len(encoded) > 65535:
+    if encoded_length > 65535:
         raise ValueError("topic is invalid: UTF-8 length must be ≤ 65535 bytes.")
     if "+" in topic or "#" in topic:
         raise ValueError("topic is invalid: wildcards '+' and '#' are not allowed in topic names.")
@@ -128,7 +143,7 @@ def validate_topic(topic: str, strict_mode: bool = False) -> str:
 
     if topic != topic.strip():
         bp_issues.append("leading or trailing whitespace is not recommended.")
-    if any(c.isspace() for c in topic):
+    if _WHITESPACE.search(topic):
         bp_issues.append("whitespace inside topic is not recommended.")
     if topic.startswith("$"):
         bp_issues.append("topics starting with '$' are reserved for broker/system.")
@@ -143,9 +158,9 @@ def validate_topic(topic: str, strict_mode: bool = False) -> str:
             logger.error(msg)
             raise ValueError("topic violates best practices: " + "; ".join(bp_issues))
         else:
-            logger.warning(msg)
+            logger.warning(f"{msg} (topic={topic!r})")
 
-    return topic
+    return sys.intern(topic)
 
 
 def validate_icon(name: str) -> str:
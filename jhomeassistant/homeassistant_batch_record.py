@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Dict, List
+
+if TYPE_CHECKING:
+    from jhomeassistant.entities import HomeAssistantEntityBase
+    from jhomeassistant.homeassistant_device import HomeAssistantDevice
+
+
+@dataclass
+class _BatchRecord:
+    # republish is an insertion-ordered set; delete maps each device to its topics at removal time.
+    republish: Dict[HomeAssistantDevice, None] = field(default_factory=dict)
+    delete: Dict[HomeAssistantDevice, List[str]] = field(default_factory=dict)
+    activate: List[HomeAssistantEntityBase] = field(default_factory=list)
+
+    def request_republish(self, device: HomeAssistantDevice) -> None:
+        self.delete.pop(device, None)
+        self.republish[device] = None
+
+    def request_delete(self, device: HomeAssistantDevice, topics: List[str]) -> None:
+        self.republish.pop(device, None)
+        self.delete[device] = topics
@@ -1,21 +1,36 @@
 from __future__ import annotations
 
 import json
+import logging
+import os
 import threading
-from typing import List, Union
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import partial
+from typing import Callable, Dict, List, Tuple, Union
 from jmqtt import QualityOfService as QoS, MQTTMessage, MQTTConnectionV3, MQTTConnectionV5
 
 from jhomeassistant.features import Availability, TopicConfig
 from jhomeassistant.features.availability.availability_source import AvailabilitySource
 from jhomeassistant.helper import validate_discovery_prefix
-from jhomeassistant.helper.abbreviations import resolve_abbreviation
+from jhomeassistant.helper.abbreviations import Abbreviation, get_key_table
+from jhomeassistant.helper.debouncer import Debouncer
+from jhomeassistant.helper.discovery_artifact import DiscoveryArtifact, discovery_fingerprint
+from jhomeassistant.helper.discovery_cache import DeviceDiscoveryRecord, DiscoveryCache, DiscoveryCacheEntry, payload_digest
+from jhomeassistant.helper.discovery_encoder import DiscoveryEncoder
+from jhomeassistant.helper.discovery_minimizer import DiscoveryMinimizer
+from jhomeassistant.helper.publish_pipeline import DiscoveryProgress, PublishPipeline, PublishResult, wait_for_all
 from jhomeassistant.entities import HomeAssistantEntityBase
-from jhomeassistant.helper.scheduler import Scheduler
+from jhomeassistant.helper.scheduler import Scheduler, ScheduleStats
+from jhomeassistant.homeassistant_batch_record import _BatchRecord
 from jhomeassistant.homeassistant_device import HomeAssistantDevice
 from jhomeassistant.homeassistant_origin import HomeAssistantOrigin
 from jhomeassistant.homeassistant_runtime import HomeAssistantRuntime
 from jhomeassistant.homeassistant_runtime_record import _RuntimeRecord
+from jhomeassistant.homeassistant_schedule_group import HomeAssistantScheduleGroup
 from jhomeassistant.setup_logging import get_logger
+from jhomeassistant.types import DiscoveryMode
 
 
 logger = get_logger("HomeAssistantConnection")
@@ -27,32 +42,13 @@ _RUNTIME_STOPPED = "stopped"
 _RUNTIME_ACTIVE_STATES = {_RUNTIME_RUNNING, _RUNTIME_STOPPING}
 
 
-def resolve_abbreviations(payload: dict, use_abbreviated_device_discovery: bool) -> dict:
-    new_payload = {}
-    for key, value in payload.items():
-        if isinstance(value, dict):
-            value = resolve_abbreviations(value, use_abbreviated_device_discovery)
-
-        elif isinstance(value, list):
-            normalized_list = []
-            for item in value:
-                if isinstance(item, dict):
-                    normalized_list.append(
-                        resolve_abbreviations(item, use_abbreviated_device_discovery)
-                    )
-                else:
-                    normalized_list.append(item)
-            value = normalized_list
-
-        if not isinstance(key, str):
-            key = resolve_abbreviation(key, use_abbreviated_device_discovery)
-
-        new_payload[key] = value
-    return new_payload
-
 class HomeAssistantConnection:
+    DEFAULT_MAX_IN_FLIGHT = 100
+
     def __init__(self, connection: Union[MQTTConnectionV3, MQTTConnectionV5], use_abbreviated_device_discovery=False):
         self._use_abbreviated_device_discovery = use_abbreviated_device_discovery
+        self._key_table = get_key_table(use_abbreviated_device_discovery)
+        self._discovery_encoder = DiscoveryEncoder(self._key_table)
         self._connection = connection
         self._origins: List[HomeAssistantOrigin] = []
         self._discovery_prefix = 'homeassistant'
@@ -65,6 +61,26 @@ class HomeAssistantConnection:
         self._runtime_lock = threading.RLock()
         self._runtime: _RuntimeRecord | None = None
         self._scheduler: Scheduler | None = None
+        self._schedule_executor: Executor | int | None = None
+        self._schedule_groups: List[HomeAssistantScheduleGroup] = []
+        self._discovery_cache = DiscoveryCache()
+        self._reconcile_window: float | None = None
+        self._max_payload_size: int | None = None
+        self._minimize_discovery = False
+        self._artifact_path: str | os.PathLike | None = None
+        self._artifact: DiscoveryArtifact | None = None
+        # Device discovery node_id -> {part: message index} of the loaded artifact, built on first use.
+        self._artifact_parts: Dict[str, Dict[int, int]] | None = None
+        self._publish_pipeline = PublishPipeline(max_in_flight=self.DEFAULT_MAX_IN_FLIGHT)
+
+        # Topology indexes, guarded by _runtime_lock. Kept in sync by add_*/remove_* and by
+        # HomeAssistantOrigin.add_devices / HomeAssistantDevice.add_entities via internal_attach.
+        self._device_origins: Dict[HomeAssistantDevice, HomeAssistantOrigin] = {}
+        self._entity_devices: Dict[HomeAssistantEntityBase, HomeAssistantDevice] = {}
+        self._entity_unique_ids: Dict[HomeAssistantEntityBase, str] = {}
+        self._entities_by_unique_id: Dict[str, HomeAssistantEntityBase] = {}
+        self._batch_local = threading.local()
+        self._debouncer: Debouncer[HomeAssistantDevice] | None = None
 
     def get_connection(self) -> Union[MQTTConnectionV3, MQTTConnectionV5]:
         """Returns the active MQTT connection. Passed to entities and the scheduler.
@@ -80,41 +96,386 @@ class HomeAssistantConnection:
         self._discovery_prefix = validate_discovery_prefix(discovery_prefix)
         return self
 
+    def reconcile_retained_discovery(self, window: float | None = 2.0) -> HomeAssistantConnection:
+        """Opt in to retained-state reconciliation at startup.
+
+        Before the initial discovery, run() subscribes to ``<prefix>/device/+/config`` and the
+        per-component ``<prefix>/+/+/+/config`` for at most ``window`` seconds and hashes the retained
+        payloads the broker delivers. Only payloads that
+        are missing or differ are published afterwards. Pass None to disable."""
+        if window is not None and window <= 0:
+            raise ValueError("Reconciliation window must be positive.")
+        self._reconcile_window = window
+        return self
+
+    def discovery_payload_limit(self, max_payload_size: int | None) -> HomeAssistantConnection:
+        """Split device discovery payloads larger than max_payload_size bytes across several
+        device-discovery objects that share the device block. Leave headroom below the broker's
+        max_packet_size for the topic and MQTT header. Pass None to disable."""
+        if max_payload_size is not None and max_payload_size <= 0:
+            raise ValueError("max_payload_size must be positive.")
+        self._max_payload_size = max_payload_size
+        return self
+
+    def minimize_discovery(self, enabled: bool = True) -> HomeAssistantConnection:
+        """Shrink discovery payloads: hoist availability shared by all components to the device root,
+        factor the common topic prefix into the ``~`` base topic and drop keys equal to Home Assistant's
+        defaults. Home Assistant resolves the result to the same configuration."""
+        self._minimize_discovery = enabled
+        self._discovery_encoder = DiscoveryEncoder(self._key_table, DiscoveryMinimizer(self._key_table) if enabled else None)
+        return self
+
+    def discovery_artifact(self, path: str | os.PathLike | None) -> HomeAssistantConnection:
+        """Keep compiled discovery payloads in a file for warm starts.
+
+        run() memory-maps the file and reuses the payload of every device whose input fingerprint
+        (device tree, origin and discovery settings) is unchanged instead of serializing it again,
+        then appends the records of the devices that changed. Pass None to disable."""
+        self._artifact_path = path
+        return self
+
+    def schedule_executor(self, executor: Executor | int | None) -> HomeAssistantConnection:
+        """Run scheduled functions on a worker pool instead of one after another on the scheduler thread.
+
+        An int creates a thread pool with that many workers per run() and shuts it down on stop; an
+        Executor is used as is and left running. Each schedule's max_concurrency, overrun policy and
+        timeout (see add_schedule) then apply. Pass None to run schedules inline."""
+        if isinstance(executor, int) and executor < 1:
+            raise ValueError("Schedule executor needs at least one worker.")
+        self._schedule_executor = executor
+        return self
+
+    def add_schedule_group(self, *groups: HomeAssistantScheduleGroup) -> HomeAssistantConnection:
+        """Register schedule groups; they start with run(), or immediately if the runtime is already running."""
+        with self._runtime_lock:
+            new_groups = [group for group in groups if group not in self._schedule_groups]
+            for group in new_groups:
+                group.internal_attach(self._entity_devices.__contains__)
+                self._schedule_groups.append(group)
+            if self._scheduler is not None and new_groups:
+                self._scheduler.add_tasks(*[group.schedule for group in new_groups])
+        return self
+
+    def remove_schedule_group(self, group: HomeAssistantScheduleGroup) -> None:
+        with self._runtime_lock:
+            if group not in self._schedule_groups:
+                return
+            self._schedule_groups.remove(group)
+            if self._scheduler is not None:
+                self._scheduler.remove_tasks(group.schedule)
+
+    def discovery_payload_sizes(self) -> Dict[str, List[int]]:
+        """Serialized discovery payload sizes in bytes per device unique_id, one value per discovery object."""
+        return {device.unique_id: [len(payload) for _topic, payload in record.messages]
+                for device, record in self._discovery_records()}
+
+    def discovery_flow_control(self, max_in_flight: int | None = DEFAULT_MAX_IN_FLIGHT, max_rate: float | None = None,
+                               on_progress: Callable[[DiscoveryProgress], None] | None = None) -> HomeAssistantConnection:
+        """Configure how discovery batches are published.
+
+        Args:
+            max_in_flight: Maximum number of unacknowledged discovery publishes. None disables the window.
+            max_rate: Optional pacing limit in messages per second.
+            on_progress: Called with a DiscoveryProgress snapshot whenever a message is sent, acknowledged or timed out.
+        """
+        self._publish_pipeline = PublishPipeline(max_in_flight, max_rate, on_progress)
+        return self
+
+    def debounce_discovery(self, window: float | None = 0.25, publish_timeout: float | None = None) -> HomeAssistantConnection:
+        """Collapse device republishes caused by add_*/remove_* outside of a batch.
+
+        Requests for the same device within ``window`` seconds result in one publish of its latest
+        payload, sent by a background flusher (waiting up to publish_timeout for acknowledgements).
+        Use flush() as a synchronous barrier. Pass None to disable; pending requests are flushed."""
+        previous = self._debouncer
+        self._debouncer = None if window is None else Debouncer(
+            window, partial(self._flush_debounced, publish_timeout=publish_timeout), name="jhomeassistant-discovery-debounce")
+        if previous is not None:
+            previous.close()
+        return self
+
+    def flush(self) -> None:
+        """Publish all debounced device republishes now and return once they were handed to the broker."""
+        debouncer = self._debouncer
+        if debouncer is not None:
+            debouncer.flush()
+
+    def _flush_debounced(self, devices: List[HomeAssistantDevice], publish_timeout: float | None) -> None:
+        self._commit_batch(_BatchRecord(republish=dict.fromkeys(devices)), publish_timeout)
+
+    def _publish_attached_entry(self, device: HomeAssistantDevice, entry: DiscoveryCacheEntry, action: str):
+        """Publish entry unless device was removed meanwhile (returns None then). The check and the publish
+        happen under _runtime_lock, so a concurrent remove_device either sees the publish before its
+        delete or the publish is skipped."""
+        with self._runtime_lock:
+            if device not in self._device_origins:
+                logger.debug(f"Skipping discovery of removed device {device.name!r} ({entry.topic})")
+                return None
+            return self._publish_discovery_entry(entry, action)
+
+    @property
+    def discovery_progress(self) -> DiscoveryProgress:
+        """Progress of the most recent (or currently running) discovery batch."""
+        return self._publish_pipeline.progress
+
     def add_origin(self, *origins: HomeAssistantOrigin, publish_timeout: float | None = None) -> HomeAssistantConnection:
         new_origins = []
         is_active = False
         with self._runtime_lock:
             for origin in origins:
-                if origin not in self._origins:
+                # Attached origins are already registered; checked in O(1) instead of scanning _origins.
+                if origin._topology_listener is not self:
                     self._origins.append(origin)
+                    self._index_origin(origin)
                     new_origins.append(origin)
             if new_origins:
                 is_active = self._runtime is not None and self._runtime_is_active_unlocked(self._runtime)
                 if is_active:
-                    for origin in new_origins:
-                        for device in origin._devices:
-                            for entity in device.entities:
-                                self._activate_entity_runtime(entity)
+                    self._activate_entities([entity for origin in new_origins
+                                             for device in origin._devices for entity in device.entities])
 
         if is_active:
+            deferred = self._current_batch() is not None or self._debouncer is not None
             for origin in new_origins:
-                self._publish_origin_discovery(origin, publish_timeout)
+                if not deferred:
+                    self._publish_origin_discovery(origin, publish_timeout)
+                else:
+                    for device in origin._devices:
+                        self._republish_device_discovery(device, publish_timeout)
 
         return self
 
-    def _discovery_gen(self):
-        for origin in self._origins:
-            if origin.qos is None and self.qos is not None:
-                origin.qos = self.qos
-                logger.info(f"Inherit connection QoS={self.qos.name} to origin {origin.name}")
-            if origin.encoding is None and self.encoding is not None:
-                origin.encoding = self.encoding
-                logger.info(f"Inherit connection encoding={self.encoding} to origin {origin.name}")
+    def get_entity(self, unique_id: str) -> HomeAssistantEntityBase | None:
+        """Return the entity published under the given discovery unique_id, if any."""
+        with self._runtime_lock:
+            return self._entities_by_unique_id.get(unique_id)
+
+    def _index_origin(self, origin: HomeAssistantOrigin) -> None:
+        origin.internal_attach(self)
+        for device in origin._devices:
+            self._index_device(device, origin)
+
+    def _index_device(self, device: HomeAssistantDevice, origin: HomeAssistantOrigin) -> None:
+        self._device_origins[device] = origin
+        device.internal_attach(self)
+        for entity in device._entities:
+            self._index_entity(entity, device)
+
+    def _index_entity(self, entity: HomeAssistantEntityBase, device: HomeAssistantDevice) -> None:
+        self._entity_devices[entity] = device
+        if device.identifiers:
+            self._index_unique_id(entity, device.internal_entity_unique_id(entity))
+
+    def _index_unique_id(self, entity: HomeAssistantEntityBase, unique_id: str) -> None:
+        previous = self._entity_unique_ids.get(entity)
+        if previous == unique_id:
+            return
+        if previous is not None and self._entities_by_unique_id.get(previous) is entity:
+            del self._entities_by_unique_id[previous]
+        self._entity_unique_ids[entity] = unique_id
+        self._entities_by_unique_id[unique_id] = entity
+
+    def _reindex_unique_ids(self, device: HomeAssistantDevice) -> None:
+        """Refresh unique_ids after the device was renamed or re-identified."""
+        if not device.identifiers:
+            return
+        device_unique_id = device.unique_id
+        with self._runtime_lock:
+            for entity in device._entities:
+                self._index_unique_id(entity, device.internal_entity_unique_id(entity, device_unique_id))
+
+    def _unindex_entity(self, entity: HomeAssistantEntityBase) -> None:
+        self._entity_devices.pop(entity, None)
+        unique_id = self._entity_unique_ids.pop(entity, None)
+        if unique_id is not None and self._entities_by_unique_id.get(unique_id) is entity:
+            del self._entities_by_unique_id[unique_id]
+
+    def _unindex_device(self, device: HomeAssistantDevice) -> None:
+        self._device_origins.pop(device, None)
+        device.internal_attach(None)
+        for entity in device._entities:
+            if self._entity_devices.get(entity) is device:
+                self._unindex_entity(entity)
+
+    def internal_devices_added(self, origin: HomeAssistantOrigin, devices) -> None:
+        with self._runtime_lock:
+            for device in devices:
+                self._index_device(device, origin)
 
-            origin.availability.internal_merge(self.availability)
+    def internal_entities_added(self, device: HomeAssistantDevice, entities) -> None:
+        with self._runtime_lock:
+            for entity in entities:
+                self._index_entity(entity, device)
 
-            for discovery_topic, discovery_payload in origin._discovery_gen(self._discovery_prefix):
-                yield discovery_topic, resolve_abbreviations(discovery_payload, self._use_abbreviated_device_discovery)
+    def _inherit_to_origin(self, origin: HomeAssistantOrigin) -> None:
+        """Apply connection-level QoS/encoding/availability to the origin. Idempotent."""
+        if origin.qos is None and self.qos is not None:
+            origin.qos = self.qos
+            logger.info(f"Inherit connection QoS={self.qos.name} to origin {origin.name}")
+        if origin.encoding is None and self.encoding is not None:
+            origin.encoding = self.encoding
+            logger.info(f"Inherit connection encoding={self.encoding} to origin {origin.name}")
+
+        origin.availability.internal_merge(self.availability)
+
+    def _discovery_gen(self):
+        for origin in self._origins:
+            self._inherit_to_origin(origin)
+
+            yield from origin._discovery_gen(self._discovery_prefix, self._key_table)
+
+    def _encode_device(self, origin: HomeAssistantOrigin, device: HomeAssistantDevice) -> List[Tuple[str, bytes]]:
+        if device.discovery_mode == DiscoveryMode.COMPONENT:
+            return self._discovery_encoder.encode_components(origin, device, self._discovery_prefix)
+        if self._max_payload_size is None:
+            return [self._discovery_encoder.encode_device(origin, device, self._discovery_prefix)]
+
+        messages = self._discovery_encoder.encode_device_parts(origin, device, self._discovery_prefix, self._max_payload_size,
+                                                               self._previous_parts_layout(device))
+        if len(messages) > 1:
+            logger.info(f"Split discovery of device {device.name} into {len(messages)} parts "
+                        f"({', '.join(str(len(payload)) for _topic, payload in messages)} bytes).")
+        for topic, payload in messages:
+            if len(payload) > self._max_payload_size:
+                logger.warning(f"Discovery payload {topic} is {len(payload)} bytes, above the limit of "
+                               f"{self._max_payload_size} bytes, because a single component does not fit.")
+        return messages
+
+    def _previous_parts_layout(self, device: HomeAssistantDevice) -> Dict[str, int] | None:
+        """Component unique_id -> part of the device's last split discovery: from its cached record, or at
+        startup from the loaded artifact. None if the device was not split, so a plain greedy split is used."""
+        part_topic = device.internal_discovery_topic(self._discovery_prefix)
+        part_prefix = f"{part_topic[:-len('/config')]}_"
+        payloads: Dict[int, bytes] = {}
+        record = self._discovery_cache.peek(device)
+        if record is not None:
+            for entry in record.entries:
+                payload = entry.published_payload or entry.payload
+                if not payload:
+                    continue
+                if entry.topic == part_topic:
+                    payloads[0] = payload
+                elif entry.topic.startswith(part_prefix) and entry.topic[len(part_prefix):-len("/config")].isdigit():
+                    payloads[int(entry.topic[len(part_prefix):-len("/config")])] = payload
+        elif self._artifact is not None:
+            for part, index in self._artifact_device_parts().get(device.unique_id, {}).items():
+                message = self._artifact.message(index)
+                if message is not None:
+                    payloads[part] = message[1]
+        if set(payloads) <= {0}:
+            return None
+
+        layout: Dict[str, int] = {}
+        components_keys = {get_key_table(abbreviated)[Abbreviation.COMPONENTS] for abbreviated in (True, False)}
+        for part, payload in payloads.items():
+            try:
+                parsed = json.loads(payload)
+            except ValueError:
+                continue
+            if not isinstance(parsed, dict):
+                continue
+            for key in components_keys & parsed.keys():
+                layout.update(dict.fromkeys(parsed[key], part))
+        return layout
+
+    def _artifact_device_parts(self) -> Dict[str, Dict[int, int]]:
+        if self._artifact_parts is None:
+            self._artifact_parts = {}
+            scope = f"{self._discovery_prefix}/device/"
+            for index, topic in self._artifact.indexed_topics():
+                if not topic.startswith(scope):
+                    continue
+                ids = self._discovery_topic_device_ids(topic)
+                self._artifact_parts.setdefault(ids[0], {})[0] = index
+                if len(ids) == 2:
+                    self._artifact_parts.setdefault(ids[1], {})[int(ids[0][len(ids[1]) + 1:])] = index
+        return self._artifact_parts
+
+    def _device_discovery_record(self, origin: HomeAssistantOrigin, device: HomeAssistantDevice) -> DeviceDiscoveryRecord:
+        """Return the serialized discovery for one device, rebuilding it only if the device is dirty.
+        Assumes connection-level inheritance was already applied to the origin."""
+        origin.internal_inherit(device)
+        revision = max(origin.internal_revision, device.internal_revision)
+        context = (self._discovery_prefix, self._use_abbreviated_device_discovery, self._max_payload_size, self._minimize_discovery)
+
+        record = self._discovery_cache.get(device, revision, context)
+        if record is None:
+            fingerprint = messages = None
+            if self._artifact is not None:
+                # Only while a loaded artifact can be hit; the artifact writer fingerprints the rest lazily.
+                fingerprint = discovery_fingerprint(context, origin, device)
+                if fingerprint is not None:
+                    messages = self._artifact.get(fingerprint)
+            if messages is None:
+                messages = self._encode_device(origin, device)
+            record = self._discovery_cache.store(device, revision, context, messages, fingerprint)
+            self._reindex_unique_ids(device)
+        return record
+
+    def _load_discovery_artifact(self) -> None:
+        if self._artifact_path is None or not os.path.exists(self._artifact_path):
+            return
+        try:
+            self._artifact = DiscoveryArtifact(self._artifact_path)
+            logger.debug(f"Loaded discovery artifact {self._artifact_path} with {len(self._artifact)} devices")
+        except Exception as exc:
+            logger.warning(f"Ignoring unreadable discovery artifact {self._artifact_path}: {exc}")
+
+    def _save_discovery_artifact(self) -> None:
+        """Close the loaded artifact and bring it up to date with the current fingerprints: append the records
+        that changed, or rewrite the file once most of what it stores is outdated."""
+        artifact, self._artifact = self._artifact, None
+        self._artifact_parts = None
+        if self._artifact_path is None:
+            return
+        try:
+            records = []
+            for origin in list(self._origins):
+                for device in list(origin._devices):
+                    # Records of the initial discovery are current; only devices without one are built here.
+                    record = self._discovery_cache.peek(device)
+                    if record is None:
+                        self._inherit_to_origin(origin)
+                        record = self._device_discovery_record(origin, device)
+                    if record.fingerprint is None:
+                        record.fingerprint = discovery_fingerprint(record.context, origin, device)
+                    if record.fingerprint is not None:
+                        records.append((record.fingerprint, record.messages))
+            if artifact is not None:
+                current = {fingerprint for fingerprint, _messages in records}
+                added = [(fingerprint, messages) for fingerprint, messages in records if fingerprint not in artifact]
+                removed = [fingerprint for fingerprint in artifact if fingerprint not in current]
+                if not added and not removed:
+                    return
+                if artifact.stored_records + len(added) + len(removed) <= 2 * len(current):
+                    artifact.append(added, removed)
+                    artifact = None
+                    logger.debug(f"Updated {len(added)} and removed {len(removed)} devices in discovery artifact "
+                                 f"{self._artifact_path}")
+                    return
+                artifact.close()
+                artifact = None
+            DiscoveryArtifact.write(self._artifact_path, records)
+            logger.debug(f"Wrote discovery artifact {self._artifact_path} with {len(records)} devices")
+        except Exception as exc:
+            logger.warning(f"Failed to write discovery artifact {self._artifact_path}: {exc}")
+        finally:
+            if artifact is not None:
+                artifact.close()
+
+    def _discovery_records(self):
+        for origin in list(self._origins):
+            self._inherit_to_origin(origin)
+            for device in list(origin._devices):
+                yield device, self._device_discovery_record(origin, device)
+
+    def _publish_discovery_entry(self, entry: DiscoveryCacheEntry, action: str = "Publishing discovery"):
+        logger.info(f"{action}: topic={entry.topic} retained=True qos={QoS.AtLeastOnce.name} bytes={len(entry.payload)}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Discovery payload: {entry.payload.decode('utf-8')}")
+        info = self._connection.publish(entry.topic, entry.payload, QoS.AtLeastOnce, True)
+        self._discovery_cache.mark_published(entry)
+        return info
 
     def discovery_text(self):
         text = ""
@@ -128,17 +489,125 @@ class HomeAssistantConnection:
             text += f"-------------------------- Topic: {topic} --------------------------\n{pretty}\n\n"
         return text
 
-    def _discovery(self, publish_timeout):
-        """Publish all discovery payloads and wait for completion."""
-        discovery_infos = []
-        for discovery_topic, discovery_payload in self._discovery_gen():
-            payload_str = json.dumps(discovery_payload, separators=(",", ":"))
-            logger.info(f"Publishing discovery: topic={discovery_topic} retained=True qos={QoS.AtLeastOnce.name} bytes={len(payload_str)}")
-            logger.debug(f"Discovery payload: {payload_str}")
-            discovery_infos.append(self._connection.publish(discovery_topic, payload_str, QoS.AtLeastOnce, True))
+    def _collect_retained_discovery(self, window: float, stop_event: threading.Event | None = None) -> Dict[str, bytes]:
+        """Collect digests of the retained discovery payloads of this process's devices within a bounded window.
 
-        for i in discovery_infos:
-            i.wait_for_publish(publish_timeout)
+        Device-mode topics are matched by one filter (``<prefix>/device/+/config``), component-mode topics by
+        one filter per device (``<prefix>/+/<device id>/+/config``); retained configs of other devices and
+        integrations are dropped on arrival, so only the own topics are kept."""
+        with self._runtime_lock:
+            owned = {device.unique_id for origin in self._origins for device in origin._devices if device.identifiers}
+        topic_filters = [f"{self._discovery_prefix}/device/+/config"]
+        topic_filters += [f"{self._discovery_prefix}/+/{unique_id}/+/config" for unique_id in sorted(owned)]
+        retained: Dict[str, bytes] = {}
+        retained_lock = threading.Lock()
+
+        def on_retained(_connection, _client, _userdata, message: MQTTMessage):
+            if not message.retain or owned.isdisjoint(self._discovery_topic_device_ids(message.topic)):
+                return
+            with retained_lock:
+                retained[message.topic] = payload_digest(message.payload_bytes)
+
+        for topic_filter in topic_filters:
+            self._connection.subscribe(topic_filter, on_retained)
+        try:
+            (stop_event or threading.Event()).wait(window)
+        finally:
+            for topic_filter in topic_filters:
+                try:
+                    self._connection.unsubscribe(topic_filter)
+                except Exception as exc:
+                    logger.debug(f"Failed to unsubscribe retained discovery filter ({topic_filter}): {exc}")
+
+        with retained_lock:
+            logger.info(f"Collected {len(retained)} retained discovery payloads within {window}s.")
+            return dict(retained)
+
+    def _settle_publish_result(self, result: PublishResult[DiscoveryCacheEntry], action: str) -> None:
+        """Log timed-out entries and keep them pending, so the next republish sends them again."""
+        for entry in result.timed_out:
+            self._discovery_cache.mark_unacknowledged(entry)
+        if result.timed_out:
+            topics = ", ".join(entry.topic for entry in result.timed_out)
+            logger.warning(f"{action}: {len(result.timed_out)} publishes not acknowledged before the deadline ({topics})")
+
+    def _discovery_topic_device_ids(self, topic: str) -> List[str]:
+        """Device unique ids a discovery topic may belong to: ``<prefix>/device/<id>[_<part>]/config``
+        in device mode, ``<prefix>/<component>/<id>/<object_id>/config`` in component mode."""
+        scope = f"{self._discovery_prefix}/"
+        if not topic.startswith(scope) or not topic.endswith("/config"):
+            return []
+        levels = topic[len(scope):-len("/config")].split("/")
+        if len(levels) == 3 and levels[0] != "device":
+            return [levels[1]]
+        if len(levels) != 2 or levels[0] != "device":
+            return []
+        node_id = levels[1]
+        base, separator, part = node_id.rpartition("_")
+        return [node_id, base] if separator and part.isdigit() else [node_id]
+
+    def _clear_stale_topics(self, records, previous_topics: List[str]) -> None:
+        """Add delete entries for topics of current devices that an earlier process published (known from the
+        retained broker state or the discovery artifact) but that are no longer produced, e.g. split parts
+        above the current part count or the topics of the other discovery mode. Component-mode devices
+        always clear their device-mode topic, since switching modes is the common reason for a restart."""
+        by_id: Dict[str, List[str]] = {}
+        for topic in previous_topics:
+            for unique_id in self._discovery_topic_device_ids(topic):
+                by_id.setdefault(unique_id, []).append(topic)
+        for device, _record in records:
+            if device.discovery_mode == DiscoveryMode.COMPONENT:
+                by_id.setdefault(device.unique_id, []).append(device.internal_discovery_topic(self._discovery_prefix))
+
+        # A topic produced by any current device is not stale, even if it looks like a part of another one.
+        produced = {entry.topic for _device, record in records for entry in record.entries}
+        for device, record in records:
+            stale = [topic for topic in by_id.get(device.unique_id, ()) if topic not in produced]
+            if stale:
+                logger.info(f"Clearing {len(stale)} stale discovery topics of device {device.name}")
+                record.add_deletes(stale)
+
+    def _discovery(self, publish_timeout, force: bool = True, retained: Dict[str, bytes] | None = None,
+                   previous_topics: List[str] | None = None) -> PublishResult[DiscoveryCacheEntry]:
+        """Publish discovery payloads and wait for completion, bounded by one overall publish_timeout.
+        Unless force is set, devices whose payload matches the last published one are skipped.
+        Payloads whose digest matches the retained broker state in retained are skipped as well.
+        previous_topics (startup only) are topics an earlier process may have left; see _clear_stale_topics."""
+        pending = []
+        up_to_date = 0
+        records = list(self._discovery_records())
+        if previous_topics is not None:
+            self._clear_stale_topics(records, previous_topics)
+        for _device, record in records:
+            for entry in record.entries:
+                if retained is not None and retained.get(entry.topic) == (None if entry.is_delete else payload_digest(entry.payload)):
+                    self._discovery_cache.mark_published(entry)
+                    up_to_date += 1
+                    continue
+                if entry.changed or (force and not entry.is_delete):
+                    pending.append(entry)
+
+        if retained is not None:
+            logger.info(f"Reconciled discovery: {up_to_date} retained payloads up to date, {len(pending)} to publish.")
+
+        result = self._run_deletes_first(self._publish_discovery_entry, pending, lambda entry: entry.is_delete, publish_timeout)
+        self._settle_publish_result(result, "Discovery")
+        return result
+
+    def _run_deletes_first(self, publish: Callable, items: list, is_delete: Callable[[object], bool],
+                           publish_timeout: float | None) -> PublishResult:
+        """Run items through the publish pipeline in two rounds: the deletes first, awaited before any other
+        message is sent. Home Assistant thereby drops a topic that no longer holds an entity (a topic of the
+        other discovery mode, a split part the component left) before the entity's unique_id shows up on its
+        new topic. publish_timeout is one deadline for both rounds."""
+        deletes = [item for item in items if is_delete(item)]
+        if not deletes or len(deletes) == len(items):
+            return self._publish_pipeline.run(publish, items, publish_timeout)
+        deadline = None if publish_timeout is None else time.monotonic() + publish_timeout
+        first = self._publish_pipeline.run(publish, deletes, publish_timeout)
+        rest = self._publish_pipeline.run(publish, [item for item in items if not is_delete(item)],
+                                          None if deadline is None else max(0.0, deadline - time.monotonic()))
+        return PublishResult(first.acknowledged + rest.acknowledged, first.timed_out + rest.timed_out)
 
     def _entities(self):
         for origin in self._origins:
@@ -147,6 +616,10 @@ class HomeAssistantConnection:
                     yield entity
 
     def homeassistant_status(self, connection, client, userdata, message: MQTTMessage):
+        if message.text == self.ha_status.payload_available:
+            # Home Assistant restarted: the next collection of every group publishes all values again.
+            for group in list(self._schedule_groups):
+                group.invalidate()
         for entity in self._entities():
             if message.text == self.ha_status.payload_available:
                 entity.home_assistant_birth(connection)
@@ -173,6 +646,7 @@ class HomeAssistantConnection:
     def _runtime_execute(self, runtime: _RuntimeRecord, schedule_resolution: float, publish_timeout: float | None, re_raise_errors: bool) -> None:
         with self._runtime_lock:
             runtime.owner_thread_id = threading.get_ident()
+        owned_executor: ThreadPoolExecutor | None = None
 
         try:
             def on_mqtt_connect(*_args):
@@ -188,11 +662,22 @@ class HomeAssistantConnection:
                 for entity in self._entities():
                     entity.mqtt_connected(self.get_connection)
 
-            self._discovery(publish_timeout)
+            retained = None
+            if self._reconcile_window is not None:
+                retained = self._collect_retained_discovery(self._reconcile_window, runtime.stop_event)
+            self._load_discovery_artifact()
+            try:
+                previous_topics = list(retained or ()) + (self._artifact.topics() if self._artifact is not None else [])
+                self._discovery(publish_timeout, retained=retained, previous_topics=previous_topics)
+            finally:
+                self._save_discovery_artifact()
             self._connection.subscribe(self.ha_status.topic, self.homeassistant_status)
 
+            if isinstance(self._schedule_executor, int):
+                owned_executor = ThreadPoolExecutor(self._schedule_executor, thread_name_prefix="jhomeassistant-schedule")
             tasks = [schedule for entity in self._entities() for schedule in entity.schedules]
-            scheduler = Scheduler(*tasks)
+            tasks.extend(group.schedule for group in self._schedule_groups)
+            scheduler = Scheduler(*tasks, executor=owned_executor or self._schedule_executor)
             with self._runtime_lock:
                 self._scheduler = scheduler
             scheduler.run_forever(
@@ -207,6 +692,8 @@ class HomeAssistantConnection:
             if re_raise_errors:
                 raise
         finally:
+            if owned_executor is not None:
+                owned_executor.shutdown(wait=False)
             self._runtime_cleanup(runtime)
 
     def _runtime_stop(self, runtime: _RuntimeRecord, timeout: float | None = None) -> None:
@@ -216,7 +703,10 @@ class HomeAssistantConnection:
             if runtime.state == _RUNTIME_RUNNING:
                 runtime.state = _RUNTIME_STOPPING
             runtime.stop_event.set()
+            scheduler = self._scheduler if self._runtime is runtime else None
 
+        if scheduler is not None:
+            scheduler.wake()
         if timeout is not None:
             self._runtime_join(runtime, timeout)
 
@@ -231,6 +721,15 @@ class HomeAssistantConnection:
         with self._runtime_lock:
             return runtime.last_error
 
+    def _runtime_scheduler_stats(self, runtime: _RuntimeRecord) -> Dict[str, List[ScheduleStats]]:
+        with self._runtime_lock:
+            entities = [(self._entity_unique_ids.get(entity, entity.name), entity) for entity in self._entities()]
+            groups = list(self._schedule_groups)
+        stats = {key: [schedule.stats() for schedule in entity.schedules] for key, entity in entities if entity.schedules}
+        for group in groups:
+            stats.setdefault(group.name, []).append(group.schedule.stats())
+        return stats
+
     def run(self, schedule_resolution: float = 1.0, publish_timeout: float | None = None, blocking: bool = True) -> HomeAssistantRuntime | None:
         thread_to_start = None
         create_new_runtime = False
@@ -297,41 +796,43 @@ class HomeAssistantConnection:
                 return None
             return self._runtime_handle_unlocked(self._runtime)
 
-    def republish_discovery(self, publish_timeout: float | None = None) -> None:
-        self._discovery(publish_timeout)
+    def republish_discovery(self, publish_timeout: float | None = None, force: bool = False) -> PublishResult[DiscoveryCacheEntry]:
+        """Re-serialize dirty devices and publish only the payloads that changed since they were last sent.
+        Pass force=True to publish every device regardless. publish_timeout bounds the whole batch; the
+        returned PublishResult lists the entries that were acknowledged and those that timed out."""
+        return self._discovery(publish_timeout, force)
 
-    def _activate_entity_runtime(self, entity: HomeAssistantEntityBase) -> None:
+    def _activate_entities_runtime(self, entities: List[HomeAssistantEntityBase]) -> None:
         """Call mqtt_connected and register schedules with the running scheduler. Assumes _runtime_lock is held."""
-        try:
-            entity.mqtt_connected(self.get_connection)
-        except Exception as exc:
-            logger.debug(f"mqtt_connected failed for entity {entity.name!r}: {exc}")
+        for entity in entities:
+            try:
+                entity.mqtt_connected(self.get_connection)
+            except Exception as exc:
+                logger.debug(f"mqtt_connected failed for entity {entity.name!r}: {exc}")
         scheduler = self._scheduler
-        if scheduler is not None and entity.schedules:
+        schedules = [schedule for entity in entities for schedule in entity.schedules]
+        if scheduler is not None and schedules:
             try:
-                scheduler.add_tasks(*entity.schedules)
+                scheduler.add_tasks(*schedules)
             except Exception as exc:
-                logger.debug(f"Failed to add scheduler tasks for entity {entity.name!r}: {exc}")
+                logger.debug(f"Failed to add {len(schedules)} scheduler tasks: {exc}")
+
+    def _activate_entities(self, entities: List[HomeAssistantEntityBase]) -> None:
+        """Activate entities of a running runtime, or defer them to the current batch. Assumes _runtime_lock is held."""
+        batch = self._current_batch()
+        if batch is not None:
+            batch.activate.extend(entities)
+        else:
+            self._activate_entities_runtime(entities)
 
     def _publish_origin_discovery(self, origin: HomeAssistantOrigin, publish_timeout: float | None) -> None:
         """Publish discovery for a single origin with connection-level QoS/encoding/availability applied."""
-        if origin.qos is None and self.qos is not None:
-            origin.qos = self.qos
-            logger.info(f"Inherit connection QoS={self.qos.name} to origin {origin.name}")
-        if origin.encoding is None and self.encoding is not None:
-            origin.encoding = self.encoding
-            logger.info(f"Inherit connection encoding={self.encoding} to origin {origin.name}")
-        origin.availability.internal_merge(self.availability)
+        self._inherit_to_origin(origin)
 
-        infos = []
-        for discovery_topic, discovery_payload in origin._discovery_gen(self._discovery_prefix):
-            payload = resolve_abbreviations(discovery_payload, self._use_abbreviated_device_discovery)
-            payload_str = json.dumps(payload, separators=(",", ":"))
-            logger.info(f"Publishing discovery: topic={discovery_topic} retained=True qos={QoS.AtLeastOnce.name} bytes={len(payload_str)}")
-            logger.debug(f"Discovery payload: {payload_str}")
-            infos.append(self._connection.publish(discovery_topic, payload_str, QoS.AtLeastOnce, True))
-        for info in infos:
-            info.wait_for_publish(publish_timeout)
+        entries = [entry for device in list(origin._devices)
+                   for entry in self._device_discovery_record(origin, device).pending(force=True)]
+        result = self._run_deletes_first(self._publish_discovery_entry, entries, lambda entry: entry.is_delete, publish_timeout)
+        self._settle_publish_result(result, f"Origin discovery ({origin.name})")
 
     def _cleanup_entity_runtime(self, entity: HomeAssistantEntityBase) -> None:
         """Release runtime resources held by the entity (subscriptions, scheduled tasks). Idempotent."""
@@ -347,32 +848,179 @@ class HomeAssistantConnection:
             except Exception as exc:
                 logger.debug(f"Failed to remove scheduler tasks for entity {entity.name!r}: {exc}")
 
-    def _publish_device_delete(self, device: HomeAssistantDevice, publish_timeout: float | None) -> None:
-        """Publish empty retained payload to delete the device from Home Assistant."""
-        topic = f"{self._discovery_prefix}/device/{device.unique_id}/config"
+    def _wait_for_publishes(self, published: list, publish_timeout: float | None, action: str) -> List[str]:
+        """Wait for (topic, info) pairs with one overall deadline and return the topics that were not acknowledged.
+        Without a timeout the publishes are not awaited."""
+        if publish_timeout is None or not published:
+            return []
         try:
-            logger.info(f"Publishing device-delete: topic={topic} retained=True qos={QoS.AtLeastOnce.name}")
-            info = self._connection.publish(topic, "", QoS.AtLeastOnce, True)
-            if publish_timeout is not None:
-                info.wait_for_publish(publish_timeout)
+            result = wait_for_all(published, publish_timeout)
         except Exception as exc:
-            logger.debug(f"Failed to publish device-delete payload for {device.name!r} ({topic}): {exc}")
+            logger.debug(f"{action} failed while waiting for acknowledgements: {exc}")
+            return [topic for topic, _info in published]
+        if result.timed_out:
+            logger.warning(f"{action}: {len(result.timed_out)} publishes not acknowledged before the deadline "
+                           f"({', '.join(result.timed_out)})")
+        return result.timed_out
+
+    def _device_topic(self, device: HomeAssistantDevice) -> str:
+        return f"{self._discovery_prefix}/device/{device.unique_id}/config"
+
+    def _device_delete_topics(self, device: HomeAssistantDevice) -> List[str]:
+        """Forget the device's cached discovery and return every topic that has to be cleared."""
+        record = self._discovery_cache.discard(device)
+        topics = [self._device_topic(device)]
+        if record is not None:
+            topics += [topic for topic in record.published_topics if topic != topics[0]]
+        return topics
+
+    def _send_device_delete(self, topic: str):
+        logger.info(f"Publishing device-delete: topic={topic} retained=True qos={QoS.AtLeastOnce.name}")
+        return self._connection.publish(topic, "", QoS.AtLeastOnce, True)
+
+    def _publish_device_deletes(self, devices: List[HomeAssistantDevice], publish_timeout: float | None) -> None:
+        """Publish empty retained payloads to delete the devices from Home Assistant."""
+        batch = self._current_batch()
+        published = []
+        debouncer = self._debouncer
+        for device in devices:
+            topics = self._device_delete_topics(device)
+            if debouncer is not None:
+                debouncer.discard(device)
+            if batch is not None:
+                batch.request_delete(device, topics)
+                continue
+            for topic in topics:
+                try:
+                    published.append((topic, self._send_device_delete(topic)))
+                except Exception as exc:
+                    logger.debug(f"Failed to publish device-delete payload for {device.name!r} ({topic}): {exc}")
+        self._wait_for_publishes(published, publish_timeout, "Device delete")
+
+    def _device_record(self, device: HomeAssistantDevice) -> DeviceDiscoveryRecord:
+        with self._runtime_lock:
+            origin = self._device_origins.get(device)
+        if origin is None:
+            raise ValueError(f"Device {device.name!r} is not part of an origin added to this connection.")
+        self._inherit_to_origin(origin)
+        return self._device_discovery_record(origin, device)
+
+    def device_discovery(self, device: HomeAssistantDevice) -> List[Tuple[str, bytes]]:
+        """Build the discovery messages (topic, payload) of a single device, with origin and connection
+        inheritance applied. There is more than one message if the payload was split."""
+        return self._device_record(device).messages
+
+    def publish_device_discovery(self, device: HomeAssistantDevice, publish_timeout: float | None = None, force: bool = False) -> bool:
+        """Build and publish discovery for exactly one device, leaving all other devices untouched.
+
+        Unless force is set, nothing is published if the payload matches the last published one.
+        With a publish_timeout the call waits that long for the acknowledgements, and deletes of topics the
+        device no longer uses are acknowledged before the new messages are sent (see _run_deletes_first).
+        Returns True if anything was published."""
+        entries = self._device_record(device).pending(force)
+        deadline = None if publish_timeout is None else time.monotonic() + publish_timeout
+        timed_out = set()
+        for phase in ([entry for entry in entries if entry.is_delete], [entry for entry in entries if not entry.is_delete]):
+            if not phase:
+                continue
+            published = [(entry.topic, self._publish_discovery_entry(entry, "Publishing device discovery")) for entry in phase]
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            timed_out.update(self._wait_for_publishes(published, remaining, "Device discovery"))
+        for entry in entries:
+            if entry.topic in timed_out:
+                self._discovery_cache.mark_unacknowledged(entry)
+        return bool(entries)
 
     def _republish_device_discovery(self, device: HomeAssistantDevice, publish_timeout: float | None) -> None:
-        """Republish discovery for a single device. Used after entity removal so HA drops the component."""
-        target_topic = f"{self._discovery_prefix}/device/{device.unique_id}/config"
-        for discovery_topic, discovery_payload in self._discovery_gen():
-            if discovery_topic != target_topic:
-                continue
+        """Republish discovery for a single device after a topology change. Errors are logged, not raised."""
+        batch = self._current_batch()
+        if batch is not None:
+            batch.request_republish(device)
+            return
+        debouncer = self._debouncer
+        if debouncer is not None:
             try:
-                payload_str = json.dumps(discovery_payload, separators=(",", ":"))
-                logger.info(f"Republishing device discovery: topic={discovery_topic} retained=True qos={QoS.AtLeastOnce.name} bytes={len(payload_str)}")
-                info = self._connection.publish(discovery_topic, payload_str, QoS.AtLeastOnce, True)
-                if publish_timeout is not None:
-                    info.wait_for_publish(publish_timeout)
+                debouncer.request(device)
+                return
+            except RuntimeError:
+                pass  # debouncing was disabled concurrently, publish directly
+        try:
+            self.publish_device_discovery(device, publish_timeout)
+        except Exception as exc:
+            logger.debug(f"Failed to republish device discovery for {device.name!r}: {exc}")
+
+    def _current_batch(self) -> _BatchRecord | None:
+        return getattr(self._batch_local, "record", None)
+
+    @contextmanager
+    def batch(self, publish_timeout: float | None = None):
+        """Group topology changes made by the current thread into one transaction.
+
+        Inside the block add_*/remove_* apply their changes immediately but defer entity activation,
+        scheduler registration and publishing. On exit every affected device is published once and
+        device deletes are sent together, bounded by one overall publish_timeout (None = don't wait).
+        The publish_timeout of individual calls inside the block is ignored. Nested blocks join the
+        outermost one."""
+        if self._current_batch() is not None:
+            yield self
+            return
+
+        record = _BatchRecord()
+        self._batch_local.record = record
+        try:
+            yield self
+        finally:
+            self._batch_local.record = None
+            self._commit_batch(record, publish_timeout)
+
+    def _commit_batch(self, record: _BatchRecord, publish_timeout: float | None) -> None:
+        with self._runtime_lock:
+            is_active = self._runtime is not None and self._runtime_is_active_unlocked(self._runtime)
+            activate = [entity for entity in dict.fromkeys(record.activate) if entity in self._entity_devices]
+            if is_active and activate:
+                self._activate_entities_runtime(activate)
+            republish = [device for device in record.republish if device in self._device_origins]
+
+        messages = [(topic, partial(self._send_device_delete, topic)) for topics in record.delete.values() for topic in topics]
+        entries_by_topic: Dict[str, DiscoveryCacheEntry] = {}
+        for device in republish:
+            try:
+                entries = self._device_record(device).pending()
             except Exception as exc:
-                logger.debug(f"Failed to republish device discovery for {device.name!r} ({target_topic}): {exc}")
+                logger.debug(f"Failed to build device discovery for {device.name!r}: {exc}")
+                continue
+            entries_by_topic.update((entry.topic, entry) for entry in entries)
+            messages += [(entry.topic, partial(self._publish_attached_entry, device, entry, "Publishing batched discovery"))
+                         for entry in entries]
+
+        if not messages:
+            return
+        logger.info(f"Committing topology batch: {len(record.delete)} device deletes, {len(republish)} devices to republish.")
+
+        def is_delete(message) -> bool:
+            entry = entries_by_topic.get(message[0])
+            return entry is None or entry.is_delete
+
+        if publish_timeout is None:
+            # Not awaited, but the deletes still go out first.
+            for topic, send in sorted(messages, key=lambda message: not is_delete(message)):
+                try:
+                    send()
+                except Exception as exc:
+                    logger.debug(f"Failed to publish batched message ({topic}): {exc}")
+            return
+
+        try:
+            result = self._run_deletes_first(lambda message: message[1](), messages, is_delete, publish_timeout)
+        except Exception as exc:
+            logger.debug(f"Failed to publish topology batch: {exc}")
             return
+        for topic, _send in result.timed_out:
+            if topic in entries_by_topic:
+                self._discovery_cache.mark_unacknowledged(entries_by_topic[topic])
+        if result.timed_out:
+            logger.warning(f"Topology batch: {len(result.timed_out)} publishes not acknowledged before the deadline "
+                           f"({', '.join(topic for topic, _send in result.timed_out)})")
 
     def add_entity(self, entity: HomeAssistantEntityBase, device: HomeAssistantDevice,
                    publish_timeout: float | None = None) -> None:
@@ -382,21 +1030,19 @@ class HomeAssistantConnection:
         is_active = False
 
         with self._runtime_lock:
-            for origin in self._origins:
-                if device in origin._devices:
-                    owner_device = device
-                    break
-
-            if owner_device is None:
+            if device not in self._device_origins:
                 return
+            owner_device = device
 
-            if entity in device._entities:
+            if self._entity_devices.get(entity) is device:
                 return
 
             device._entities.append(entity)
+            device.mark_dirty()
+            self._index_entity(entity, device)
             is_active = self._runtime is not None and self._runtime_is_active_unlocked(self._runtime)
-            if is_active:
-                self._activate_entity_runtime(entity)
+            if is_active or self._current_batch() is not None:
+                self._activate_entities([entity])
 
         self._republish_device_discovery(owner_device, publish_timeout)
 
@@ -407,32 +1053,24 @@ class HomeAssistantConnection:
         is_active = False
 
         with self._runtime_lock:
-            if origin not in self._origins:
+            if origin._topology_listener is not self:
                 return
 
-            if device in origin._devices:
+            if self._device_origins.get(device) is origin:
                 return
 
             origin._devices.append(device)
+            self._index_device(device, origin)
             is_active = self._runtime is not None and self._runtime_is_active_unlocked(self._runtime)
-            if is_active:
-                for entity in device.entities:
-                    self._activate_entity_runtime(entity)
+            if is_active or self._current_batch() is not None:
+                self._activate_entities(list(device.entities))
 
         self._republish_device_discovery(device, publish_timeout)
 
     def remove_entity(self, entity: HomeAssistantEntityBase, publish_timeout: float | None = None) -> None:
         """Remove an entity from its device. Idempotent and thread-safe — safe to call while run() is active."""
         with self._runtime_lock:
-            owner_device: HomeAssistantDevice | None = None
-            for origin in self._origins:
-                for device in origin._devices:
-                    if entity in device._entities:
-                        owner_device = device
-                        break
-                if owner_device is not None:
-                    break
-
+            owner_device = self._entity_devices.get(entity)
             if owner_device is None:
                 return
 
@@ -441,18 +1079,15 @@ class HomeAssistantConnection:
                 owner_device._entities.remove(entity)
             except ValueError:
                 pass
+            owner_device.mark_dirty()
+            self._unindex_entity(entity)
 
         self._republish_device_discovery(owner_device, publish_timeout)
 
     def remove_device(self, device: HomeAssistantDevice, publish_timeout: float | None = None) -> None:
         """Remove a device from its origin and from Home Assistant. Idempotent and thread-safe."""
         with self._runtime_lock:
-            owner_origin: HomeAssistantOrigin | None = None
-            for origin in self._origins:
-                if device in origin._devices:
-                    owner_origin = origin
-                    break
-
+            owner_origin = self._device_origins.get(device)
             if owner_origin is None:
                 return
 
@@ -463,27 +1098,29 @@ class HomeAssistantConnection:
                 owner_origin._devices.remove(device)
             except ValueError:
                 pass
+            self._unindex_device(device)
 
-        self._publish_device_delete(device, publish_timeout)
+        self._publish_device_deletes([device], publish_timeout)
 
     def remove_origin(self, origin: HomeAssistantOrigin, publish_timeout: float | None = None) -> None:
         """Remove an origin and clear all its devices from Home Assistant. Idempotent and thread-safe."""
         with self._runtime_lock:
-            if origin not in self._origins:
+            if origin._topology_listener is not self:
                 return
 
             devices = list(origin._devices)
             for device in devices:
                 for entity in list(device.entities):
                     self._cleanup_entity_runtime(entity)
+                self._unindex_device(device)
 
             try:
                 self._origins.remove(origin)
             except ValueError:
                 pass
+            origin.internal_attach(None)
 
-        for device in devices:
-            self._publish_device_delete(device, publish_timeout)
+        self._publish_device_deletes(devices, publish_timeout)
 
     def stop(self, timeout: float | None = None) -> None:
         runtime = self.runtime()
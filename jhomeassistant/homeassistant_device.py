@@ -6,8 +6,11 @@ from jhomeassistant.features import Availability
 from jhomeassistant.features.availability.availability_source import AvailabilitySource
 from jhomeassistant.helper import get_default_entity_id, validate_non_empty_string
 from jhomeassistant.entities import HomeAssistantEntityBase
-from jhomeassistant.helper.abbreviations import DeviceAbbreviation, Abbreviation
+from jhomeassistant.helper.device_facts_provider import device_facts
+from jhomeassistant.helper.abbreviations import DeviceAbbreviation, Abbreviation, KeyTable, FULL_KEYS
+from jhomeassistant.helper.dirty_tracking import DirtyTracked
 from jhomeassistant.setup_logging import get_logger as _get_logger
+from jhomeassistant.types.discovery_mode import DiscoveryMode
 
 logger = _get_logger("HomeAssistantDevice")
 
@@ -27,7 +30,9 @@ def get_identifier_default(serial_number, connections):
     return identifiers
 
 
-class HomeAssistantDevice:
+class HomeAssistantDevice(DirtyTracked):
+    _UNTRACKED_ATTRIBUTES = frozenset({"_topology_listener", "_unique_id_token"})
+
     def __init__(self, name: str, identifier: str | None = None):
         """
         Args:
@@ -35,7 +40,8 @@ class HomeAssistantDevice:
             identifier: Stable identifier string for this device (e.g. a remote agent's MAC address).
                 If provided, auto-detection of local hardware (serial number, MAC) is skipped
                 and this string is hashed as the sole device identifier.
-                If None, identifiers are auto-detected from local hardware.
+                If None, identifiers are auto-detected from local hardware when they are first needed;
+                the host facts are collected once per process (see ``jhomeassistant.helper.device_facts``).
                 Additional identifiers can be appended afterwards via ``device.identifiers.append(...)``.
         """
         validate_non_empty_string(name, "Device 'name'")
@@ -45,15 +51,11 @@ class HomeAssistantDevice:
         if identifier is not None:
             self.serial_number = None
             self.connections = []
-            self.identifiers: List[str] = [client_identity.hashing.build_urlsafe_token(identifier)]
-        else:
-            self.serial_number, self.connections = client_identity.facts.collect_device_facts()
-            self.identifiers: List[str] = get_identifier_default(self.serial_number, self.connections)
-
-        if not self.identifiers:
-            logger.error("No device identifiers could be derived. Set at least one identifier explicitly before discovery.")
-        else:
+            self.identifiers = [client_identity.hashing.build_urlsafe_token(identifier)]
             logger.info(f"Using device identifiers for {self.name}: {self.identifiers}")
+        else:
+            # Host facts are collected (once per process, see device_facts) when identifiers are first needed.
+            self._facts_pending = True
 
         self.manufacturer: str | None = None
         self.model: str | None = None
@@ -65,18 +67,68 @@ class HomeAssistantDevice:
 
         self.qos: QoS | None = None
         self.encoding: str | None = None
+        self.discovery_mode = DiscoveryMode.DEVICE
 
         self.availability = Availability(source=AvailabilitySource.DEVICE)
         self._entities: List[HomeAssistantEntityBase] = []
+        self._topology_listener = None
+        self._identity_snapshot = None
+        # (first identifier, name, token) of the last unique_id computation; recomputed when either input changes.
+        self._unique_id_token: tuple | None = None
+
+    def _resolve_identity(self) -> None:
+        if not vars(self).get("_facts_pending"):
+            return
+        serial_number, connections = device_facts.get()
+        # Filling in deferred facts is not a change of the device, so bypass dirty tracking.
+        object.__setattr__(self, "_serial_number", serial_number)
+        object.__setattr__(self, "_connections", connections)
+        object.__setattr__(self, "_identifiers", get_identifier_default(serial_number, connections))
+        object.__setattr__(self, "_facts_pending", False)
+
+        if not self._identifiers:
+            logger.error("No device identifiers could be derived. Set at least one identifier explicitly before discovery.")
+        else:
+            logger.info(f"Using device identifiers for {self.name}: {self._identifiers}")
+
+    @property
+    def serial_number(self) -> str | None:
+        self._resolve_identity()
+        return self._serial_number
+
+    @serial_number.setter
+    def serial_number(self, value: str | None):
+        self._resolve_identity()
+        self._serial_number = value
+
+    @property
+    def connections(self) -> List:
+        self._resolve_identity()
+        return self._connections
+
+    @connections.setter
+    def connections(self, value: List):
+        self._resolve_identity()
+        self._connections = value
+
+    @property
+    def identifiers(self) -> List[str]:
+        self._resolve_identity()
+        return self._identifiers
 
-    def _to_dict(self):
+    @identifiers.setter
+    def identifiers(self, value: List[str]):
+        self._resolve_identity()
+        self._identifiers = value
+
+    def _to_dict(self, keys: KeyTable):
         result = {
-            DeviceAbbreviation.NAME: self.name,
-            DeviceAbbreviation.IDS: self.identifiers,
+            keys[DeviceAbbreviation.NAME]: self.name,
+            keys[DeviceAbbreviation.IDS]: self.identifiers,
         }
 
         if len(self.connections) > 0:
-            result[DeviceAbbreviation.CONNECTIONS] = self.connections
+            result[keys[DeviceAbbreviation.CONNECTIONS]] = self.connections
 
         for abbr, value in (
                 (DeviceAbbreviation.SERIAL_NUMBER, self.serial_number),
@@ -89,46 +141,93 @@ class HomeAssistantDevice:
                 (DeviceAbbreviation.URL, self.configuration_url),
         ):
             if value is not None:
-                result[abbr] = value
+                result[keys[abbr]] = value
 
         return {
-            Abbreviation.DEVICE: result
+            keys[Abbreviation.DEVICE]: result
         }
 
     @property
     def unique_id(self):
-        return client_identity.hashing.build_urlsafe_token(self.identifiers[0], 32, self.name)
+        identifier, cached = self.identifiers[0], self._unique_id_token
+        if cached is None or cached[0] != identifier or cached[1] != self.name:
+            cached = self._unique_id_token = (identifier, self.name,
+                                              client_identity.hashing.build_urlsafe_token(identifier, 32, self.name))
+        return cached[2]
 
     @property
     def entities(self) -> List[HomeAssistantEntityBase]:
         return self._entities
 
+    @property
+    def internal_revision(self) -> int:
+        # identifiers/connections may be mutated in place (e.g. identifiers.append), which bypasses __setattr__.
+        identity = (tuple(self.identifiers), tuple(self.connections))
+        if identity != self._identity_snapshot:
+            self._identity_snapshot = identity
+        return max(
+            self._revision,
+            self.availability.internal_revision,
+            max((e.internal_revision for e in self._entities), default=0),
+        )
+
     def add_entities(self, *entities: HomeAssistantEntityBase) -> HomeAssistantDevice:
         self._entities.extend(entities)
+        self.mark_dirty()
         logger.info(f"Added {len(entities)} entities to device {self.name}. Total={len(self._entities),}")
+        if self._topology_listener is not None:
+            self._topology_listener.internal_entities_added(self, entities)
         return self
 
-    def internal_discovery(self, discovery_prefix):
+    def internal_attach(self, listener) -> None:
+        """Register the connection that indexes this device's entities (None to detach)."""
+        self._topology_listener = listener
+
+    def internal_entity_unique_id(self, entity: HomeAssistantEntityBase, device_unique_id: str | None = None) -> str:
+        return f"{device_unique_id or self.unique_id}-{entity.identifier}"
+
+    def internal_discovery_topic(self, discovery_prefix: str, part: int = 0, device_unique_id: str | None = None) -> str:
+        """Topic of the device discovery object. Parts > 0 hold components split off an oversized payload."""
+        node_id = device_unique_id or self.unique_id
+        if part:
+            node_id = f"{node_id}_{part}"
+        return f"{discovery_prefix}/device/{node_id}/config"
+
+    def internal_prepare(self) -> None:
+        """Merge device availability into entities that define their own. Idempotent."""
+        for entity in self._entities:
+            if entity.availability.active:
+                entity.availability.internal_merge(self.availability)
+
+    def internal_discovery_sections(self, discovery_prefix, keys: KeyTable = FULL_KEYS):
+        """Return the discovery topic and the ordered root payload. The components key maps to a
+        generator of (unique_id, component payload) pairs, so encoders can stream the components."""
         if len(self.identifiers) == 0:
             raise ValueError("At least one identifier must be specified. Use HomeAssistantDevice.identifiers to set one.")
 
-        discovery_topic = f"{discovery_prefix}/device/{self.unique_id}/config"
+        self.internal_prepare()
+
+        device_unique_id = self.unique_id
+        discovery_topic = self.internal_discovery_topic(discovery_prefix, device_unique_id=device_unique_id)
         include_root_availability = not all(e.availability.active for e in self._entities)
 
         discovery_payload = {
-            **self._to_dict(),
-            Abbreviation.COMPONENTS: {},
-            **(self.availability.internal_to_dict() if include_root_availability else {}),
+            **self._to_dict(keys),
+            keys[Abbreviation.COMPONENTS]: self._components_gen(device_unique_id, keys),
+            **(self.availability.internal_to_dict(keys) if include_root_availability else {}),
         }
 
         if self.qos is not None:
             discovery_payload["qos"] = self.qos.value
         if self.encoding is not None:
-            discovery_payload[Abbreviation.ENCODING] = self.encoding
+            discovery_payload[keys[Abbreviation.ENCODING]] = self.encoding
 
+        return discovery_topic, discovery_payload
+
+    def _components_gen(self, device_unique_id: str, keys: KeyTable):
         entity_ids: set[str] = set()
         for entity in self._entities:
-            unique_id = f"{self.unique_id}-{entity.identifier}"
+            unique_id = self.internal_entity_unique_id(entity, device_unique_id)
             default_entity_id = get_default_entity_id(entity.platform, self.name, entity.name)
 
             if unique_id in entity_ids:
@@ -136,13 +235,29 @@ class HomeAssistantDevice:
                                  f"Entity names must yield unique identifiers per device. Either update device.identifiers[0] or entity.name")
             entity_ids.add(unique_id)
 
-            if entity.availability.active:
-                entity.availability.internal_merge(self.availability)
-
-            discovery_payload[Abbreviation.COMPONENTS][unique_id] = {
-                Abbreviation.UNIQUE_ID: unique_id,
-                Abbreviation.DEFAULT_ENTITY_ID: default_entity_id,
-                **entity.internal_discovery_payload
+            yield unique_id, {
+                keys[Abbreviation.UNIQUE_ID]: unique_id,
+                keys[Abbreviation.DEFAULT_ENTITY_ID]: default_entity_id,
+                **entity.internal_discovery_payload(keys)
             }
 
+    def internal_component_discovery_sections(self, discovery_prefix, keys: KeyTable = FULL_KEYS):
+        """Per-component counterpart of internal_discovery_sections. Returns the root sections every
+        component repeats (device block, root availability, qos, encoding) and a generator of
+        (topic, component payload) pairs for ``<prefix>/<component>/<node_id>/<object_id>/config``."""
+        _discovery_topic, root = self.internal_discovery_sections(discovery_prefix, keys)
+        root.pop(keys[Abbreviation.COMPONENTS]).close()
+        return root, self._component_topics_gen(discovery_prefix, self.unique_id, keys)
+
+    def _component_topics_gen(self, discovery_prefix: str, device_unique_id: str, keys: KeyTable):
+        platform_key = keys[Abbreviation.PLATFORM]
+        for entity, (_unique_id, component) in zip(self._entities, self._components_gen(device_unique_id, keys)):
+            # The component is part of the topic; the platform key is only meaningful in device discovery.
+            component.pop(platform_key)
+            yield f"{discovery_prefix}/{entity.platform.value}/{device_unique_id}/{entity.identifier}/config", component
+
+    def internal_discovery(self, discovery_prefix, keys: KeyTable = FULL_KEYS):
+        discovery_topic, discovery_payload = self.internal_discovery_sections(discovery_prefix, keys)
+        components_key = keys[Abbreviation.COMPONENTS]
+        discovery_payload[components_key] = dict(discovery_payload[components_key])
         return discovery_topic, discovery_payload
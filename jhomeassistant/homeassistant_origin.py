@@ -7,14 +7,17 @@ from jmqtt import QualityOfService as QoS
 from jhomeassistant.features import Availability
 from jhomeassistant.features.availability.availability_source import AvailabilitySource
 from jhomeassistant.helper import validate_non_empty_string
-from jhomeassistant.helper.abbreviations import OriginAbbreviation, Abbreviation
+from jhomeassistant.helper.abbreviations import OriginAbbreviation, Abbreviation, KeyTable, FULL_KEYS
+from jhomeassistant.helper.dirty_tracking import DirtyTracked
 from jhomeassistant.homeassistant_device import HomeAssistantDevice
 from jhomeassistant.setup_logging import get_logger
 
 logger = get_logger("HomeAssistantOrigin")
 
 
-class HomeAssistantOrigin:
+class HomeAssistantOrigin(DirtyTracked):
+    _UNTRACKED_ATTRIBUTES = frozenset({"_devices", "_topology_listener"})
+
     def __init__(self, name: str, sw_version: str | None = None, url: str | None = None):
         self.name = name
         self.sw_version = sw_version
@@ -23,6 +26,7 @@ class HomeAssistantOrigin:
         self.qos: QoS | None = None
         self.encoding: str | None = None
         self._devices: List[HomeAssistantDevice] = []
+        self._topology_listener = None
 
     @property
     def name(self) -> str:
@@ -51,27 +55,52 @@ class HomeAssistantOrigin:
     def add_devices(self, *devices: HomeAssistantDevice) -> HomeAssistantOrigin:
         for device in devices:
             self._devices.append(device)
+        if self._topology_listener is not None:
+            self._topology_listener.internal_devices_added(self, devices)
         return self
 
-    def _to_origin_dict(self) -> dict:
-        result = {OriginAbbreviation.NAME: self._name}
+    def internal_attach(self, listener) -> None:
+        """Register the connection that indexes this origin's devices (None to detach)."""
+        self._topology_listener = listener
+
+    def _to_origin_dict(self, keys: KeyTable) -> dict:
+        result = {keys[OriginAbbreviation.NAME]: self._name}
         if self._sw_version:
-            result[OriginAbbreviation.SW] = self._sw_version
+            result[keys[OriginAbbreviation.SW]] = self._sw_version
         if self._url:
-            result[OriginAbbreviation.URL] = self._url
-        return {Abbreviation.ORIGIN: result}
-
-    def _discovery_gen(self, discovery_prefix: str):
+            result[keys[OriginAbbreviation.URL]] = self._url
+        return {keys[Abbreviation.ORIGIN]: result}
+
+    def internal_inherit(self, device: HomeAssistantDevice) -> None:
+        """Apply origin-level QoS/encoding/availability to the device. Idempotent."""
+        if device.qos is None and self.qos is not None:
+            device.qos = self.qos
+            logger.info(f"Inherit origin QoS={self.qos.name} to device {device.name}")
+        if device.encoding is None and self.encoding is not None:
+            device.encoding = self.encoding
+            logger.info(f"Inherit origin encoding={self.encoding} to device {device.name}")
+
+        device.availability.internal_merge(self.availability)
+        device.internal_prepare()
+
+    def internal_device_discovery_sections(self, device: HomeAssistantDevice, discovery_prefix: str, keys: KeyTable = FULL_KEYS):
+        """Streaming counterpart of internal_device_discovery, see HomeAssistantDevice.internal_discovery_sections."""
+        discovery_topic, discovery_payload = device.internal_discovery_sections(discovery_prefix, keys)
+        discovery_payload.update(self._to_origin_dict(keys))
+        return discovery_topic, discovery_payload
+
+    def internal_component_discovery_sections(self, device: HomeAssistantDevice, discovery_prefix: str, keys: KeyTable = FULL_KEYS):
+        """Per-component counterpart of internal_device_discovery_sections."""
+        root, components = device.internal_component_discovery_sections(discovery_prefix, keys)
+        root.update(self._to_origin_dict(keys))
+        return root, components
+
+    def internal_device_discovery(self, device: HomeAssistantDevice, discovery_prefix: str, keys: KeyTable = FULL_KEYS):
+        discovery_topic, discovery_payload = device.internal_discovery(discovery_prefix, keys)
+        discovery_payload.update(self._to_origin_dict(keys))
+        return discovery_topic, discovery_payload
+
+    def _discovery_gen(self, discovery_prefix: str, keys: KeyTable = FULL_KEYS):
         for device in self._devices:
-            if device.qos is None and self.qos is not None:
-                device.qos = self.qos
-                logger.info(f"Inherit origin QoS={self.qos.name} to device {device.name}")
-            if device.encoding is None and self.encoding is not None:
-                device.encoding = self.encoding
-                logger.info(f"Inherit origin encoding={self.encoding} to device {device.name}")
-
-            device.availability.internal_merge(self.availability)
-
-            discovery_topic, discovery_payload = device.internal_discovery(discovery_prefix)
-            discovery_payload = {**discovery_payload, **self._to_origin_dict()}
-            yield discovery_topic, discovery_payload
+            self.internal_inherit(device)
+            yield self.internal_device_discovery(device, discovery_prefix, keys)
@@ -1,10 +1,11 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Dict, List
 
 from jhomeassistant.homeassistant_runtime_record import _RuntimeRecord
 
 if TYPE_CHECKING:
+    from jhomeassistant.helper.scheduler import ScheduleStats
     from jhomeassistant.homeassistant_connection import HomeAssistantConnection
 
 
@@ -26,3 +27,8 @@ class HomeAssistantRuntime:
     @property
     def last_error(self) -> Exception | None:
         return self._owner._runtime_last_error(self._record)
+
+    def scheduler_stats(self) -> Dict[str, List[ScheduleStats]]:
+        """Counters of every entity's schedules (runs, failures, overruns, timings), keyed by entity unique_id,
+        and of every schedule group, keyed by group name."""
+        return self._owner._runtime_scheduler_stats(self._record)
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import threading
+from typing import Any, Callable, Dict, List, Mapping, Tuple
+
+from jmqtt import QualityOfService as QoS
+
+from jhomeassistant.entities import StatefulEntity
+from jhomeassistant.helper.publish_pipeline import PublishResult, wait_for_all
+from jhomeassistant.helper.scheduler import Schedule
+from jhomeassistant.setup_logging import get_logger
+
+logger = get_logger("HomeAssistantScheduleGroup")
+
+
+class HomeAssistantScheduleGroup:
+    """
+    One collector for many entities, e.g. a single bus read that fills hundreds of sensors.
+
+    Every interval the collector is called once and returns a mapping of entity to value. Values that
+    differ from the last published one are published back to back (``entity.publish(value)``, a tuple
+    is unpacked into the arguments) and awaited together with one overall ``publish_timeout``.
+    Register the group with ``HomeAssistantConnection.add_schedule_group``.
+    """
+
+    def __init__(self, interval: float, collector: Callable[[], Mapping[StatefulEntity, Any]],
+                 qos: QoS = QoS.AtMostOnce, retain: bool = False, publish_timeout: float | None = None,
+                 name: str | None = None, **schedule_options):
+        """
+        Args:
+            interval: Seconds between two collections.
+            collector: Called without arguments; returns {entity: value} for the entities to update.
+            qos, retain: Used for every state publish of the group.
+            publish_timeout: Overall deadline for acknowledging one collection's publishes (QoS > 0).
+            name: Key of the group in runtime.scheduler_stats(); defaults to the collector's qualified name.
+            schedule_options: Forwarded to Schedule (max_concurrency, overrun, timeout, phase, jitter, catch_up,
+                adaptive).
+        """
+        self._collector = collector
+        self.name = name or getattr(collector, "__qualname__", None) or repr(collector)
+        self.qos = qos
+        self.retain = retain
+        self.publish_timeout = publish_timeout
+        self._last_values: Dict[StatefulEntity, Any] = {}
+        self._lock = threading.Lock()
+        self._is_attached: Callable[[StatefulEntity], bool] = lambda _entity: True
+        self.last_result: PublishResult[StatefulEntity] = PublishResult()
+        self.schedule = Schedule(interval, self._collect_and_publish, **schedule_options)
+
+    def internal_attach(self, is_attached: Callable[[StatefulEntity], bool]) -> None:
+        """Called by the connection: entities rejected by is_attached are not published."""
+        self._is_attached = is_attached
+
+    def invalidate(self, *entities: StatefulEntity) -> None:
+        """Forget the last published values (of the given entities, or all) so the next collection publishes them."""
+        with self._lock:
+            if not entities:
+                self._last_values.clear()
+            for entity in entities:
+                self._last_values.pop(entity, None)
+
+    def _changed(self, values: Mapping[StatefulEntity, Any]) -> List[Tuple[StatefulEntity, Any]]:
+        changed = []
+        with self._lock:
+            for entity, value in values.items():
+                if entity in self._last_values and self._last_values[entity] == value:
+                    continue
+                if not self._is_attached(entity):
+                    logger.debug(f"Schedule group skipped entity {entity.name!r}: not attached to the connection")
+                    continue
+                changed.append((entity, value))
+        return changed
+
+    def _collect_and_publish(self, _connection) -> Mapping[StatefulEntity, Any] | None:
+        """Returns the collected values, so an AdaptiveInterval in schedule_options can follow them."""
+        values = self._collector()
+        if not values:
+            return None
+
+        sent = []
+        for entity, value in self._changed(values):
+            try:
+                arguments = value if isinstance(value, tuple) else (value,)
+                info = entity.publish(*arguments, qos=self.qos, retain=self.retain)
+            except Exception as exc:
+                logger.warning(f"Schedule group failed to publish entity {entity.name!r}: {exc}")
+                continue
+            with self._lock:
+                self._last_values[entity] = value
+            sent.append((entity, info))
+
+        if self.qos != QoS.AtMostOnce:
+            self.last_result = wait_for_all(sent, self.publish_timeout)
+            if self.last_result.timed_out:
+                logger.warning(f"Schedule group: {len(self.last_result.timed_out)} of {len(sent)} state publishes "
+                               f"were not acknowledged within {self.publish_timeout}s")
+                self.invalidate(*self.last_result.timed_out)
+        else:
+            self.last_result = PublishResult(acknowledged=[entity for entity, _info in sent])
+        return values
@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+from importlib import import_module
+from typing import Callable, Dict, List, Tuple
+
+
+def lazy_exports(package: str, exports: Dict[str, str], namespace: dict) -> Tuple[Callable[[str], object], Callable[[], List[str]]]:
+    """
+    Build a package's module-level ``__getattr__`` and ``__dir__`` that import exported names on first access.
+
+    ``exports`` maps every public name to the module defining it, relative to ``package``. A name mapped
+    to its own submodule (``"units": ".units"``) exposes the submodule itself. Resolved values are
+    stored in ``namespace`` (the package globals), so each name is imported once.
+    """
+
+    def __getattr__(name: str):
+        module_name = exports.get(name)
+        if module_name is None:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        module = import_module(module_name, package)
+        value = module if module_name == f".{name}" else getattr(module, name)
+        namespace[name] = value
+        return value
+
+    def __dir__() -> List[str]:
+        return sorted({*namespace, *exports})
+
+    return __getattr__, __dir__
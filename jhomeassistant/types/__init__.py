@@ -1,3 +1,28 @@
-from .availability_mode import AvailabilityMode
-from .entity_category import EntityCategory
-from .component import Component
+from typing import TYPE_CHECKING
+
+from jhomeassistant.lazy_import import lazy_exports
+
+if TYPE_CHECKING:
+    from .availability_mode import AvailabilityMode
+    from .entity_category import EntityCategory
+    from .component import Component
+    from .discovery_mode import DiscoveryMode
+    from .overrun_policy import OverrunPolicy
+    from .catch_up_policy import CatchUpPolicy
+    from . import device_classes
+    from . import units
+
+_EXPORTS = {
+    "AvailabilityMode": ".availability_mode",
+    "EntityCategory": ".entity_category",
+    "Component": ".component",
+    "DiscoveryMode": ".discovery_mode",
+    "OverrunPolicy": ".overrun_policy",
+    "CatchUpPolicy": ".catch_up_policy",
+    "device_classes": ".device_classes",
+    "units": ".units",
+}
+
+__all__ = list(_EXPORTS)
+
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS, globals())
@@ -0,0 +1,12 @@
+from enum import StrEnum
+
+
+class CatchUpPolicy(StrEnum):
+    """
+    What a fixed-rate schedule does with ticks it missed (e.g. after a slow run or a suspended host).
+
+    - SKIP:    Run once for all missed ticks and continue with the next tick on the original grid.
+    - RUN_ALL: Run once per missed tick, back to back, until the schedule is on time again.
+    """
+    SKIP = "skip"
+    RUN_ALL = "run_all"
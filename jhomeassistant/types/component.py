@@ -1,9 +1,5 @@
 from enum import Enum
 
-from jhomeassistant.types.device_classes import SensorDeviceClass, NumberDeviceClass, BinarySensorDeviceClass, \
-    ButtonDeviceClass, CoverDeviceClass, EventDeviceClass, ValveDeviceClass, UpdateDeviceClass, SwitchDeviceClass, \
-    MediaPlayerDeviceClass, HumidifierDeviceClass
-
 
 class Component(Enum):
     BINARY_SENSOR = "binary_sensor"
@@ -21,6 +17,10 @@ class Component(Enum):
 
     @property
     def device_class(self):
+        from jhomeassistant.types.device_classes import SensorDeviceClass, NumberDeviceClass, BinarySensorDeviceClass, \
+            ButtonDeviceClass, CoverDeviceClass, EventDeviceClass, ValveDeviceClass, UpdateDeviceClass, SwitchDeviceClass, \
+            MediaPlayerDeviceClass, HumidifierDeviceClass
+
         return {
             Component.SENSOR: SensorDeviceClass,
             Component.NUMBER: NumberDeviceClass,
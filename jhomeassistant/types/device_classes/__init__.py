@@ -1,11 +1,34 @@
-from .number_device_class import NumberDeviceClass
-from .sensor_device_class import SensorDeviceClass
-from .binary_sensor_device_class import BinarySensorDeviceClass
-from .button_device_class import ButtonDeviceClass
-from .cover_device_class import CoverDeviceClass
-from .event_device_class import EventDeviceClass
-from .valve_device_class import ValveDeviceClass
-from .switch_device_class import SwitchDeviceClass
-from .update_device_class import UpdateDeviceClass
-from .humidifier_device_class import HumidifierDeviceClass
-from .media_player_device_class import MediaPlayerDeviceClass
+from typing import TYPE_CHECKING
+
+from jhomeassistant.lazy_import import lazy_exports
+
+if TYPE_CHECKING:
+    from .number_device_class import NumberDeviceClass
+    from .sensor_device_class import SensorDeviceClass
+    from .binary_sensor_device_class import BinarySensorDeviceClass
+    from .button_device_class import ButtonDeviceClass
+    from .cover_device_class import CoverDeviceClass
+    from .event_device_class import EventDeviceClass
+    from .valve_device_class import ValveDeviceClass
+    from .switch_device_class import SwitchDeviceClass
+    from .update_device_class import UpdateDeviceClass
+    from .humidifier_device_class import HumidifierDeviceClass
+    from .media_player_device_class import MediaPlayerDeviceClass
+
+_EXPORTS = {
+    "NumberDeviceClass": ".number_device_class",
+    "SensorDeviceClass": ".sensor_device_class",
+    "BinarySensorDeviceClass": ".binary_sensor_device_class",
+    "ButtonDeviceClass": ".button_device_class",
+    "CoverDeviceClass": ".cover_device_class",
+    "EventDeviceClass": ".event_device_class",
+    "ValveDeviceClass": ".valve_device_class",
+    "SwitchDeviceClass": ".switch_device_class",
+    "UpdateDeviceClass": ".update_device_class",
+    "HumidifierDeviceClass": ".humidifier_device_class",
+    "MediaPlayerDeviceClass": ".media_player_device_class",
+}
+
+__all__ = list(_EXPORTS)
+
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS, globals())
@@ -1,13 +1,6 @@
+from functools import lru_cache
+
 from jhomeassistant.types.device_classes.base_device_class import BaseDeviceClass
-from jhomeassistant.types.units import AbsoluteHumidityUnit, ApparentPowerUnit, AreaUnit, AtmosphericPressureUnit, \
-    BatteryUnit, BloodGlucoseConcentrationUnit, CarbonDioxideUnit, CarbonMonoxideNumberUnit, CurrentUnit, DataRateUnit, \
-    DataSizeUnit, DistanceUnit, DurationUnit, EnergyUnit, EnergyDistanceUnit, EnergyStorageUnit, FrequencyUnit, \
-    GasUnit, HumidityUnit, IlluminanceUnit, IrradianceUnit, MoistureUnit, MonetaryUnit, NitrogenDioxideUnit, \
-    NitrogenMonoxideUnit, NitrousOxideUnit, OzoneUnit, Pm1Unit, Pm25Unit, Pm4Unit, Pm10Unit, PowerUnit, \
-    PowerFactorUnit, PrecipitationUnit, PrecipitationIntensityUnit, PressureNumberUnit, ReactiveEnergyUnit, \
-    ReactivePowerUnit, SignalStrengthUnit, SoundPressureUnit, SpeedUnit, SulphurDioxideUnit, TemperatureUnit, \
-    VolatileOrganicCompoundsUnit, VolatileOrganicCompoundsPartsUnit, VoltageUnit, VolumeUnit, VolumeFlowRateNumberUnit, \
-    VolumeStorageUnit, WaterUnit, WeightUnit, WindDirectionUnit, WindSpeedUnit
 
 
 class NumberDeviceClass(BaseDeviceClass):
@@ -70,58 +63,73 @@ class NumberDeviceClass(BaseDeviceClass):
 
     @property
     def unit(self):
-        return {
-            NumberDeviceClass.ABSOLUTE_HUMIDITY: AbsoluteHumidityUnit,
-            NumberDeviceClass.APPARENT_POWER: ApparentPowerUnit,
-            NumberDeviceClass.AREA: AreaUnit,
-            NumberDeviceClass.ATMOSPHERIC_PRESSURE: AtmosphericPressureUnit,
-            NumberDeviceClass.BATTERY: BatteryUnit,
-            NumberDeviceClass.BLOOD_GLUCOSE_CONCENTRATION: BloodGlucoseConcentrationUnit,
-            NumberDeviceClass.CARBON_DIOXIDE: CarbonDioxideUnit,
-            NumberDeviceClass.CARBON_MONOXIDE: CarbonMonoxideNumberUnit,
-            NumberDeviceClass.CURRENT: CurrentUnit,
-            NumberDeviceClass.DATA_RATE: DataRateUnit,
-            NumberDeviceClass.DATA_SIZE: DataSizeUnit,
-            NumberDeviceClass.DISTANCE: DistanceUnit,
-            NumberDeviceClass.DURATION: DurationUnit,
-            NumberDeviceClass.ENERGY: EnergyUnit,
-            NumberDeviceClass.ENERGY_DISTANCE: EnergyDistanceUnit,
-            NumberDeviceClass.ENERGY_STORAGE: EnergyStorageUnit,
-            NumberDeviceClass.FREQUENCY: FrequencyUnit,
-            NumberDeviceClass.GAS: GasUnit,
-            NumberDeviceClass.HUMIDITY: HumidityUnit,
-            NumberDeviceClass.ILLUMINANCE: IlluminanceUnit,
-            NumberDeviceClass.IRRADIANCE: IrradianceUnit,
-            NumberDeviceClass.MOISTURE: MoistureUnit,
-            NumberDeviceClass.MONETARY: MonetaryUnit,
-            NumberDeviceClass.NITROGEN_DIOXIDE: NitrogenDioxideUnit,
-            NumberDeviceClass.NITROGEN_MONOXIDE: NitrogenMonoxideUnit,
-            NumberDeviceClass.NITROUS_OXIDE: NitrousOxideUnit,
-            NumberDeviceClass.OZONE: OzoneUnit,
-            NumberDeviceClass.PM1: Pm1Unit,
-            NumberDeviceClass.PM25: Pm25Unit,
-            NumberDeviceClass.PM4: Pm4Unit,
-            NumberDeviceClass.PM10: Pm10Unit,
-            NumberDeviceClass.POWER: PowerUnit,
-            NumberDeviceClass.POWER_FACTOR: PowerFactorUnit,
-            NumberDeviceClass.PRECIPITATION: PrecipitationUnit,
-            NumberDeviceClass.PRECIPITATION_INTENSITY: PrecipitationIntensityUnit,
-            NumberDeviceClass.PRESSURE: PressureNumberUnit,
-            NumberDeviceClass.REACTIVE_ENERGY: ReactiveEnergyUnit,
-            NumberDeviceClass.REACTIVE_POWER: ReactivePowerUnit,
-            NumberDeviceClass.SIGNAL_STRENGTH: SignalStrengthUnit,
-            NumberDeviceClass.SOUND_PRESSURE: SoundPressureUnit,
-            NumberDeviceClass.SPEED: SpeedUnit,
-            NumberDeviceClass.SULPHUR_DIOXIDE: SulphurDioxideUnit,
-            NumberDeviceClass.TEMPERATURE: TemperatureUnit,
-            NumberDeviceClass.VOLATILE_ORGANIC_COMPOUNDS: VolatileOrganicCompoundsUnit,
-            NumberDeviceClass.VOLATILE_ORGANIC_COMPOUNDS_PARTS: VolatileOrganicCompoundsPartsUnit,
-            NumberDeviceClass.VOLTAGE: VoltageUnit,
-            NumberDeviceClass.VOLUME: VolumeUnit,
-            NumberDeviceClass.VOLUME_FLOW_RATE: VolumeFlowRateNumberUnit,
-            NumberDeviceClass.VOLUME_STORAGE: VolumeStorageUnit,
-            NumberDeviceClass.WATER: WaterUnit,
-            NumberDeviceClass.WEIGHT: WeightUnit,
-            NumberDeviceClass.WIND_DIRECTION: WindDirectionUnit,
-            NumberDeviceClass.WIND_SPEED: WindSpeedUnit
-        }.get(self, super().unit)
+        return _units_by_device_class().get(self, super().unit)
+
+
+@lru_cache(maxsize=None)
+def _units_by_device_class():
+    from jhomeassistant.types.units import AbsoluteHumidityUnit, ApparentPowerUnit, AreaUnit, AtmosphericPressureUnit, \
+        BatteryUnit, BloodGlucoseConcentrationUnit, CarbonDioxideUnit, CarbonMonoxideNumberUnit, CurrentUnit, DataRateUnit, \
+        DataSizeUnit, DistanceUnit, DurationUnit, EnergyUnit, EnergyDistanceUnit, EnergyStorageUnit, FrequencyUnit, \
+        GasUnit, HumidityUnit, IlluminanceUnit, IrradianceUnit, MoistureUnit, MonetaryUnit, NitrogenDioxideUnit, \
+        NitrogenMonoxideUnit, NitrousOxideUnit, OzoneUnit, Pm1Unit, Pm25Unit, Pm4Unit, Pm10Unit, PowerUnit, \
+        PowerFactorUnit, PrecipitationUnit, PrecipitationIntensityUnit, PressureNumberUnit, ReactiveEnergyUnit, \
+        ReactivePowerUnit, SignalStrengthUnit, SoundPressureUnit, SpeedUnit, SulphurDioxideUnit, TemperatureUnit, \
+        VolatileOrganicCompoundsUnit, VolatileOrganicCompoundsPartsUnit, VoltageUnit, VolumeUnit, VolumeFlowRateNumberUnit, \
+        VolumeStorageUnit, WaterUnit, WeightUnit, WindDirectionUnit, WindSpeedUnit
+
+    return {
+        NumberDeviceClass.ABSOLUTE_HUMIDITY: AbsoluteHumidityUnit,
+        NumberDeviceClass.APPARENT_POWER: ApparentPowerUnit,
+        NumberDeviceClass.AREA: AreaUnit,
+        NumberDeviceClass.ATMOSPHERIC_PRESSURE: AtmosphericPressureUnit,
+        NumberDeviceClass.BATTERY: BatteryUnit,
+        NumberDeviceClass.BLOOD_GLUCOSE_CONCENTRATION: BloodGlucoseConcentrationUnit,
+        NumberDeviceClass.CARBON_DIOXIDE: CarbonDioxideUnit,
+        NumberDeviceClass.CARBON_MONOXIDE: CarbonMonoxideNumberUnit,
+        NumberDeviceClass.CURRENT: CurrentUnit,
+        NumberDeviceClass.DATA_RATE: DataRateUnit,
+        NumberDeviceClass.DATA_SIZE: DataSizeUnit,
+        NumberDeviceClass.DISTANCE: DistanceUnit,
+        NumberDeviceClass.DURATION: DurationUnit,
+        NumberDeviceClass.ENERGY: EnergyUnit,
+        NumberDeviceClass.ENERGY_DISTANCE: EnergyDistanceUnit,
+        NumberDeviceClass.ENERGY_STORAGE: EnergyStorageUnit,
+        NumberDeviceClass.FREQUENCY: FrequencyUnit,
+        NumberDeviceClass.GAS: GasUnit,
+        NumberDeviceClass.HUMIDITY: HumidityUnit,
+        NumberDeviceClass.ILLUMINANCE: IlluminanceUnit,
+        NumberDeviceClass.IRRADIANCE: IrradianceUnit,
+        NumberDeviceClass.MOISTURE: MoistureUnit,
+        NumberDeviceClass.MONETARY: MonetaryUnit,
+        NumberDeviceClass.NITROGEN_DIOXIDE: NitrogenDioxideUnit,
+        NumberDeviceClass.NITROGEN_MONOXIDE: NitrogenMonoxideUnit,
+        NumberDeviceClass.NITROUS_OXIDE: NitrousOxideUnit,
+        NumberDeviceClass.OZONE: OzoneUnit,
+        NumberDeviceClass.PM1: Pm1Unit,
+        NumberDeviceClass.PM25: Pm25Unit,
+        NumberDeviceClass.PM4: Pm4Unit,
+        NumberDeviceClass.PM10: Pm10Unit,
+        NumberDeviceClass.POWER: PowerUnit,
+        NumberDeviceClass.POWER_FACTOR: PowerFactorUnit,
+        NumberDeviceClass.PRECIPITATION: PrecipitationUnit,
+        NumberDeviceClass.PRECIPITATION_INTENSITY: PrecipitationIntensityUnit,
+        NumberDeviceClass.PRESSURE: PressureNumberUnit,
+        NumberDeviceClass.REACTIVE_ENERGY: ReactiveEnergyUnit,
+        NumberDeviceClass.REACTIVE_POWER: ReactivePowerUnit,
+        NumberDeviceClass.SIGNAL_STRENGTH: SignalStrengthUnit,
+        NumberDeviceClass.SOUND_PRESSURE: SoundPressureUnit,
+        NumberDeviceClass.SPEED: SpeedUnit,
+        NumberDeviceClass.SULPHUR_DIOXIDE: SulphurDioxideUnit,
+        NumberDeviceClass.TEMPERATURE: TemperatureUnit,
+        NumberDeviceClass.VOLATILE_ORGANIC_COMPOUNDS: VolatileOrganicCompoundsUnit,
+        NumberDeviceClass.VOLATILE_ORGANIC_COMPOUNDS_PARTS: VolatileOrganicCompoundsPartsUnit,
+        NumberDeviceClass.VOLTAGE: VoltageUnit,
+        NumberDeviceClass.VOLUME: VolumeUnit,
+        NumberDeviceClass.VOLUME_FLOW_RATE: VolumeFlowRateNumberUnit,
+        NumberDeviceClass.VOLUME_STORAGE: VolumeStorageUnit,
+        NumberDeviceClass.WATER: WaterUnit,
+        NumberDeviceClass.WEIGHT: WeightUnit,
+        NumberDeviceClass.WIND_DIRECTION: WindDirectionUnit,
+        NumberDeviceClass.WIND_SPEED: WindSpeedUnit
+    }
@@ -1,61 +1,6 @@
+from functools import lru_cache
+
 from jhomeassistant.types.device_classes.base_device_class import BaseDeviceClass
-from jhomeassistant.types.units import (
-    AbsoluteHumidityUnit,
-    ApparentPowerUnit,
-    AreaUnit,
-    AtmosphericPressureUnit,
-    BatteryUnit,
-    BloodGlucoseConcentrationUnit,
-    CarbonDioxideUnit,
-    CarbonMonoxideSensorUnit,
-    ConductivityUnit,
-    CurrentUnit,
-    DataRateUnit,
-    DataSizeUnit,
-    DistanceUnit,
-    DurationUnit,
-    EnergyUnit,
-    EnergyDistanceUnit,
-    EnergyStorageUnit,
-    FrequencyUnit,
-    GasUnit,
-    HumidityUnit,
-    IlluminanceUnit,
-    IrradianceUnit,
-    MoistureUnit,
-    MonetaryUnit,
-    NitrogenDioxideUnit,
-    NitrogenMonoxideUnit,
-    NitrousOxideUnit,
-    OzoneUnit,
-    Pm1Unit,
-    Pm25Unit,
-    Pm4Unit,
-    Pm10Unit,
-    PowerUnit,
-    PowerFactorUnit,
-    PrecipitationUnit,
-    PrecipitationIntensityUnit,
-    PressureSensorUnit,
-    ReactiveEnergyUnit,
-    ReactivePowerUnit,
-    SignalStrengthUnit,
-    SoundPressureUnit,
-    SpeedUnit,
-    SulphurDioxideUnit,
-    TemperatureUnit,
-    TemperatureDeltaUnit,
-    VolatileOrganicCompoundsUnit,
-    VolatileOrganicCompoundsPartsUnit,
-    VoltageUnit,
-    VolumeUnit,
-    VolumeFlowRateSensorUnit,
-    VolumeStorageUnit,
-    WaterUnit,
-    WeightUnit,
-    WindDirectionUnit,
-    WindSpeedUnit,
-)
 
 
 class SensorDeviceClass(BaseDeviceClass):
@@ -123,60 +68,124 @@ class SensorDeviceClass(BaseDeviceClass):
 
     @property
     def unit(self):
-        return {
-            SensorDeviceClass.ABSOLUTE_HUMIDITY: AbsoluteHumidityUnit,
-            SensorDeviceClass.APPARENT_POWER: ApparentPowerUnit,
-            SensorDeviceClass.AREA: AreaUnit,
-            SensorDeviceClass.ATMOSPHERIC_PRESSURE: AtmosphericPressureUnit,
-            SensorDeviceClass.BATTERY: BatteryUnit,
-            SensorDeviceClass.BLOOD_GLUCOSE_CONCENTRATION: BloodGlucoseConcentrationUnit,
-            SensorDeviceClass.CARBON_DIOXIDE: CarbonDioxideUnit,
-            SensorDeviceClass.CURRENT: CurrentUnit,
-            SensorDeviceClass.DATA_RATE: DataRateUnit,
-            SensorDeviceClass.DATA_SIZE: DataSizeUnit,
-            SensorDeviceClass.DISTANCE: DistanceUnit,
-            SensorDeviceClass.DURATION: DurationUnit,
-            SensorDeviceClass.ENERGY: EnergyUnit,
-            SensorDeviceClass.ENERGY_DISTANCE: EnergyDistanceUnit,
-            SensorDeviceClass.ENERGY_STORAGE: EnergyStorageUnit,
-            SensorDeviceClass.FREQUENCY: FrequencyUnit,
-            SensorDeviceClass.GAS: GasUnit,
-            SensorDeviceClass.HUMIDITY: HumidityUnit,
-            SensorDeviceClass.ILLUMINANCE: IlluminanceUnit,
-            SensorDeviceClass.IRRADIANCE: IrradianceUnit,
-            SensorDeviceClass.MOISTURE: MoistureUnit,
-            SensorDeviceClass.MONETARY: MonetaryUnit,
-            SensorDeviceClass.NITROGEN_DIOXIDE: NitrogenDioxideUnit,
-            SensorDeviceClass.NITROGEN_MONOXIDE: NitrogenMonoxideUnit,
-            SensorDeviceClass.NITROUS_OXIDE: NitrousOxideUnit,
-            SensorDeviceClass.OZONE: OzoneUnit,
-            SensorDeviceClass.PM1: Pm1Unit,
-            SensorDeviceClass.PM25: Pm25Unit,
-            SensorDeviceClass.PM4: Pm4Unit,
-            SensorDeviceClass.PM10: Pm10Unit,
-            SensorDeviceClass.POWER: PowerUnit,
-            SensorDeviceClass.POWER_FACTOR: PowerFactorUnit,
-            SensorDeviceClass.PRECIPITATION: PrecipitationUnit,
-            SensorDeviceClass.PRECIPITATION_INTENSITY: PrecipitationIntensityUnit,
-            SensorDeviceClass.REACTIVE_ENERGY: ReactiveEnergyUnit,
-            SensorDeviceClass.REACTIVE_POWER: ReactivePowerUnit,
-            SensorDeviceClass.SIGNAL_STRENGTH: SignalStrengthUnit,
-            SensorDeviceClass.SOUND_PRESSURE: SoundPressureUnit,
-            SensorDeviceClass.SPEED: SpeedUnit,
-            SensorDeviceClass.SULPHUR_DIOXIDE: SulphurDioxideUnit,
-            SensorDeviceClass.TEMPERATURE: TemperatureUnit,
-            SensorDeviceClass.VOLATILE_ORGANIC_COMPOUNDS: VolatileOrganicCompoundsUnit,
-            SensorDeviceClass.VOLATILE_ORGANIC_COMPOUNDS_PARTS: VolatileOrganicCompoundsPartsUnit,
-            SensorDeviceClass.VOLTAGE: VoltageUnit,
-            SensorDeviceClass.VOLUME: VolumeUnit,
-            SensorDeviceClass.VOLUME_STORAGE: VolumeStorageUnit,
-            SensorDeviceClass.WATER: WaterUnit,
-            SensorDeviceClass.WEIGHT: WeightUnit,
-            SensorDeviceClass.WIND_DIRECTION: WindDirectionUnit,
-            SensorDeviceClass.WIND_SPEED: WindSpeedUnit,
-            SensorDeviceClass.CARBON_MONOXIDE: CarbonMonoxideSensorUnit,
-            SensorDeviceClass.CONDUCTIVITY: ConductivityUnit,
-            SensorDeviceClass.PRESSURE: PressureSensorUnit,
-            SensorDeviceClass.VOLUME_FLOW_RATE: VolumeFlowRateSensorUnit,
-            SensorDeviceClass.TEMPERATURE_DELTA: TemperatureDeltaUnit,
-        }.get(self, super().unit)
+        return _units_by_device_class().get(self, super().unit)
+
+
+@lru_cache(maxsize=None)
+def _units_by_device_class():
+    # Imported on first use, so loading the device classes does not load every unit module.
+    from jhomeassistant.types.units import (
+        AbsoluteHumidityUnit,
+        ApparentPowerUnit,
+        AreaUnit,
+        AtmosphericPressureUnit,
+        BatteryUnit,
+        BloodGlucoseConcentrationUnit,
+        CarbonDioxideUnit,
+        CarbonMonoxideSensorUnit,
+        ConductivityUnit,
+        CurrentUnit,
+        DataRateUnit,
+        DataSizeUnit,
+        DistanceUnit,
+        DurationUnit,
+        EnergyUnit,
+        EnergyDistanceUnit,
+        EnergyStorageUnit,
+        FrequencyUnit,
+        GasUnit,
+        HumidityUnit,
+        IlluminanceUnit,
+        IrradianceUnit,
+        MoistureUnit,
+        MonetaryUnit,
+        NitrogenDioxideUnit,
+        NitrogenMonoxideUnit,
+        NitrousOxideUnit,
+        OzoneUnit,
+        Pm1Unit,
+        Pm25Unit,
+        Pm4Unit,
+        Pm10Unit,
+        PowerUnit,
+        PowerFactorUnit,
+        PrecipitationUnit,
+        PrecipitationIntensityUnit,
+        PressureSensorUnit,
+        ReactiveEnergyUnit,
+        ReactivePowerUnit,
+        SignalStrengthUnit,
+        SoundPressureUnit,
+        SpeedUnit,
+        SulphurDioxideUnit,
+        TemperatureUnit,
+        TemperatureDeltaUnit,
+        VolatileOrganicCompoundsUnit,
+        VolatileOrganicCompoundsPartsUnit,
+        VoltageUnit,
+        VolumeUnit,
+        VolumeFlowRateSensorUnit,
+        VolumeStorageUnit,
+        WaterUnit,
+        WeightUnit,
+        WindDirectionUnit,
+        WindSpeedUnit,
+    )
+
+    return {
+        SensorDeviceClass.ABSOLUTE_HUMIDITY: AbsoluteHumidityUnit,
+        SensorDeviceClass.APPARENT_POWER: ApparentPowerUnit,
+        SensorDeviceClass.AREA: AreaUnit,
+        SensorDeviceClass.ATMOSPHERIC_PRESSURE: AtmosphericPressureUnit,
+        SensorDeviceClass.BATTERY: BatteryUnit,
+        SensorDeviceClass.BLOOD_GLUCOSE_CONCENTRATION: BloodGlucoseConcentrationUnit,
+        SensorDeviceClass.CARBON_DIOXIDE: CarbonDioxideUnit,
+        SensorDeviceClass.CURRENT: CurrentUnit,
+        SensorDeviceClass.DATA_RATE: DataRateUnit,
+        SensorDeviceClass.DATA_SIZE: DataSizeUnit,
+        SensorDeviceClass.DISTANCE: DistanceUnit,
+        SensorDeviceClass.DURATION: DurationUnit,
+        SensorDeviceClass.ENERGY: EnergyUnit,
+        SensorDeviceClass.ENERGY_DISTANCE: EnergyDistanceUnit,
+        SensorDeviceClass.ENERGY_STORAGE: EnergyStorageUnit,
+        SensorDeviceClass.FREQUENCY: FrequencyUnit,
+        SensorDeviceClass.GAS: GasUnit,
+        SensorDeviceClass.HUMIDITY: HumidityUnit,
+        SensorDeviceClass.ILLUMINANCE: IlluminanceUnit,
+        SensorDeviceClass.IRRADIANCE: IrradianceUnit,
+        SensorDeviceClass.MOISTURE: MoistureUnit,
+        SensorDeviceClass.MONETARY: MonetaryUnit,
+        SensorDeviceClass.NITROGEN_DIOXIDE: NitrogenDioxideUnit,
+        SensorDeviceClass.NITROGEN_MONOXIDE: NitrogenMonoxideUnit,
+        SensorDeviceClass.NITROUS_OXIDE: NitrousOxideUnit,
+        SensorDeviceClass.OZONE: OzoneUnit,
+        SensorDeviceClass.PM1: Pm1Unit,
+        SensorDeviceClass.PM25: Pm25Unit,
+        SensorDeviceClass.PM4: Pm4Unit,
+        SensorDeviceClass.PM10: Pm10Unit,
+        SensorDeviceClass.POWER: PowerUnit,
+        SensorDeviceClass.POWER_FACTOR: PowerFactorUnit,
+        SensorDeviceClass.PRECIPITATION: PrecipitationUnit,
+        SensorDeviceClass.PRECIPITATION_INTENSITY: PrecipitationIntensityUnit,
+        SensorDeviceClass.REACTIVE_ENERGY: ReactiveEnergyUnit,
+        SensorDeviceClass.REACTIVE_POWER: ReactivePowerUnit,
+        SensorDeviceClass.SIGNAL_STRENGTH: SignalStrengthUnit,
+        SensorDeviceClass.SOUND_PRESSURE: SoundPressureUnit,
+        SensorDeviceClass.SPEED: SpeedUnit,
+        SensorDeviceClass.SULPHUR_DIOXIDE: SulphurDioxideUnit,
+        SensorDeviceClass.TEMPERATURE: TemperatureUnit,
+        SensorDeviceClass.VOLATILE_ORGANIC_COMPOUNDS: VolatileOrganicCompoundsUnit,
+        SensorDeviceClass.VOLATILE_ORGANIC_COMPOUNDS_PARTS: VolatileOrganicCompoundsPartsUnit,
+        SensorDeviceClass.VOLTAGE: VoltageUnit,
+        SensorDeviceClass.VOLUME: VolumeUnit,
+        SensorDeviceClass.VOLUME_STORAGE: VolumeStorageUnit,
+        SensorDeviceClass.WATER: WaterUnit,
+        SensorDeviceClass.WEIGHT: WeightUnit,
+        SensorDeviceClass.WIND_DIRECTION: WindDirectionUnit,
+        SensorDeviceClass.WIND_SPEED: WindSpeedUnit,
+        SensorDeviceClass.CARBON_MONOXIDE: CarbonMonoxideSensorUnit,
+        SensorDeviceClass.CONDUCTIVITY: ConductivityUnit,
+        SensorDeviceClass.PRESSURE: PressureSensorUnit,
+        SensorDeviceClass.VOLUME_FLOW_RATE: VolumeFlowRateSensorUnit,
+        SensorDeviceClass.TEMPERATURE_DELTA: TemperatureDeltaUnit,
+    }
@@ -0,0 +1,13 @@
+from enum import StrEnum
+
+
+class DiscoveryMode(StrEnum):
+    """
+    How a device is announced to Home Assistant.
+
+    - DEVICE: One device-based discovery payload (``<prefix>/device/<id>/config``) with all components.
+    - COMPONENT: One payload per component (``<prefix>/<component>/<node_id>/<object_id>/config``) that
+      repeats the device block. Changing a single entity then only republishes that entity's message.
+    """
+    DEVICE = "device"
+    COMPONENT = "component"
@@ -0,0 +1,15 @@
+from enum import StrEnum
+
+
+class OverrunPolicy(StrEnum):
+    """
+    What a schedule does when a run becomes due while its concurrency limit is reached.
+
+    - SKIP:        Drop the due run; the schedule continues at its next deadline.
+    - QUEUE_ONE:   Remember one run and start it as soon as a running one finishes (further ones are dropped).
+    - CANCEL_LATE: Drop the due run like SKIP, and also drop runs that only get a worker after the
+                   following run is already due, so a saturated pool never works on stale runs.
+    """
+    SKIP = "skip"
+    QUEUE_ONE = "queue_one"
+    CANCEL_LATE = "cancel_late"
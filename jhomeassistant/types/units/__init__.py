@@ -1,58 +1,124 @@
-from .absolute_humidity_units import AbsoluteHumidityUnit
-from .apparent_power_units import ApparentPowerUnit
-from .area_units import AreaUnit
-from .atmospheric_pressure_units import AtmosphericPressureUnit
-from .battery_units import BatteryUnit
-from .blood_glucose_concentration_units import BloodGlucoseConcentrationUnit
-from .carbon_dioxide_units import CarbonDioxideUnit
-from .carbon_monoxide_units import CarbonMonoxideNumberUnit, CarbonMonoxideSensorUnit
-from .conductivity_units import ConductivityUnit
-from .current_units import CurrentUnit
-from .data_rate_units import DataRateUnit
-from .data_size_units import DataSizeUnit
-from .distance_units import DistanceUnit
-from .duration_units import DurationUnit
-from .energy_units import EnergyUnit
-from .energy_distance_units import EnergyDistanceUnit
-from .energy_storage_units import EnergyStorageUnit
-from .frequency_units import FrequencyUnit
-from .gas_units import GasUnit
-from .humidity_units import HumidityUnit
-from .illuminance_units import IlluminanceUnit
-from .irradiance_units import IrradianceUnit
-from .moisture_units import MoistureUnit
-from .monetary_units import MonetaryUnit
-from .nitrogen_dioxide_units import NitrogenDioxideUnit
-from .nitrogen_monoxide_units import NitrogenMonoxideUnit
-from .nitrous_oxide_units import NitrousOxideUnit
-from .ozone_units import OzoneUnit
-from .pm1_units import Pm1Unit
-from .pm25_units import Pm25Unit
-from .pm4_units import Pm4Unit
-from .pm10_units import Pm10Unit
-from .power_units import PowerUnit
-from .power_factor_units import PowerFactorUnit  # subclass of NoUnit
-from .precipitation_units import PrecipitationUnit
-from .precipitation_intensity_units import PrecipitationIntensityUnit
-from .pressure_units import PressureSensorUnit, PressureNumberUnit
-from .reactive_energy_units import ReactiveEnergyUnit
-from .reactive_power_units import ReactivePowerUnit
-from .signal_strength_units import SignalStrengthUnit
-from .sound_pressure_units import SoundPressureUnit
-from .speed_units import SpeedUnit
-from .sulphur_dioxide_units import SulphurDioxideUnit
-from .temperature_units import TemperatureUnit
-from .temperature_delta_units import TemperatureDeltaUnit
-from .volatile_organic_compounds_units import VolatileOrganicCompoundsUnit
-from .volatile_organic_compounds_parts_units import VolatileOrganicCompoundsPartsUnit
-from .voltage_units import VoltageUnit
-from .volume_units import VolumeUnit
-from .volume_flow_rate_units import VolumeFlowRateSensorUnit, VolumeFlowRateNumberUnit
-from .volume_storage_units import VolumeStorageUnit
-from .water_units import WaterUnit
-from .weight_units import WeightUnit
-from .wind_direction_units import WindDirectionUnit
-from .wind_speed_units import WindSpeedUnit
+from typing import TYPE_CHECKING
+
+from jhomeassistant.lazy_import import lazy_exports
+
+if TYPE_CHECKING:
+    from .absolute_humidity_units import AbsoluteHumidityUnit
+    from .apparent_power_units import ApparentPowerUnit
+    from .area_units import AreaUnit
+    from .atmospheric_pressure_units import AtmosphericPressureUnit
+    from .battery_units import BatteryUnit
+    from .blood_glucose_concentration_units import BloodGlucoseConcentrationUnit
+    from .carbon_dioxide_units import CarbonDioxideUnit
+    from .carbon_monoxide_units import CarbonMonoxideNumberUnit, CarbonMonoxideSensorUnit
+    from .conductivity_units import ConductivityUnit
+    from .current_units import CurrentUnit
+    from .data_rate_units import DataRateUnit
+    from .data_size_units import DataSizeUnit
+    from .distance_units import DistanceUnit
+    from .duration_units import DurationUnit
+    from .energy_units import EnergyUnit
+    from .energy_distance_units import EnergyDistanceUnit
+    from .energy_storage_units import EnergyStorageUnit
+    from .frequency_units import FrequencyUnit
+    from .gas_units import GasUnit
+    from .humidity_units import HumidityUnit
+    from .illuminance_units import IlluminanceUnit
+    from .irradiance_units import IrradianceUnit
+    from .moisture_units import MoistureUnit
+    from .monetary_units import MonetaryUnit
+    from .nitrogen_dioxide_units import NitrogenDioxideUnit
+    from .nitrogen_monoxide_units import NitrogenMonoxideUnit
+    from .nitrous_oxide_units import NitrousOxideUnit
+    from .ozone_units import OzoneUnit
+    from .pm1_units import Pm1Unit
+    from .pm25_units import Pm25Unit
+    from .pm4_units import Pm4Unit
+    from .pm10_units import Pm10Unit
+    from .power_units import PowerUnit
+    from .power_factor_units import PowerFactorUnit  # subclass of NoUnit
+    from .precipitation_units import PrecipitationUnit
+    from .precipitation_intensity_units import PrecipitationIntensityUnit
+    from .pressure_units import PressureSensorUnit, PressureNumberUnit
+    from .reactive_energy_units import ReactiveEnergyUnit
+    from .reactive_power_units import ReactivePowerUnit
+    from .signal_strength_units import SignalStrengthUnit
+    from .sound_pressure_units import SoundPressureUnit
+    from .speed_units import SpeedUnit
+    from .sulphur_dioxide_units import SulphurDioxideUnit
+    from .temperature_units import TemperatureUnit
+    from .temperature_delta_units import TemperatureDeltaUnit
+    from .volatile_organic_compounds_units import VolatileOrganicCompoundsUnit
+    from .volatile_organic_compounds_parts_units import VolatileOrganicCompoundsPartsUnit
+    from .voltage_units import VoltageUnit
+    from .volume_units import VolumeUnit
+    from .volume_flow_rate_units import VolumeFlowRateSensorUnit, VolumeFlowRateNumberUnit
+    from .volume_storage_units import VolumeStorageUnit
+    from .water_units import WaterUnit
+    from .weight_units import WeightUnit
+    from .wind_direction_units import WindDirectionUnit
+    from .wind_speed_units import WindSpeedUnit
+
+_EXPORTS = {
+    "AbsoluteHumidityUnit": ".absolute_humidity_units",
+    "ApparentPowerUnit": ".apparent_power_units",
+    "AreaUnit": ".area_units",
+    "AtmosphericPressureUnit": ".atmospheric_pressure_units",
+    "BatteryUnit": ".battery_units",
+    "BloodGlucoseConcentrationUnit": ".blood_glucose_concentration_units",
+    "CarbonDioxideUnit": ".carbon_dioxide_units",
+    "CarbonMonoxideNumberUnit": ".carbon_monoxide_units",
+    "CarbonMonoxideSensorUnit": ".carbon_monoxide_units",
+    "ConductivityUnit": ".conductivity_units",
+    "CurrentUnit": ".current_units",
+    "DataRateUnit": ".data_rate_units",
+    "DataSizeUnit": ".data_size_units",
+    "DistanceUnit": ".distance_units",
+    "DurationUnit": ".duration_units",
+    "EnergyUnit": ".energy_units",
+    "EnergyDistanceUnit": ".energy_distance_units",
+    "EnergyStorageUnit": ".energy_storage_units",
+    "FrequencyUnit": ".frequency_units",
+    "GasUnit": ".gas_units",
+    "HumidityUnit": ".humidity_units",
+    "IlluminanceUnit": ".illuminance_units",
+    "IrradianceUnit": ".irradiance_units",
+    "MoistureUnit": ".moisture_units",
+    "MonetaryUnit": ".monetary_units",
+    "NitrogenDioxideUnit": ".nitrogen_dioxide_units",
+    "NitrogenMonoxideUnit": ".nitrogen_monoxide_units",
+    "NitrousOxideUnit": ".nitrous_oxide_units",
+    "OzoneUnit": ".ozone_units",
+    "Pm1Unit": ".pm1_units",
+    "Pm25Unit": ".pm25_units",
+    "Pm4Unit": ".pm4_units",
+    "Pm10Unit": ".pm10_units",
+    "PowerUnit": ".power_units",
+    "PowerFactorUnit": ".power_factor_units",
+    "PrecipitationUnit": ".precipitation_units",
+    "PrecipitationIntensityUnit": ".precipitation_intensity_units",
+    "PressureSensorUnit": ".pressure_units",
+    "PressureNumberUnit": ".pressure_units",
+    "ReactiveEnergyUnit": ".reactive_energy_units",
+    "ReactivePowerUnit": ".reactive_power_units",
+    "SignalStrengthUnit": ".signal_strength_units",
+    "SoundPressureUnit": ".sound_pressure_units",
+    "SpeedUnit": ".speed_units",
+    "SulphurDioxideUnit": ".sulphur_dioxide_units",
+    "TemperatureUnit": ".temperature_units",
+    "TemperatureDeltaUnit": ".temperature_delta_units",
+    "VolatileOrganicCompoundsUnit": ".volatile_organic_compounds_units",
+    "VolatileOrganicCompoundsPartsUnit": ".volatile_organic_compounds_parts_units",
+    "VoltageUnit": ".voltage_units",
+    "VolumeUnit": ".volume_units",
+    "VolumeFlowRateSensorUnit": ".volume_flow_rate_units",
+    "VolumeFlowRateNumberUnit": ".volume_flow_rate_units",
+    "VolumeStorageUnit": ".volume_storage_units",
+    "WaterUnit": ".water_units",
+    "WeightUnit": ".weight_units",
+    "WindDirectionUnit": ".wind_direction_units",
+    "WindSpeedUnit": ".wind_speed_units",
+}
 
 __all__ = [
     "AbsoluteHumidityUnit",
@@ -113,4 +179,6 @@ __all__ = [
     "WeightUnit",
     "WindDirectionUnit",
     "WindSpeedUnit"
-]
\ No newline at end of file
+]
+
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS, globals())
@@ -11,6 +11,8 @@ import pytest
 from jmqtt import MQTTBuilderV3
 from jmqtt.types import QualityOfService as QoS
 
+from jhomeassistant.helper import device_facts
+
 REQUIRED_KEYS = ("MQTT_APP_NAME", "MQTT_HOST")
 
 
@@ -210,3 +212,11 @@ def after_all_clear_retained(broker_env, topic_registry):
         time.sleep(0.2)
 
     conn.close()
+
+
+@pytest.fixture(autouse=True)
+def _fresh_device_facts():
+    # Device facts are memoized per process; tests replace the collector via monkeypatch.
+    device_facts.invalidate()
+    yield
+    device_facts.invalidate()
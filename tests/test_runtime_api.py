@@ -1,12 +1,18 @@
 from __future__ import annotations
 
+import json
+import os
 import threading
 import time
 
+import pytest
+
+import jhomeassistant.helper.naming as naming_module
 import jhomeassistant.homeassistant_device as homeassistant_device_module
-from jhomeassistant import HomeAssistantConnection, HomeAssistantDevice, HomeAssistantOrigin
-from jhomeassistant.entities import ButtonEntity, HomeAssistantEntityBase
-from jhomeassistant.types import Component
+from jhomeassistant import HomeAssistantConnection, HomeAssistantDevice, HomeAssistantOrigin, HomeAssistantScheduleGroup
+from jhomeassistant.helper import DeviceFactsProvider, device_facts
+from jhomeassistant.entities import ButtonEntity, HomeAssistantEntityBase, SelectEntity, SensorEntity
+from jhomeassistant.types import Component, DiscoveryMode
 
 
 class _FakePublishInfo:
@@ -16,6 +22,9 @@ class _FakePublishInfo:
     def wait_for_publish(self, timeout: float | None = None):
         self.publish_timeouts.append(timeout)
 
+    def is_published(self):
+        return True
+
 
 class _FakeMqttConnection:
     def __init__(self):
@@ -39,7 +48,7 @@ class _FakeMqttConnection:
             cb(self, None, None, 0)
         return self
 
-    def publish(self, topic, payload, qos, retain):
+    def publish(self, topic, payload, qos, retain, wait_for_publish=False):
         if self.raise_on_publish is not None:
             raise self.raise_on_publish
 
@@ -231,7 +240,7 @@ def test_remove_entity_unsubscribes_and_republishes(monkeypatch):
     assert len(republishes) == 1
     topic, payload, _qos, retain, _info = republishes[0]
     assert retain is True
-    assert isinstance(payload, str) and payload != ""
+    assert isinstance(payload, bytes) and payload != b""
 
 
 def test_remove_device_publishes_empty_retained(monkeypatch):
@@ -569,3 +578,1443 @@ def test_add_origin_during_runtime_registers_schedule(monkeypatch):
 
     runtime.stop(timeout=1.0)
     assert runtime.join(timeout=1.0) is True
+
+
+# ---------------------------------------------------------------------------
+# discovery cache / dirty tracking
+# ---------------------------------------------------------------------------
+
+def _build_two_device_tree(mqtt_connection: _FakeMqttConnection):
+    first = HomeAssistantDevice("First", identifier="first-id").add_entities(
+        HomeAssistantEntityBase(Component.SENSOR, "Temperature"))
+    second = HomeAssistantDevice("Second", identifier="second-id").add_entities(
+        HomeAssistantEntityBase(Component.SENSOR, "Humidity"))
+    origin = HomeAssistantOrigin("Cache App").add_devices(first, second)
+    connection = HomeAssistantConnection(mqtt_connection).add_origin(origin)
+    return connection, origin, first, second
+
+
+def test_republish_discovery_skips_unchanged_devices():
+    mqtt = _FakeMqttConnection()
+    connection, _origin, _first, _second = _build_two_device_tree(mqtt)
+
+    connection.republish_discovery()
+    assert len(mqtt.publish_calls) == 2
+
+    connection.republish_discovery()
+    assert len(mqtt.publish_calls) == 2
+
+    connection.republish_discovery(force=True)
+    assert len(mqtt.publish_calls) == 4
+
+
+def test_republish_discovery_only_resends_dirty_device():
+    mqtt = _FakeMqttConnection()
+    connection, _origin, first, second = _build_two_device_tree(mqtt)
+    connection.republish_discovery()
+    publishes_before = len(mqtt.publish_calls)
+
+    first.manufacturer = "ACME"
+    connection.republish_discovery()
+    new_publishes = mqtt.publish_calls[publishes_before:]
+    assert [c[0] for c in new_publishes] == [_device_topic(first)]
+    assert b'"manufacturer":"ACME"' in new_publishes[0][1]
+
+    second.entities[0].availability.add("cache/second/status")
+    connection.republish_discovery()
+    assert [c[0] for c in mqtt.publish_calls[publishes_before + 1:]] == [_device_topic(second)]
+
+
+def test_connection_level_changes_invalidate_all_devices():
+    mqtt = _FakeMqttConnection()
+    connection, _origin, _first, _second = _build_two_device_tree(mqtt)
+    connection.republish_discovery()
+
+    connection.availability.add("cache/bridge/status")
+    connection.republish_discovery()
+    assert len(mqtt.publish_calls) == 4
+    assert all(b"cache/bridge/status" in c[1] for c in mqtt.publish_calls[2:])
+
+
+def test_clean_devices_are_not_reserialized(monkeypatch):
+    mqtt = _FakeMqttConnection()
+    connection, _origin, first, second = _build_two_device_tree(mqtt)
+    connection.republish_discovery()
+
+    builds = []
+    original = HomeAssistantDevice.internal_discovery_sections
+
+    def _counting_discovery(device, prefix, keys):
+        builds.append(device)
+        return original(device, prefix, keys)
+
+    monkeypatch.setattr(HomeAssistantDevice, "internal_discovery_sections", _counting_discovery)
+
+    connection.republish_discovery(force=True)
+    assert builds == []
+
+    second.identifiers.append("extra-identifier")
+    connection.republish_discovery()
+    assert builds == [second]
+
+
+# ---------------------------------------------------------------------------
+# retained-state reconciliation
+# ---------------------------------------------------------------------------
+
+class _FakeRetainedMessage:
+    def __init__(self, topic: str, payload: bytes):
+        self.topic = topic
+        self.retain = True
+        self.payload_bytes = payload
+
+
+class _FakeRetainingMqttConnection(_FakeMqttConnection):
+    """Delivers the configured retained messages as soon as a matching wildcard subscription is made."""
+
+    def __init__(self, retained: dict):
+        super().__init__()
+        self.retained = retained
+
+    def subscribe(self, topic, callback):
+        result = super().subscribe(topic, callback)
+        if topic.endswith("/+/config"):
+            for retained_topic, payload in self.retained.items():
+                callback(self, None, None, _FakeRetainedMessage(retained_topic, payload))
+        return result
+
+
+def test_reconciliation_publishes_only_missing_or_different_payloads():
+    reference = _FakeMqttConnection()
+    reference_connection, _origin, first, second = _build_two_device_tree(reference)
+    reference_connection.republish_discovery()
+    payloads = {c[0]: c[1] for c in reference.publish_calls}
+
+    mqtt = _FakeRetainingMqttConnection({
+        _device_topic(first): payloads[_device_topic(first)],
+        _device_topic(second): b"{}",
+    })
+    connection, _origin, first, second = _build_two_device_tree(mqtt)
+    connection.reconcile_retained_discovery(window=0.01)
+
+    runtime = connection.run(blocking=False, schedule_resolution=0.01, publish_timeout=1.0)
+    assert runtime is not None
+    assert _wait_for_subscribe(mqtt, "homeassistant/status")
+    runtime.stop(timeout=1.0)
+    assert runtime.join(timeout=1.0) is True
+
+    assert [c[0] for c in mqtt.publish_calls] == [_device_topic(second)]
+    assert "homeassistant/device/+/config" in mqtt.unsubscribe_calls
+
+    # The reconciled device counts as published, so an unchanged republish stays quiet.
+    connection.republish_discovery()
+    assert len(mqtt.publish_calls) == 1
+
+
+def test_reconciliation_window_must_be_positive():
+    connection = HomeAssistantConnection(_FakeMqttConnection())
+    with pytest.raises(ValueError):
+        connection.reconcile_retained_discovery(window=0)
+
+
+# ---------------------------------------------------------------------------
+# streaming discovery encoder
+# ---------------------------------------------------------------------------
+
+@pytest.mark.parametrize("abbreviated", [False, True])
+def test_discovery_encoder_is_byte_identical_to_json_dumps(abbreviated):
+    from jmqtt import QualityOfService as QoS
+    from jhomeassistant.entities import SelectEntity, SensorEntity
+    from jhomeassistant.helper.abbreviations import get_key_table
+    from jhomeassistant.helper.discovery_encoder import DiscoveryEncoder
+    from jhomeassistant.types import AvailabilityMode
+
+    sensor = SensorEntity("Température", "enc/temp", value_template="{{ value_json.t }}")
+    sensor.availability.add("enc/temp/available", payload_available="up")
+    select = SelectEntity("Mode", "enc/mode", "enc/mode/set", ["auto", "mänuell"], on_select=lambda *_: None,
+                          optimistic=False)
+    device = HomeAssistantDevice("Küche", identifier="encoder-id").add_entities(
+        sensor, select, HomeAssistantEntityBase(Component.SENSOR, "Plain"))
+    device.manufacturer = "ACME \"Labs\""
+    device.qos = QoS.AtLeastOnce
+    device.encoding = "utf-8"
+    device.availability.add("enc/device/status")
+    device.availability.mode = AvailabilityMode.ALL
+    origin = HomeAssistantOrigin("Encoder App", sw_version="1.0").add_devices(device)
+    origin.internal_inherit(device)
+
+    keys = get_key_table(abbreviated)
+    expected_topic, expected_payload = origin.internal_device_discovery(device, "homeassistant", keys)
+    topic, payload = DiscoveryEncoder(keys).encode_device(origin, device, "homeassistant")
+
+    assert topic == expected_topic
+    assert payload == json.dumps(expected_payload, separators=(",", ":")).encode("utf-8")
+
+
+# ---------------------------------------------------------------------------
+# discovery flow control
+# ---------------------------------------------------------------------------
+
+class _FakeAckingPublishInfo(_FakePublishInfo):
+    """Acknowledged once waited for, unless the connection drops acknowledgements."""
+
+    def __init__(self, owner):
+        super().__init__()
+        self._owner = owner
+        self.acked = False
+
+    def wait_for_publish(self, timeout: float | None = None):
+        super().wait_for_publish(timeout)
+        self.acked = not self._owner.drop_acks
+
+    def is_published(self):
+        return self.acked
+
+
+class _FakeWindowedMqttConnection(_FakeMqttConnection):
+    def __init__(self, drop_acks: bool = False):
+        super().__init__()
+        self.drop_acks = drop_acks
+        self.max_unacked_seen = 0
+
+    def publish(self, topic, payload, qos, retain):
+        unacked = sum(1 for c in self.publish_calls if not c[4].publish_timeouts)
+        self.max_unacked_seen = max(self.max_unacked_seen, unacked + 1)
+        info = _FakeAckingPublishInfo(self)
+        self.publish_calls.append((topic, payload, qos, retain, info))
+        return info
+
+
+def _build_fleet(mqtt_connection, devices: int) -> HomeAssistantConnection:
+    origin = HomeAssistantOrigin("Fleet")
+    for i in range(devices):
+        origin.add_devices(HomeAssistantDevice(f"Fleet {i}", identifier=f"fleet-{i}").add_entities(
+            HomeAssistantEntityBase(Component.SENSOR, "Value")))
+    return HomeAssistantConnection(mqtt_connection).add_origin(origin)
+
+
+def test_discovery_respects_in_flight_window_and_reports_progress():
+    mqtt = _FakeWindowedMqttConnection()
+    progress = []
+    connection = _build_fleet(mqtt, 7).discovery_flow_control(max_in_flight=2, on_progress=progress.append)
+
+    connection.republish_discovery(publish_timeout=1.0)
+
+    assert len(mqtt.publish_calls) == 7
+    assert mqtt.max_unacked_seen == 2
+    assert progress[-1].total == 7
+    assert progress[-1].sent == 7 and progress[-1].acknowledged == 7
+    assert progress[-1].done and progress[-1].in_flight == 0
+    assert connection.discovery_progress == progress[-1]
+
+
+def test_discovery_progress_counts_timeouts():
+    mqtt = _FakeWindowedMqttConnection(drop_acks=True)
+    connection = _build_fleet(mqtt, 3)
+
+    connection.republish_discovery(publish_timeout=0.01)
+
+    assert connection.discovery_progress.timed_out == 3
+    assert connection.discovery_progress.acknowledged == 0
+
+
+def test_discovery_rate_pacing():
+    mqtt = _FakeWindowedMqttConnection()
+    connection = _build_fleet(mqtt, 5).discovery_flow_control(max_rate=100.0)
+
+    started = time.monotonic()
+    connection.republish_discovery(publish_timeout=1.0)
+
+    assert len(mqtt.publish_calls) == 5
+    assert time.monotonic() - started >= 0.035
+
+
+def test_concurrent_pipeline_runs_keep_their_own_progress():
+    from jhomeassistant.helper.publish_pipeline import PublishPipeline
+
+    mqtt = _FakeWindowedMqttConnection()
+    snapshots = []
+    pipeline = PublishPipeline(max_in_flight=1, on_progress=snapshots.append)
+    start = threading.Barrier(2)
+    results = {}
+
+    def publish(item):
+        time.sleep(0.002)
+        return mqtt.publish(f"topic/{item}", b"", 1, True)
+
+    def run(name, count):
+        start.wait()
+        results[name] = pipeline.run(publish, [f"{name}{i}" for i in range(count)], publish_timeout=1.0)
+
+    threads = [threading.Thread(target=run, args=("a", 6)), threading.Thread(target=run, args=("b", 3))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=2.0)
+
+    assert len(results["a"].acknowledged) == 6 and len(results["b"].acknowledged) == 3
+    assert all(0 <= snapshot.in_flight <= 1 and snapshot.sent <= snapshot.total for snapshot in snapshots)
+    assert sorted(snapshot.total for snapshot in snapshots if snapshot.done) == [3, 6]
+
+
+# ---------------------------------------------------------------------------
+# deadline-based waiting
+# ---------------------------------------------------------------------------
+
+def test_discovery_timeout_is_one_deadline_for_the_batch():
+    mqtt = _FakeWindowedMqttConnection(drop_acks=True)
+    connection = _build_fleet(mqtt, 4)
+
+    result = connection.republish_discovery(publish_timeout=0.5)
+
+    timeouts = [call[4].publish_timeouts[0] for call in mqtt.publish_calls]
+    assert all(0.0 <= t <= 0.5 for t in timeouts)
+    assert timeouts == sorted(timeouts, reverse=True)
+    assert [entry.topic for entry in result.timed_out] == [call[0] for call in mqtt.publish_calls]
+    assert result.acknowledged == [] and not result.complete
+
+
+def test_unacknowledged_discovery_is_resent_by_the_next_republish():
+    mqtt = _FakeWindowedMqttConnection(drop_acks=True)
+    connection = _build_fleet(mqtt, 2)
+    device = connection._origins[0]._devices[0]
+
+    assert len(connection.republish_discovery(publish_timeout=0.01).timed_out) == 2
+    assert connection.publish_device_discovery(device, publish_timeout=0.01) is True
+
+    mqtt.drop_acks = False
+    mqtt.publish_calls.clear()
+    result = connection.republish_discovery(publish_timeout=1.0, force=False)
+    assert len(result.acknowledged) == 2
+
+    mqtt.publish_calls.clear()
+    connection.republish_discovery(publish_timeout=1.0, force=False)
+    assert mqtt.publish_calls == []
+
+
+def test_discovery_result_lists_acknowledged_entries():
+    mqtt = _FakeWindowedMqttConnection()
+    connection = _build_fleet(mqtt, 3)
+
+    result = connection.republish_discovery(publish_timeout=1.0)
+
+    assert result.complete
+    assert [entry.topic for entry in result.acknowledged] == [call[0] for call in mqtt.publish_calls]
+
+
+def test_remove_origin_waits_for_deletes_with_one_deadline():
+    mqtt = _FakeWindowedMqttConnection(drop_acks=True)
+    connection = _build_fleet(mqtt, 3)
+    origin = connection._origins[0]
+
+    connection.remove_origin(origin, publish_timeout=0.5)
+
+    deletes = [call for call in mqtt.publish_calls if call[1] == ""]
+    assert len(deletes) == 3
+    timeouts = [call[4].publish_timeouts[0] for call in deletes]
+    assert all(0.0 <= t <= 0.5 for t in timeouts)
+    assert timeouts == sorted(timeouts, reverse=True)
+
+
+# ---------------------------------------------------------------------------
+# topology indexes
+# ---------------------------------------------------------------------------
+
+def test_topology_indexes_follow_model_mutations():
+    connection = _build_fleet(_FakeMqttConnection(), 1)
+    origin = connection._origins[0]
+    late_entity = HomeAssistantEntityBase(Component.SENSOR, "Late")
+    late_device = HomeAssistantDevice("Late Device", identifier="late-id")
+
+    origin.add_devices(late_device)
+    late_device.add_entities(late_entity)
+
+    unique_id = late_device.internal_entity_unique_id(late_entity)
+    assert connection._device_origins[late_device] is origin
+    assert connection._entity_devices[late_entity] is late_device
+    assert connection.get_entity(unique_id) is late_entity
+
+    connection.remove_entity(late_entity)
+    assert connection.get_entity(unique_id) is None
+    assert late_entity not in connection._entity_devices
+
+    connection.remove_origin(origin)
+    assert connection._device_origins == {}
+    assert connection._entity_devices == {}
+
+
+def test_topology_collections_stay_plain_lists():
+    connection = _build_fleet(_FakeMqttConnection(), 3)
+    origin = connection._origins[0]
+    device = origin._devices[1]
+    assert type(connection._origins) is list and type(origin._devices) is list
+    assert type(device.entities) is list
+
+    connection.add_origin(origin)
+    assert connection._origins == [origin]
+
+    extra = HomeAssistantEntityBase(Component.SENSOR, "Extra")
+    connection.add_entity(extra, device)
+    connection.add_entity(extra, device)
+    assert device.entities == [device.entities[0], extra]
+    assert connection._entity_devices[extra] is device
+
+    connection.remove_device(device)
+    assert device not in origin._devices and len(origin._devices) == 2
+    connection.remove_origin(origin)
+    assert connection._origins == []
+    connection.add_origin(origin)
+    assert connection._origins == [origin]
+
+
+def test_unique_id_index_follows_device_rename():
+    connection = _build_fleet(_FakeMqttConnection(), 1)
+    device = connection._origins[0]._devices[0]
+    entity = device.entities[0]
+    old_unique_id = device.internal_entity_unique_id(entity)
+
+    device.name = "Renamed"
+    connection.republish_discovery()
+
+    assert connection.get_entity(old_unique_id) is None
+    assert connection.get_entity(device.internal_entity_unique_id(entity)) is entity
+
+
+# ---------------------------------------------------------------------------
+# single-device discovery
+# ---------------------------------------------------------------------------
+
+def test_publish_device_discovery_only_builds_that_device(monkeypatch):
+    mqtt = _FakeMqttConnection()
+    connection, _origin, first, second = _build_two_device_tree(mqtt)
+    connection.republish_discovery()
+    first.manufacturer = "ACME"
+    second.manufacturer = "ACME"
+
+    builds = []
+    original = HomeAssistantDevice.internal_discovery_sections
+
+    def _counting_discovery(device, prefix, keys):
+        builds.append(device)
+        return original(device, prefix, keys)
+
+    monkeypatch.setattr(HomeAssistantDevice, "internal_discovery_sections", _counting_discovery)
+
+    assert connection.publish_device_discovery(first) is True
+    assert builds == [first]
+    assert mqtt.publish_calls[-1][0] == _device_topic(first)
+
+    assert connection.publish_device_discovery(first) is False
+    assert connection.publish_device_discovery(first, force=True) is True
+    assert len(mqtt.publish_calls) == 4
+
+
+def test_device_discovery_applies_inheritance():
+    connection, _origin, first, _second = _build_two_device_tree(_FakeMqttConnection())
+    connection.availability.add("single/bridge/status")
+
+    [(topic, payload)] = connection.device_discovery(first)
+
+    assert topic == _device_topic(first)
+    assert b"single/bridge/status" in payload
+
+
+def test_device_discovery_requires_attached_device():
+    connection, _origin, _first, _second = _build_two_device_tree(_FakeMqttConnection())
+
+    with pytest.raises(ValueError):
+        connection.device_discovery(HomeAssistantDevice("Detached", identifier="detached-id"))
+
+
+# ---------------------------------------------------------------------------
+# topology batches
+# ---------------------------------------------------------------------------
+
+def test_batch_publishes_each_device_once():
+    mqtt = _FakeMqttConnection()
+    connection, _origin, first, second = _build_two_device_tree(mqtt)
+    connection.republish_discovery()
+    publishes_before = len(mqtt.publish_calls)
+
+    with connection.batch(publish_timeout=1.0):
+        for i in range(20):
+            connection.add_entity(HomeAssistantEntityBase(Component.SENSOR, f"Value {i}"), first)
+        assert len(mqtt.publish_calls) == publishes_before
+
+    new_publishes = mqtt.publish_calls[publishes_before:]
+    assert [c[0] for c in new_publishes] == [_device_topic(first)]
+    assert len(json.loads(new_publishes[0][1])["components"]) == 21
+
+
+def test_batch_sends_deletes_together_and_drops_readded_devices():
+    mqtt = _FakeMqttConnection()
+    connection, origin, first, second = _build_two_device_tree(mqtt)
+    connection.republish_discovery()
+    publishes_before = len(mqtt.publish_calls)
+
+    with connection.batch():
+        connection.remove_device(first)
+        connection.remove_device(second)
+        connection.add_device(second, origin)
+        with connection.batch():
+            connection.remove_entity(second.entities[0])
+        assert len(mqtt.publish_calls) == publishes_before
+
+    new_publishes = mqtt.publish_calls[publishes_before:]
+    assert [(c[0], c[1] == "") for c in new_publishes] == [(_device_topic(first), True), (_device_topic(second), False)]
+
+
+def test_batch_defers_entity_activation(monkeypatch):
+    _patch_device_facts(monkeypatch)
+    mqtt = _FakeMqttConnection()
+    connection, origin, device, _button = _build_full_tree(mqtt)
+
+    runtime = connection.run(blocking=False, schedule_resolution=0.01, publish_timeout=1.0)
+    assert _wait_for_subscribe(mqtt, "test/cmd")
+
+    tick_event = threading.Event()
+    sensor = HomeAssistantEntityBase(Component.SENSOR, "Batched Sensor")
+    sensor.add_schedule(0.01, lambda _conn: tick_event.set())
+    late_button = ButtonEntity("Batched Button", "test/batched_cmd", on_press=lambda *_: None)
+    with connection.batch(publish_timeout=1.0):
+        connection.add_entity(sensor, device)
+        connection.add_entity(late_button, device)
+        assert all(c[0] != "test/batched_cmd" for c in mqtt.subscribe_calls)
+
+    assert _wait_for_subscribe(mqtt, "test/batched_cmd")
+    assert tick_event.wait(timeout=1.0), "schedule of batched entity never fired"
+
+    runtime.stop(timeout=1.0)
+    assert runtime.join(timeout=1.0) is True
+
+
+# ---------------------------------------------------------------------------
+# debounced republishing
+# ---------------------------------------------------------------------------
+
+def test_debounce_collapses_republishes_per_device():
+    mqtt = _FakeMqttConnection()
+    connection, _origin, first, second = _build_two_device_tree(mqtt)
+    connection.republish_discovery()
+    publishes_before = len(mqtt.publish_calls)
+    connection.debounce_discovery(window=0.05)
+
+    for i in range(10):
+        connection.add_entity(HomeAssistantEntityBase(Component.SENSOR, f"Value {i}"), first)
+    connection.add_entity(HomeAssistantEntityBase(Component.SENSOR, "Other"), second)
+    assert len(mqtt.publish_calls) == publishes_before
+
+    deadline = time.monotonic() + 2.0
+    while len(mqtt.publish_calls) < publishes_before + 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    time.sleep(0.1)
+
+    new_publishes = mqtt.publish_calls[publishes_before:]
+    assert [c[0] for c in new_publishes] == [_device_topic(first), _device_topic(second)]
+    assert len(json.loads(new_publishes[0][1])["components"]) == 11
+
+
+def test_flush_is_a_synchronous_barrier():
+    mqtt = _FakeMqttConnection()
+    connection, _origin, first, _second = _build_two_device_tree(mqtt)
+    connection.republish_discovery()
+    publishes_before = len(mqtt.publish_calls)
+    connection.debounce_discovery(window=60.0)
+
+    connection.add_entity(HomeAssistantEntityBase(Component.SENSOR, "Flushed"), first)
+    assert len(mqtt.publish_calls) == publishes_before
+
+    connection.flush()
+    assert [c[0] for c in mqtt.publish_calls[publishes_before:]] == [_device_topic(first)]
+
+
+def test_device_delete_cancels_pending_debounced_republish():
+    mqtt = _FakeMqttConnection()
+    connection, _origin, first, _second = _build_two_device_tree(mqtt)
+    connection.republish_discovery()
+    publishes_before = len(mqtt.publish_calls)
+    connection.debounce_discovery(window=60.0)
+
+    connection.add_entity(HomeAssistantEntityBase(Component.SENSOR, "Doomed"), first)
+    connection.remove_device(first)
+    connection.flush()
+
+    assert [(c[0], c[1]) for c in mqtt.publish_calls[publishes_before:]] == [(_device_topic(first), "")]
+
+
+def test_running_debounced_flush_skips_devices_removed_meanwhile():
+    class _RemovingMqttConnection(_FakeMqttConnection):
+        on_publish = None
+
+        def publish(self, topic, payload, qos, retain, wait_for_publish=False):
+            info = super().publish(topic, payload, qos, retain)
+            if self.on_publish is not None:
+                hook, self.on_publish = self.on_publish, None
+                hook(topic)
+            return info
+
+    mqtt = _RemovingMqttConnection()
+    connection, _origin, first, second = _build_two_device_tree(mqtt)
+    connection.republish_discovery()
+    publishes_before = len(mqtt.publish_calls)
+    connection.debounce_discovery(window=60.0)
+
+    connection.add_entity(HomeAssistantEntityBase(Component.SENSOR, "Added 1"), first)
+    connection.add_entity(HomeAssistantEntityBase(Component.SENSOR, "Added 2"), second)
+    # second is removed while the flush is publishing first.
+    mqtt.on_publish = lambda _topic: connection.remove_device(second)
+    connection.flush()
+
+    assert [(c[0], c[1] == "") for c in mqtt.publish_calls[publishes_before:]] == [
+        (_device_topic(first), False), (_device_topic(second), True)]
+
+
+def test_debouncer_rejects_requests_racing_with_close():
+    from jhomeassistant.helper.debouncer import Debouncer
+
+    flushed, rejected = [], []
+
+    def request_late(keys):
+        # A request arriving while close() runs its final flush must fail instead of being dropped.
+        try:
+            debouncer.request("late")
+        except RuntimeError:
+            rejected.append("late")
+        flushed.append(keys)
+
+    debouncer = Debouncer(60.0, request_late)
+    debouncer.request("first")
+    debouncer.close()
+
+    assert flushed == [["first"]]
+    assert rejected == ["late"]
+    assert debouncer.pending == 0
+
+
+# ---------------------------------------------------------------------------
+# payload splitting
+# ---------------------------------------------------------------------------
+
+def _build_large_device_tree(mqtt_connection, entities: int):
+    device = HomeAssistantDevice("Gateway", identifier="gateway-id")
+    device.add_entities(*(HomeAssistantEntityBase(Component.SENSOR, f"Register {i}") for i in range(entities)))
+    origin = HomeAssistantOrigin("Split App").add_devices(device)
+    return HomeAssistantConnection(mqtt_connection).add_origin(origin), device
+
+
+def test_oversized_device_discovery_is_split_with_shared_device_block():
+    connection, device = _build_large_device_tree(_FakeMqttConnection(), 40)
+    [(_topic, whole)] = connection.device_discovery(device)
+
+    connection.discovery_payload_limit(2048)
+    messages = connection.device_discovery(device)
+
+    assert len(messages) > 1
+    assert messages[0][0] == _device_topic(device)
+    assert all(len(payload) <= 2048 for _topic, payload in messages)
+    assert len({topic for topic, _payload in messages}) == len(messages)
+
+    payloads = [json.loads(payload) for _topic, payload in messages]
+    expected = json.loads(whole)
+    assert all(p["device"] == expected["device"] and p["origin"] == expected["origin"] for p in payloads)
+    merged = {uid: component for p in payloads for uid, component in p["components"].items()}
+    assert merged == expected["components"]
+    assert connection.discovery_payload_sizes() == {device.unique_id: [len(p) for _t, p in messages]}
+
+
+def test_payload_within_limit_is_not_split():
+    connection, device = _build_large_device_tree(_FakeMqttConnection(), 3)
+    unlimited = connection.device_discovery(device)
+
+    connection.discovery_payload_limit(64 * 1024)
+    assert connection.device_discovery(device) == unlimited
+
+
+def test_shrinking_device_clears_unused_parts():
+    mqtt = _FakeMqttConnection()
+    connection, device = _build_large_device_tree(mqtt, 40)
+    connection.discovery_payload_limit(2048).republish_discovery()
+    part_topics = [c[0] for c in mqtt.publish_calls]
+    assert len(part_topics) > 1
+    publishes_before = len(mqtt.publish_calls)
+
+    connection.remove_entity(device.entities[-1])
+    with connection.batch():
+        for entity in list(device.entities[1:]):
+            connection.remove_entity(entity)
+
+    cleared = {c[0] for c in mqtt.publish_calls[publishes_before:] if c[1] == b""}
+    assert cleared == set(part_topics[1:])
+
+    connection.remove_device(device)
+    assert [c[0] for c in mqtt.publish_calls if c[1] == ""] == [_device_topic(device)]
+
+
+def _component_parts(messages) -> dict:
+    return {unique_id: topic for topic, payload in messages if payload
+            for unique_id in json.loads(payload)["components"]}
+
+
+def test_split_parts_keep_their_components_when_the_device_changes():
+    mqtt = _FakeMqttConnection()
+    connection, device = _build_large_device_tree(mqtt, 40)
+    connection.discovery_payload_limit(2048).republish_discovery()
+    before = _component_parts(connection.device_discovery(device))
+    assert len(set(before.values())) > 2
+    publishes_before = len(mqtt.publish_calls)
+
+    removed = device.entities[0]
+    connection.remove_entity(removed)
+
+    after = _component_parts(connection.device_discovery(device))
+    del before[device.internal_entity_unique_id(removed)]
+    assert after == before
+    # Only the part that lost the component is republished.
+    assert [c[0] for c in mqtt.publish_calls[publishes_before:]] == [_device_topic(device)]
+
+    # When a part outgrows the limit, only components of that part move, and it is published first.
+    full_part = device.internal_discovery_topic("homeassistant", 1)
+    grown = next(entity for entity in device.entities if after[device.internal_entity_unique_id(entity)] == full_part)
+    publishes_before = len(mqtt.publish_calls)
+    grown.availability.add(f"gateway/{'x' * 300}/status")
+    connection.publish_device_discovery(device)
+
+    regrouped = _component_parts(connection.device_discovery(device))
+    moved = {uid for uid, topic in regrouped.items() if topic != after[uid]}
+    assert moved and {after[uid] for uid in moved} == {full_part}
+    topics = [c[0] for c in mqtt.publish_calls[publishes_before:]]
+    assert topics[0] == full_part and all(regrouped[uid] in topics[1:] for uid in moved)
+
+
+def test_split_parts_of_the_previous_run_are_kept_after_a_restart(tmp_path):
+    path = tmp_path / "discovery.bin"
+    first, device = _build_large_device_tree(_FakeMqttConnection(), 40)
+    _run_once(first.discovery_payload_limit(2048).discovery_artifact(path))
+    before = _component_parts(first.device_discovery(device))
+
+    # The next process starts without the first register.
+    device = HomeAssistantDevice("Gateway", identifier="gateway-id")
+    device.add_entities(*(HomeAssistantEntityBase(Component.SENSOR, f"Register {i}") for i in range(1, 40)))
+    mqtt = _FakeMqttConnection()
+    second = HomeAssistantConnection(mqtt).add_origin(HomeAssistantOrigin("Split App").add_devices(device))
+    _run_once(second.discovery_payload_limit(2048).discovery_artifact(path))
+
+    after = _component_parts(second.device_discovery(device))
+    assert all(before[uid] == topic for uid, topic in after.items())
+
+
+def test_reconciliation_clears_parts_left_by_a_previous_process():
+    mqtt = _FakeRetainingMqttConnection({})
+    connection, device = _build_large_device_tree(mqtt, 3)
+    stale = [device.internal_discovery_topic("homeassistant", part) for part in (1, 2)]
+    mqtt.retained = {topic: b"{}" for topic in stale}
+    connection.discovery_payload_limit(64 * 1024).reconcile_retained_discovery(window=0.01)
+
+    _run_once(connection)
+
+    cleared = [c[0] for c in mqtt.publish_calls if c[1] == b""]
+    assert sorted(cleared) == sorted(stale)
+    assert [c[0] for c in mqtt.publish_calls if c[1] != b""] == [_device_topic(device)]
+
+
+def test_discovery_artifact_clears_parts_of_the_previous_run(tmp_path):
+    path = tmp_path / "discovery.bin"
+    first, device = _build_large_device_tree(_FakeMqttConnection(), 40)
+    _run_once(first.discovery_payload_limit(2048).discovery_artifact(path))
+    previous_parts = [topic for topic, _payload in first.device_discovery(device)]
+    assert len(previous_parts) > 1
+
+    mqtt = _FakeMqttConnection()
+    second, device = _build_large_device_tree(mqtt, 3)
+    _run_once(second.discovery_payload_limit(2048).discovery_artifact(path))
+
+    assert sorted(c[0] for c in mqtt.publish_calls if c[1] == b"") == sorted(previous_parts[1:])
+
+    third = _FakeMqttConnection()
+    connection, device = _build_large_device_tree(third, 3)
+    _run_once(connection.discovery_payload_limit(2048).discovery_artifact(path))
+    assert [c[1] for c in third.publish_calls if c[1] == b""] == []
+
+
+# ---------------------------------------------------------------------------
+# per-component discovery
+# ---------------------------------------------------------------------------
+
+def _component_topic(device: HomeAssistantDevice, entity: HomeAssistantEntityBase) -> str:
+    return f"homeassistant/{entity.platform.value}/{device.unique_id}/{entity.identifier}/config"
+
+
+def test_component_mode_publishes_one_message_per_entity():
+    mqtt = _FakeMqttConnection()
+    connection, _origin, first, second = _build_two_device_tree(mqtt)
+    [(_topic, device_payload)] = connection.device_discovery(first)
+    first.discovery_mode = DiscoveryMode.COMPONENT
+    first.add_entities(HomeAssistantEntityBase(Component.BINARY_SENSOR, "Door"))
+    first.entities[1].availability.add("component/door/status")
+
+    messages = connection.device_discovery(first)
+
+    assert [topic for topic, _payload in messages] == [_component_topic(first, e) for e in first.entities]
+    expected_device = json.loads(device_payload)
+    for (_topic, payload), entity in zip(messages, first.entities):
+        decoded = json.loads(payload)
+        assert decoded["device"] == expected_device["device"]
+        assert decoded["origin"] == expected_device["origin"]
+        assert "platform" not in decoded and decoded["name"] == entity.name
+    assert json.loads(messages[1][1])["availability"] == [{"topic": "component/door/status"}]
+
+
+def test_component_mode_republishes_only_changed_entity():
+    mqtt = _FakeMqttConnection()
+    connection, _origin, first, _second = _build_two_device_tree(mqtt)
+    first.discovery_mode = DiscoveryMode.COMPONENT
+    extra = HomeAssistantEntityBase(Component.SENSOR, "Pressure")
+    first.add_entities(extra)
+    connection.republish_discovery()
+    publishes_before = len(mqtt.publish_calls)
+
+    extra.availability.add("component/pressure/status")
+    connection.republish_discovery()
+    assert [c[0] for c in mqtt.publish_calls[publishes_before:]] == [_component_topic(first, extra)]
+
+    connection.remove_entity(extra)
+    assert [(c[0], c[1]) for c in mqtt.publish_calls[publishes_before + 1:]] == [(_component_topic(first, extra), b"")]
+
+
+def test_switching_discovery_mode_clears_previous_topics():
+    mqtt = _FakeMqttConnection()
+    connection, _origin, first, _second = _build_two_device_tree(mqtt)
+    connection.republish_discovery()
+    publishes_before = len(mqtt.publish_calls)
+
+    first.discovery_mode = DiscoveryMode.COMPONENT
+    connection.republish_discovery()
+
+    new_publishes = {c[0]: c[1] for c in mqtt.publish_calls[publishes_before:]}
+    assert new_publishes[_device_topic(first)] == b""
+    assert new_publishes[_component_topic(first, first.entities[0])] != b""
+
+
+def test_switching_discovery_mode_acknowledges_deletes_before_new_configs():
+    class _OrderRecordingMqttConnection(_FakeWindowedMqttConnection):
+        deletes_acked: list = []
+
+        def publish(self, topic, payload, qos, retain):
+            # For every config, whether each delete sent so far was acknowledged at that time.
+            if payload:
+                self.deletes_acked.append([c[4].acked for c in self.publish_calls if c[1] == b""])
+            return super().publish(topic, payload, qos, retain)
+
+    for switch_to, previous in ((DiscoveryMode.COMPONENT, DiscoveryMode.DEVICE),
+                                (DiscoveryMode.DEVICE, DiscoveryMode.COMPONENT)):
+        mqtt = _OrderRecordingMqttConnection()
+        connection, _origin, first, _second = _build_two_device_tree(mqtt)
+        first.discovery_mode = previous
+        connection.republish_discovery(publish_timeout=1.0)
+        publishes_before = len(mqtt.publish_calls)
+        mqtt.deletes_acked = []
+
+        first.discovery_mode = switch_to
+        connection.publish_device_discovery(first, publish_timeout=1.0)
+
+        calls = mqtt.publish_calls[publishes_before:]
+        deletes = [i for i, c in enumerate(calls) if c[1] == b""]
+        assert deletes and max(deletes) < min(i for i, c in enumerate(calls) if c[1] != b"")
+        assert mqtt.deletes_acked and all(all(acked) for acked in mqtt.deletes_acked)
+
+
+def test_component_mode_startup_clears_device_topic_of_a_previous_process():
+    mqtt = _FakeMqttConnection()
+    connection, _origin, first, second = _build_two_device_tree(mqtt)
+    first.discovery_mode = DiscoveryMode.COMPONENT
+
+    _run_once(connection)
+
+    cleared = [c[0] for c in mqtt.publish_calls if c[1] == b""]
+    assert cleared == [_device_topic(first)]
+    assert _device_topic(second) not in cleared
+    # The old device topic is cleared before the component configs go out.
+    assert mqtt.publish_calls[0][0] == _device_topic(first)
+
+
+def test_device_mode_startup_clears_component_topics_of_a_previous_process(tmp_path):
+    path = tmp_path / "discovery.bin"
+    before, _origin, first, _second = _build_two_device_tree(_FakeMqttConnection())
+    first.discovery_mode = DiscoveryMode.COMPONENT
+    _run_once(before.discovery_artifact(path))
+    component_topics = [_component_topic(first, entity) for entity in first.entities]
+
+    mqtt = _FakeMqttConnection()
+    after, _origin, first, _second = _build_two_device_tree(mqtt)
+    _run_once(after.discovery_artifact(path))
+    assert sorted(c[0] for c in mqtt.publish_calls if c[1] == b"") == sorted(component_topics)
+
+    foreign = ["homeassistant/sensor/other-integration/value/config", "homeassistant/device/other-device/config"]
+    mqtt = _FakeRetainingMqttConnection({topic: b"{}" for topic in component_topics + foreign})
+    reconciled, _origin, first, second = _build_two_device_tree(mqtt)
+    _run_once(reconciled.reconcile_retained_discovery(window=0.01))
+    assert sorted(c[0] for c in mqtt.publish_calls if c[1] == b"") == sorted(component_topics)
+    # Only the connection's own discovery topics are subscribed for component mode.
+    assert sorted(mqtt.unsubscribe_calls[:-1]) == sorted([
+        "homeassistant/device/+/config", f"homeassistant/+/{first.unique_id}/+/config",
+        f"homeassistant/+/{second.unique_id}/+/config"])
+    assert set(reconciled._collect_retained_discovery(0.0)) == set(component_topics)
+
+
+# ---------------------------------------------------------------------------
+# payload minimizer
+# ---------------------------------------------------------------------------
+
+# Root options Home Assistant's device discovery merges into components that do not set them
+# (SHARED_OPTIONS in homeassistant/components/mqtt/discovery.py); "~" is not one of them.
+_HA_SHARED_OPTIONS = ("availability", "availability_mode", "availability_template", "availability_topic",
+                      "command_topic", "encoding", "payload_available", "payload_not_available", "qos", "state_topic")
+
+
+def _resolve_like_home_assistant(payload: dict) -> dict:
+    """Per-component configuration as Home Assistant derives it from a device discovery payload."""
+    shared = {k: payload[k] for k in _HA_SHARED_OPTIONS if k in payload}
+    resolved = {}
+    for unique_id, component in payload["components"].items():
+        config = json.loads(json.dumps({**shared, **component}))
+        base = config.pop("~", None)
+        if base is not None:
+            for key, value in config.items():
+                if key.endswith("topic") and value.startswith("~"):
+                    config[key] = base + value[1:]
+            for item in config.get("availability", []):
+                if item["topic"].startswith("~"):
+                    item["topic"] = base + item["topic"][1:]
+        resolved[unique_id] = config
+    return resolved
+
+
+def _build_gateway_tree(mqtt_connection):
+    device = HomeAssistantDevice("Gateway", identifier="minimizer-id")
+    for i in range(5):
+        sensor = SensorEntity(f"Register {i}", f"plant/gateway/registers/{i}/state")
+        sensor.availability.add("plant/gateway/status")
+        device.add_entities(sensor)
+    mode = SelectEntity("Mode", "plant/gateway/mode/state", "plant/gateway/mode/set", ["a", "b"],
+                        on_select=lambda *_: None, retain=False)
+    mode.availability.add("plant/gateway/status")
+    device.add_entities(mode)
+    origin = HomeAssistantOrigin("Minimizer App").add_devices(device)
+    return HomeAssistantConnection(mqtt_connection).add_origin(origin), device
+
+
+def test_minimized_discovery_resolves_to_the_same_configuration():
+    connection, device = _build_gateway_tree(_FakeMqttConnection())
+    [(_topic, full)] = connection.device_discovery(device)
+
+    [(_topic, minimized)] = connection.minimize_discovery().device_discovery(device)
+
+    decoded = json.loads(minimized)
+    assert len(minimized) < len(full)
+    assert "~" not in decoded
+    assert decoded["availability"] == [{"topic": "plant/gateway/status"}]
+    assert all("availability" not in c and "retain" not in c for c in decoded["components"].values())
+    mode = decoded["components"][device.internal_entity_unique_id(device.entities[-1])]
+    assert mode["~"] == "plant/gateway/mode"
+    assert mode["state_topic"] == "~/state" and mode["command_topic"] == "~/set"
+
+    expected = _resolve_like_home_assistant(json.loads(full))
+    for config in expected.values():
+        config.pop("retain", None)
+    assert _resolve_like_home_assistant(decoded) == expected
+
+
+def test_minimizer_keeps_differing_availability_on_components():
+    connection, device = _build_gateway_tree(_FakeMqttConnection())
+    device.entities[0].availability.add("plant/other/status")
+    connection.minimize_discovery()
+
+    [(_topic, minimized)] = connection.device_discovery(device)
+
+    decoded = json.loads(minimized)
+    first_uid = device.internal_entity_unique_id(device.entities[0])
+    assert len(decoded["components"][first_uid]["availability"]) == 2
+    assert sum("availability" in c for c in decoded["components"].values()) == 1
+
+
+def test_minimizer_drops_optimistic_false_only_with_a_state_topic():
+    from jhomeassistant.helper.abbreviations import get_key_table
+    from jhomeassistant.helper.discovery_minimizer import DiscoveryMinimizer
+
+    minimizer = DiscoveryMinimizer(get_key_table(False))
+    stateful = {"state_topic": "plant/mode/state", "command_topic": "plant/mode/set", "optimistic": False}
+    stateless = {"command_topic": "plant/mode/set", "optimistic": False}
+
+    minimizer.drop_defaults(stateful)
+    minimizer.drop_defaults(stateless)
+
+    assert "optimistic" not in stateful
+    assert stateless["optimistic"] is False
+
+
+# ---------------------------------------------------------------------------
+# discovery artifact
+# ---------------------------------------------------------------------------
+
+def _run_once(connection):
+    runtime = connection.run(blocking=False, schedule_resolution=0.01, publish_timeout=1.0)
+    runtime.stop(timeout=1.0)
+    assert runtime.join(timeout=1.0) is True
+    assert runtime.last_error is None
+
+
+def _count_encodes(monkeypatch, connection):
+    calls = []
+    encode = connection._encode_device
+    monkeypatch.setattr(connection, "_encode_device", lambda origin, device: calls.append(device) or encode(origin, device))
+    return calls
+
+
+def test_discovery_artifact_is_reused_on_warm_start(monkeypatch, tmp_path):
+    path = tmp_path / "discovery.bin"
+    cold, _device = _build_gateway_tree(_FakeMqttConnection())
+    _run_once(cold.discovery_artifact(path))
+    assert path.exists()
+
+    mqtt_connection = _FakeMqttConnection()
+    warm, _device = _build_gateway_tree(mqtt_connection)
+    warm.discovery_artifact(path)
+    encoded = _count_encodes(monkeypatch, warm)
+    written = path.stat().st_mtime_ns
+    _run_once(warm)
+
+    assert encoded == []
+    assert path.stat().st_mtime_ns == written
+    published = [(topic, payload) for topic, payload, *_rest in mqtt_connection.publish_calls]
+    reference, device = _build_gateway_tree(_FakeMqttConnection())
+    assert published == reference.device_discovery(device)
+
+
+def test_discovery_artifact_rebuilds_changed_devices(monkeypatch, tmp_path):
+    path = tmp_path / "discovery.bin"
+    cold, _device = _build_gateway_tree(_FakeMqttConnection())
+    _run_once(cold.discovery_artifact(path))
+
+    mqtt_connection = _FakeMqttConnection()
+    changed, device = _build_gateway_tree(mqtt_connection)
+    device.entities[0].availability.add("plant/other/status")
+    encoded = _count_encodes(monkeypatch, changed.discovery_artifact(path))
+    _run_once(changed)
+
+    assert encoded == [device]
+    [(_topic, payload, *_rest)] = mqtt_connection.publish_calls
+    assert b"plant/other/status" in payload
+
+    warm, _device = _build_gateway_tree(_FakeMqttConnection())
+    device = warm._origins[0]._devices[0]
+    device.entities[0].availability.add("plant/other/status")
+    encoded = _count_encodes(monkeypatch, warm.discovery_artifact(path))
+    _run_once(warm)
+    assert encoded == []
+
+
+def _build_gateway_and_meter_tree():
+    connection, device = _build_gateway_tree(_FakeMqttConnection())
+    meter = HomeAssistantDevice("Meter", identifier="meter-id").add_entities(SensorEntity("Energy", "plant/meter/state"))
+    connection._origins[0].add_devices(meter)
+    return connection, device
+
+
+def test_discovery_artifact_appends_only_changed_devices(tmp_path):
+    from jhomeassistant.helper.discovery_artifact import DiscoveryArtifact
+
+    path = tmp_path / "discovery.bin"
+    cold, _device = _build_gateway_and_meter_tree()
+    _run_once(cold.discovery_artifact(path))
+    written = path.read_bytes()
+
+    changed, device = _build_gateway_and_meter_tree()
+    device.entities[0].availability.add("plant/other/status")
+    _run_once(changed.discovery_artifact(path))
+
+    assert path.read_bytes().startswith(written)
+    artifact = DiscoveryArtifact(path)
+    try:
+        # Two devices, one changed: the new record plus the removal of the outdated one were appended.
+        assert len(artifact) == 2 and artifact.stored_records == 4
+        assert sorted(artifact.topics()) == sorted(d.internal_discovery_topic("homeassistant")
+                                                   for d in changed._origins[0]._devices)
+        assert any(b"plant/other/status" in artifact.get(fingerprint)[0][1] for fingerprint in artifact)
+    finally:
+        artifact.close()
+
+    # An interrupted append leaves a torn segment, which is ignored on load and overwritten by the next append.
+    with open(path, "ab") as file:
+        file.write(b"JHADISC\x00torn")
+    DiscoveryArtifact(path).append([(b"f" * 16, [("homeassistant/device/extra/config", b"{}")])])
+    artifact = DiscoveryArtifact(path)
+    try:
+        assert len(artifact) == 3 and artifact.get(b"f" * 16) == [("homeassistant/device/extra/config", b"{}")]
+    finally:
+        artifact.close()
+
+    # Once more than half of the stored records are outdated, the file is rewritten.
+    warm, device = _build_gateway_and_meter_tree()
+    device.entities[1].availability.add("plant/third/status")
+    _run_once(warm.discovery_artifact(path))
+    artifact = DiscoveryArtifact(path)
+    try:
+        assert len(artifact) == 2 and artifact.stored_records == 2
+    finally:
+        artifact.close()
+
+
+def test_discovery_fingerprint_reuses_digests_of_unchanged_objects(monkeypatch):
+    import jhomeassistant.helper.discovery_artifact as discovery_artifact_module
+
+    dumped = []
+    pickler = discovery_artifact_module._DigestPickler
+
+    class CountingPickler(pickler):
+        def dump(self, obj):
+            dumped.append(obj)
+            return super().dump(obj)
+
+    monkeypatch.setattr(discovery_artifact_module, "_DigestPickler", CountingPickler)
+    connection, device = _build_gateway_tree(_FakeMqttConnection())
+    origin = connection._origins[0]
+    origin.internal_inherit(device)
+    first = discovery_artifact_module.discovery_fingerprint(("homeassistant",), origin, device)
+    assert dumped == [origin, device]
+
+    assert discovery_artifact_module.discovery_fingerprint(("homeassistant",), origin, device) == first
+    assert dumped == [origin, device]
+
+    device.entities[0].availability.add("plant/other/status")
+    assert discovery_artifact_module.discovery_fingerprint(("homeassistant",), origin, device) != first
+    assert dumped == [origin, device, device]
+
+
+def test_discovery_fingerprint_is_stable_across_processes():
+    import subprocess
+    import sys
+
+    script = (
+        "from jhomeassistant import HomeAssistantDevice, HomeAssistantOrigin\n"
+        "from jhomeassistant.entities import SelectEntity, SensorEntity\n"
+        "from jhomeassistant.helper.discovery_artifact import discovery_fingerprint\n"
+        "device = HomeAssistantDevice('Gateway', identifier='fingerprint-id')\n"
+        "sensor = SensorEntity('Register', 'plant/register/state')\n"
+        "sensor.availability.add('plant/gateway/status')\n"
+        "device.add_entities(sensor, SelectEntity('Mode', 'plant/mode/state', 'plant/mode/set', ['a', 'b'],\n"
+        "                                         on_select=lambda *_: None))\n"
+        "origin = HomeAssistantOrigin('Fingerprint App').add_devices(device)\n"
+        "origin.internal_inherit(device)\n"
+        "print(discovery_fingerprint(('homeassistant', False), origin, device).hex())\n"
+    )
+    fingerprints = {subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True,
+                                   env={**os.environ, "PYTHONHASHSEED": seed}).stdout.strip()
+                    for seed in ("1", "2")}
+    assert len(fingerprints) == 1 and len(fingerprints.pop()) == 32
+
+
+def test_discovery_fingerprints_are_only_computed_around_startup(monkeypatch, tmp_path):
+    import jhomeassistant.homeassistant_connection as homeassistant_connection_module
+
+    calls = []
+    fingerprint = homeassistant_connection_module.discovery_fingerprint
+    monkeypatch.setattr(homeassistant_connection_module, "discovery_fingerprint",
+                        lambda *args: calls.append(args) or fingerprint(*args))
+    path = tmp_path / "discovery.bin"
+    connection, device = _build_gateway_tree(_FakeMqttConnection())
+    _run_once(connection.discovery_artifact(path))
+    assert len(calls) == 1
+
+    device.entities[0].availability.add("plant/other/status")
+    connection.republish_discovery()
+    assert len(calls) == 1
+
+    warm, _device = _build_gateway_tree(_FakeMqttConnection())
+    _run_once(warm.discovery_artifact(path))
+    assert len(calls) == 2
+
+
+def test_corrupt_discovery_artifact_is_ignored(monkeypatch, tmp_path):
+    path = tmp_path / "discovery.bin"
+    path.write_bytes(b"not an artifact")
+    mqtt_connection = _FakeMqttConnection()
+    connection, device = _build_gateway_tree(mqtt_connection)
+    encoded = _count_encodes(monkeypatch, connection.discovery_artifact(path))
+
+    _run_once(connection)
+
+    assert encoded == [device]
+    assert len(mqtt_connection.publish_calls) == 1
+    assert path.read_bytes().startswith(b"JHADISC")
+
+
+# ---------------------------------------------------------------------------
+# device facts
+# ---------------------------------------------------------------------------
+
+def _count_fact_collections(monkeypatch):
+    calls = []
+
+    def collect():
+        calls.append(1)
+        return f"serial-{len(calls)}", [("mac", "aa:bb:cc:dd:ee:ff")]
+
+    monkeypatch.setattr(homeassistant_device_module.client_identity.facts, "collect_device_facts", collect)
+    return calls
+
+
+def test_device_facts_are_collected_once_and_only_when_needed(monkeypatch):
+    calls = _count_fact_collections(monkeypatch)
+
+    devices = [HomeAssistantDevice(f"Device {i}") for i in range(50)]
+    explicit = HomeAssistantDevice("Explicit", identifier="explicit-id")
+    assert calls == []
+
+    assert {device.serial_number for device in devices} == {"serial-1"}
+    assert explicit.identifiers and len(calls) == 1
+    assert devices[0].unique_id != devices[1].unique_id
+
+    device_facts.refresh()
+    assert len(calls) == 2
+    assert HomeAssistantDevice("Later").serial_number == "serial-2"
+    assert devices[0].serial_number == "serial-1"
+
+
+def test_device_facts_cache_file_is_shared_until_it_expires(monkeypatch, tmp_path):
+    calls = _count_fact_collections(monkeypatch)
+    provider = DeviceFactsProvider().use_cache_file(tmp_path / "facts.json", ttl=60)
+
+    assert provider.get() == ("serial-1", [("mac", "aa:bb:cc:dd:ee:ff")])
+    assert DeviceFactsProvider().use_cache_file(tmp_path / "facts.json", ttl=60).get() == provider.get()
+    assert len(calls) == 1
+
+    monkeypatch.setattr(time, "time", lambda: json.loads((tmp_path / "facts.json").read_text())["collected_at"] + 61)
+    assert DeviceFactsProvider().use_cache_file(tmp_path / "facts.json", ttl=60).get()[0] == "serial-2"
+
+
+# ---------------------------------------------------------------------------
+# identity tokens
+# ---------------------------------------------------------------------------
+
+def test_identity_tokens_are_memoized_until_their_inputs_change(monkeypatch):
+    calls = []
+    build = homeassistant_device_module.client_identity.hashing.build_urlsafe_token
+    monkeypatch.setattr(homeassistant_device_module.client_identity.hashing, "build_urlsafe_token",
+                        lambda *args: calls.append(args) or build(*args))
+    device = HomeAssistantDevice("Memo Device", identifier="memo-id")
+    entity = SensorEntity("Power", "memo/power/state")
+    calls.clear()
+
+    first = device.unique_id
+    assert device.unique_id == first and entity.identifier == entity.identifier
+    assert len(calls) == 2
+
+    device.name = "Renamed Device"
+    renamed = device.unique_id
+    device.identifiers[0] = "other-id"
+    assert len({first, renamed, device.unique_id}) == 3
+    assert device.unique_id == build("other-id", 32, "Renamed Device")
+    assert len(calls) == 4
+
+
+# ---------------------------------------------------------------------------
+# slugs and default entity ids
+# ---------------------------------------------------------------------------
+
+@pytest.mark.parametrize("name", ["Living Room", "  Temp (°C) ", "1,000 W", "Kid's  room--2", "a_-_b", "R&amp;D",
+                                  "Ærø Straße", "___", ""])
+def test_ha_slugify_matches_python_slugify(name):
+    from slugify import slugify
+
+    expected = slugify(name, lowercase=True, separator="_", regex_pattern=r"[^a-z0-9_]+").strip("_")
+    assert naming_module.ha_slugify(name) == expected
+
+
+def test_default_entity_id_shortens_the_device_part_first():
+    entity_id = naming_module.get_default_entity_id(Component.SENSOR, "d" * 300, "e" * 100)
+    assert entity_id == f"sensor.{'d' * 147}_{'e' * 100}" and len(entity_id) == 255
+
+    entity_id = naming_module.get_default_entity_id(Component.SENSOR, "d" * 300, "e" * 300)
+    assert entity_id == f"sensor.{'d' * 20}_{'e' * 300}"[:255]
+
+
+# ---------------------------------------------------------------------------
+# lazy package imports
+# ---------------------------------------------------------------------------
+
+def test_package_imports_submodules_on_first_access():
+    import subprocess
+    import sys
+
+    script = (
+        "import sys, jhomeassistant\n"
+        "loaded = lambda: sorted(m for m in sys.modules if m.startswith('jhomeassistant.'))\n"
+        "print(loaded())\n"
+        "from jhomeassistant.types import Component\n"
+        "print(any(m.startswith('jhomeassistant.types.units.') for m in loaded()))\n"
+        "print(Component.SENSOR.device_class.TEMPERATURE.unit.__name__, jhomeassistant.HomeAssistantConnection.__name__)\n"
+    )
+    output = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True).stdout.splitlines()
+
+    assert output == ["['jhomeassistant.lazy_import']", "False", "TemperatureUnit HomeAssistantConnection"]
+
+
+# ---------------------------------------------------------------------------
+# topic validation
+# ---------------------------------------------------------------------------
+
+def test_validate_topic_caches_results_and_warns_once(caplog):
+    from jhomeassistant.helper import validate_topic
+
+    topic = "".join(["cache/", "topic with space"])
+    with caplog.at_level("WARNING", logger="jhomeassistant.validation"):
+        first = validate_topic(topic)
+        second = validate_topic("cache/topic with space")
+    assert first is second == topic
+    assert len([r for r in caplog.records if "best-practice" in r.getMessage()]) == 1
+
+    for _ in range(2):
+        with pytest.raises(ValueError, match="best practices"):
+            validate_topic(topic, strict_mode=True)
+        with pytest.raises(ValueError, match="wildcards"):
+            validate_topic("cache/+/state")
+    with pytest.raises(ValueError, match="must be a string"):
+        validate_topic(["not", "hashable"])
+
+
+# ---------------------------------------------------------------------------
+# schedule executor
+# ---------------------------------------------------------------------------
+
+def test_schedule_executor_runs_entity_schedules_on_an_owned_worker_pool(monkeypatch):
+    from jhomeassistant.types import OverrunPolicy
+
+    _patch_device_facts(monkeypatch)
+    mqtt = _FakeMqttConnection()
+    threads = set()
+    ran = threading.Event()
+
+    def _on_tick(_conn):
+        threads.add(threading.current_thread().name)
+        ran.set()
+
+    entity = HomeAssistantEntityBase(Component.SENSOR, "Pooled")
+    entity.add_schedule(0.01, _on_tick, max_concurrency=2, overrun=OverrunPolicy.QUEUE_ONE, timeout=1.0)
+    assert entity.schedules[0].max_concurrency == 2
+    device = HomeAssistantDevice("Pool Device").add_entities(entity)
+    connection = HomeAssistantConnection(mqtt).add_origin(HomeAssistantOrigin("Pool App").add_devices(device))
+    assert connection.schedule_executor(2) is connection
+    with pytest.raises(ValueError):
+        connection.schedule_executor(0)
+
+    runtime = connection.run(blocking=False, schedule_resolution=0.01, publish_timeout=1.0)
+    assert ran.wait(timeout=1.0)
+    runtime.stop(timeout=1.0)
+    assert runtime.join(timeout=1.0) is True
+
+    assert threads and all(name.startswith("jhomeassistant-schedule") for name in threads)
+
+
+def test_runtime_scheduler_stats_report_entity_schedules(monkeypatch):
+    _patch_device_facts(monkeypatch)
+    mqtt = _FakeMqttConnection()
+    ran = threading.Event()
+    entity = HomeAssistantEntityBase(Component.SENSOR, "Measured").add_schedule(0.01, lambda _conn: ran.set())
+    idle = HomeAssistantEntityBase(Component.SENSOR, "Idle")
+    device = HomeAssistantDevice("Stats Device").add_entities(entity, idle)
+    connection = HomeAssistantConnection(mqtt).add_origin(HomeAssistantOrigin("Stats App").add_devices(device))
+
+    runtime = connection.run(blocking=False, schedule_resolution=0.01, publish_timeout=1.0)
+    assert ran.wait(timeout=1.0)
+    stats = runtime.scheduler_stats()
+    runtime.stop(timeout=1.0)
+
+    unique_id = device.internal_entity_unique_id(entity)
+    assert list(stats) == [unique_id]
+    assert stats[unique_id][0].runs >= 1
+    assert stats[unique_id][0].failures == 0
+
+
+# ---------------------------------------------------------------------------
+# schedule groups
+# ---------------------------------------------------------------------------
+
+def test_runtime_scheduler_stats_report_schedule_groups_by_name(monkeypatch):
+    _patch_device_facts(monkeypatch)
+    mqtt = _FakeMqttConnection()
+    sensor = SensorEntity("Register", "bus/register")
+    device = HomeAssistantDevice("Bus Device").add_entities(sensor)
+    connection = HomeAssistantConnection(mqtt).add_origin(HomeAssistantOrigin("Bus App").add_devices(device))
+    collected = threading.Event()
+
+    def read_bus():
+        collected.set()
+        return {sensor: 1.0}
+
+    named = HomeAssistantScheduleGroup(0.01, read_bus, name="modbus")
+    unnamed = HomeAssistantScheduleGroup(0.01, read_bus)
+    connection.add_schedule_group(named, unnamed)
+
+    runtime = connection.run(blocking=False, schedule_resolution=0.01, publish_timeout=1.0)
+    assert collected.wait(timeout=1.0)
+    stats = runtime.scheduler_stats()
+    runtime.stop(timeout=1.0)
+
+    assert unnamed.name.endswith("read_bus")
+    assert {"modbus", unnamed.name} <= set(stats)
+    assert [entry.interval for entry in stats["modbus"]] == [0.01]
+    assert stats["modbus"][0].failures == 0
+
+
+def test_runtime_scheduler_stats_follow_the_adaptive_interval_of_a_group(monkeypatch):
+    from jhomeassistant.helper.scheduler import AdaptiveInterval
+
+    _patch_device_facts(monkeypatch)
+    mqtt = _FakeMqttConnection()
+    sensor = SensorEntity("Register", "bus/register")
+    device = HomeAssistantDevice("Bus Device").add_entities(sensor)
+    connection = HomeAssistantConnection(mqtt).add_origin(HomeAssistantOrigin("Bus App").add_devices(device))
+    group = HomeAssistantScheduleGroup(0.01, lambda: {sensor: 20.0}, name="flat",
+                                       adaptive=AdaptiveInterval(minimum=0.01, maximum=0.04, threshold=0.5, growth=2.0))
+    connection.add_schedule_group(group)
+
+    runtime = connection.run(blocking=False, schedule_resolution=0.01, publish_timeout=1.0)
+    deadline = time.monotonic() + 2.0
+    while time.monotonic() < deadline and runtime.scheduler_stats()["flat"][0].interval != 0.04:
+        time.sleep(0.01)
+    stats = runtime.scheduler_stats()
+    runtime.stop(timeout=1.0)
+
+    # The collection never changes, so the interval grows to its maximum and the stats report it.
+    assert stats["flat"][0].interval == group.schedule.interval == 0.04
+
+
+def test_schedule_group_collects_once_and_publishes_only_changed_values(monkeypatch):
+    from jmqtt import QualityOfService as QoS
+
+    _patch_device_facts(monkeypatch)
+    mqtt = _FakeMqttConnection()
+    sensors = [SensorEntity(f"Register {i}", f"bus/register/{i}") for i in range(3)]
+    stray = SensorEntity("Stray", "bus/stray")
+    device = HomeAssistantDevice("Bus Device").add_entities(*sensors)
+    connection = HomeAssistantConnection(mqtt).add_origin(HomeAssistantOrigin("Bus App").add_devices(device))
+    for sensor in sensors:
+        sensor.mqtt_connected(connection.get_connection)
+
+    readings = iter([{sensors[0]: 1, sensors[1]: 2, sensors[2]: 3, stray: 4},
+                     {sensors[0]: 1, sensors[1]: 5, sensors[2]: 3}])
+    group = HomeAssistantScheduleGroup(5.0, lambda: next(readings), qos=QoS.AtLeastOnce, publish_timeout=1.0)
+    assert connection.add_schedule_group(group) is connection
+
+    group.schedule.run(0.0, mqtt)
+    assert [(topic, payload) for topic, payload, *_ in mqtt.publish_calls] == [
+        ("bus/register/0", "1"), ("bus/register/1", "2"), ("bus/register/2", "3")]
+    assert group.last_result.acknowledged == sensors
+
+    mqtt.publish_calls.clear()
+    group.schedule.run(group.schedule.next_run, mqtt)
+    assert [(topic, payload, qos) for topic, payload, qos, *_ in mqtt.publish_calls] == [
+        ("bus/register/1", "5", QoS.AtLeastOnce)]
+
+    connection.remove_schedule_group(group)
+    assert connection._schedule_groups == []
@@ -0,0 +1,351 @@
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from jhomeassistant.helper.scheduler import AdaptiveInterval, Schedule, Scheduler
+from jhomeassistant.types import CatchUpPolicy, OverrunPolicy
+
+
+def _start(scheduler: Scheduler, tick_resolution: float = 0.001, get_connection=lambda: "conn"):
+    stop_event = threading.Event()
+    thread = threading.Thread(target=scheduler.run_forever, args=(tick_resolution, get_connection, stop_event), daemon=True)
+    thread.start()
+    return stop_event, thread
+
+
+def _stop(scheduler: Scheduler, stop_event: threading.Event, thread: threading.Thread):
+    stop_event.set()
+    scheduler.wake()
+    thread.join(timeout=1.0)
+    assert not thread.is_alive()
+
+
+def test_scheduler_runs_tasks_at_their_deadlines_without_polling():
+    runs = []
+    connection_calls = []
+    fast = Schedule(0.02, lambda conn: runs.append(("fast", conn)))
+    slow = Schedule(10.0, lambda conn: runs.append(("slow", conn)))
+    scheduler = Scheduler(fast, slow)
+
+    stop_event, thread = _start(scheduler, get_connection=lambda: connection_calls.append(1) or "conn")
+    time.sleep(0.15)
+    _stop(scheduler, stop_event, thread)
+
+    assert runs.count(("slow", "conn")) == 1
+    assert 4 <= runs.count(("fast", "conn")) <= 9
+    # One get_connection() per wake-up with due tasks, never for idle wake-ups.
+    assert len(connection_calls) <= runs.count(("fast", "conn")) + 1
+    assert scheduler.tasks == [fast, slow]
+
+
+def test_add_and_remove_tasks_wake_the_sleeping_loop():
+    scheduler = Scheduler()
+    stop_event, thread = _start(scheduler, tick_resolution=10.0)
+    ran = threading.Event()
+    task = Schedule(10.0, lambda _conn: ran.set())
+
+    time.sleep(0.05)
+    started = time.monotonic()
+    scheduler.add_tasks(task)
+    assert ran.wait(timeout=1.0)
+    assert time.monotonic() - started < 0.5
+
+    scheduler.remove_tasks(task)
+    assert scheduler.tasks == []
+
+    started = time.monotonic()
+    _stop(scheduler, stop_event, thread)
+    assert time.monotonic() - started < 0.5
+
+
+def test_loop_sleeps_until_the_next_deadline_regardless_of_tick_resolution(monkeypatch):
+    scheduler = Scheduler(Schedule(10.0, lambda _conn: None, phase=10.0))
+    checks = []
+    pop_due = scheduler._pop_due
+    monkeypatch.setattr(scheduler, "_pop_due", lambda now: checks.append(now) or pop_due(now))
+
+    stop_event, thread = _start(scheduler, tick_resolution=0.001)
+    time.sleep(0.1)
+    _stop(scheduler, stop_event, thread)
+
+    assert len(checks) <= 2
+
+
+@pytest.mark.parametrize("tasks", [(), (Schedule(3600.0, lambda _conn: None),)])
+def test_setting_the_stop_event_stops_the_loop_without_wake(tasks):
+    scheduler = Scheduler(*tasks)
+    stop_event, thread = _start(scheduler, tick_resolution=10.0)
+    time.sleep(0.05)
+
+    stop_event.set()
+    thread.join(timeout=0.5)
+    assert not thread.is_alive()
+
+
+def test_zero_interval_runs_at_most_once_per_tick_resolution():
+    runs = []
+    scheduler = Scheduler(Schedule(0.0, lambda _conn: runs.append(time.monotonic())), spread_window=0)
+    stop_event, thread = _start(scheduler, tick_resolution=0.05)
+    time.sleep(0.3)
+    _stop(scheduler, stop_event, thread)
+
+    assert 2 <= len(runs) <= 8
+    assert all(later - earlier >= 0.045 for earlier, later in zip(runs, runs[1:]))
+
+
+def test_tasks_is_a_live_list_compatible_view():
+    first, second, third = (Schedule(3600.0, lambda _conn: None) for _ in range(3))
+    scheduler = Scheduler(first)
+
+    scheduler.tasks.append(second)
+    assert scheduler.tasks == [first, second] and len(scheduler._heap) == 2
+    scheduler.tasks.remove(first)
+    assert scheduler.tasks == [second] and second in scheduler.tasks
+    scheduler.tasks = [second, third]
+    assert scheduler.tasks == [second, third]
+    scheduler.tasks.clear()
+    assert scheduler.tasks == [] and len(scheduler.tasks) == 0
+
+
+def test_removed_tasks_are_not_rearmed_and_tombstones_are_compacted():
+    tasks = [Schedule(3600.0, lambda _conn: None) for _ in range(100)]
+    scheduler = Scheduler(*tasks)
+    scheduler.remove_tasks(*tasks[:80])
+
+    assert len(scheduler.tasks) == 20
+    assert len(scheduler._heap) == 20
+
+
+def test_slow_task_on_a_worker_pool_does_not_delay_fast_tasks():
+    release = threading.Event()
+    fast_runs = []
+    slow = Schedule(0.01, lambda _conn: release.wait(1.0))
+    fast = Schedule(0.02, lambda _conn: fast_runs.append(time.monotonic()))
+    with ThreadPoolExecutor(4) as executor:
+        scheduler = Scheduler(slow, fast, executor=executor)
+        stop_event, thread = _start(scheduler)
+        time.sleep(0.15)
+        _stop(scheduler, stop_event, thread)
+        assert slow.running == 1
+        release.set()
+
+    assert len(fast_runs) >= 4
+    # Only one slow run was outstanding at a time; every other due run was skipped.
+    assert slow.skipped_runs >= 5
+    assert slow.running == 0
+
+
+def test_queue_one_overrun_policy_runs_one_missed_run_afterwards():
+    release = threading.Event()
+    calls = []
+    task = Schedule(0.0, lambda conn: calls.append(conn) or release.wait(1.0), overrun=OverrunPolicy.QUEUE_ONE)
+    with ThreadPoolExecutor(2) as executor:
+        for now in (1.0, 2.0, 3.0, 4.0):
+            task.internal_dispatch(now, "conn", executor)
+        assert task.running == 1
+        assert task.skipped_runs == 2
+        release.set()
+        # The queued run is submitted by the finishing one; let it drain before the pool shuts down.
+        deadline = time.monotonic() + 1.0
+        while task.running and time.monotonic() < deadline:
+            time.sleep(0.005)
+
+    assert calls == ["conn", "conn"]
+    assert task.running == 0
+
+
+def test_timeout_frees_the_concurrency_slot_of_a_hung_run():
+    release = threading.Event()
+    calls = []
+    task = Schedule(0.0, lambda _conn: calls.append(1) or release.wait(1.0), timeout=0.5)
+    with ThreadPoolExecutor(2) as executor:
+        now = time.monotonic()
+        task.internal_dispatch(now, "conn", executor)
+        task.internal_dispatch(now + 0.1, "conn", executor)
+        assert task.skipped_runs == 1
+        # Past the budget the hung run is no longer counted and a new run starts.
+        task.internal_dispatch(now + 1.0, "conn", executor)
+        release.set()
+
+    assert len(calls) == 2
+    assert task.skipped_runs == 1
+
+
+def test_schedule_rejects_invalid_concurrency_settings():
+    with pytest.raises(ValueError):
+        Schedule(1.0, lambda _conn: None, max_concurrency=0)
+    with pytest.raises(ValueError):
+        Schedule(1.0, lambda _conn: None, timeout=0)
+    with pytest.raises(ValueError):
+        Schedule(1.0, lambda _conn: None, overrun="later")
+
+
+def test_schedules_sharing_an_interval_are_spread_across_it():
+    tasks = [Schedule(8.0, lambda _conn: None) for _ in range(4)]
+    pinned = Schedule(8.0, lambda _conn: None, phase=3.0)
+    other = Schedule(2.0, lambda _conn: None)
+    started = time.monotonic()
+    scheduler = Scheduler(*tasks, pinned, other, spread_window=8.0)
+
+    offsets = sorted(round(task.next_run - started) for task in tasks)
+    assert offsets == [0, 2, 4, 6]
+    assert round(pinned.next_run - started) == 3
+    assert round(other.next_run - started) == 0
+
+    late = Schedule(8.0, lambda _conn: None)
+    scheduler.add_tasks(late)
+    assert round(late.next_run - started) == 1
+
+
+def test_spread_is_capped_so_long_intervals_start_promptly():
+    tasks = [Schedule(3600.0, lambda _conn: None) for _ in range(8)]
+    short = [Schedule(2.0, lambda _conn: None) for _ in range(2)]
+    started = time.monotonic()
+    Scheduler(*tasks, *short)
+
+    offsets = sorted(task.next_run - started for task in tasks)
+    assert offsets[-1] < 5.0
+    assert offsets == pytest.approx([i * 5.0 / 8 for i in range(8)], abs=0.05)
+    assert sorted(round(task.next_run - started) for task in short) == [0, 1]
+
+    immediate = [Schedule(3600.0, lambda _conn: None) for _ in range(3)]
+    started = time.monotonic()
+    Scheduler(*immediate, spread_window=0)
+    assert all(task.next_run - started < 0.5 for task in immediate)
+    with pytest.raises(ValueError):
+        Scheduler(spread_window=-1)
+
+
+def test_fixed_rate_does_not_drift_and_catch_up_policy_applies():
+    task = Schedule(1.0, lambda _conn: None)
+    task.internal_anchor(100.0)
+    task.run(100.4, "conn")  # late start does not shift the grid
+    assert task.next_run == 101.0
+    task.run(103.5, "conn")  # ticks 102 and 103 are dropped
+    assert task.next_run == 104.0
+
+    calls = []
+    replay = Schedule(1.0, lambda _conn: calls.append(1), catch_up=CatchUpPolicy.RUN_ALL)
+    replay.internal_anchor(100.0)
+    now = 103.5
+    while replay.next_run <= now:
+        replay.run(now, "conn")
+    assert len(calls) == 4
+    assert replay.next_run == 104.0
+
+
+def test_jitter_delays_runs_within_its_bound_without_drift():
+    task = Schedule(10.0, lambda _conn: None, jitter=0.5)
+    task.internal_anchor(100.0)
+    for tick in (100.0, 110.0, 120.0):
+        assert tick <= task.next_run <= tick + 0.5
+        task.run(task.next_run, "conn")
+    with pytest.raises(ValueError):
+        Schedule(1.0, lambda _conn: None, jitter=-1.0)
+
+
+def test_schedule_stats_count_runs_failures_and_overruns():
+    outcomes = iter([None, ValueError("boom"), None])
+
+    def _func(_conn):
+        outcome = next(outcomes)
+        if outcome is not None:
+            raise outcome
+
+    task = Schedule(1.0, _func)
+    task.internal_anchor(time.monotonic() - 0.5)
+    task.run(time.monotonic(), "conn")
+    with pytest.raises(ValueError):
+        task.run(task.next_run, "conn")
+
+    stats = task.stats()
+    assert stats.name.endswith("_func")
+    assert (stats.runs, stats.failures, stats.overruns) == (2, 1, 0)
+    assert stats.last_success is not None
+    assert sum(count for _bound, count in stats.duration_histogram) == 2
+    assert stats.duration_histogram[0] == (0.001, 2)
+    assert 0.4 <= stats.lateness_max < 5.0
+
+
+def test_watchdog_logs_the_stack_of_runs_over_budget(caplog):
+    release = threading.Event()
+
+    def _stuck_callback(_conn):
+        release.wait(1.0)
+
+    task = Schedule(0.02, _stuck_callback)
+    scheduler = Scheduler(task)
+    with caplog.at_level("WARNING"):
+        stop_event, thread = _start(scheduler)
+        time.sleep(0.1)
+        release.set()
+        _stop(scheduler, stop_event, thread)
+
+    reports = [r.getMessage() for r in caplog.records if "over its" in r.getMessage()]
+    assert len(reports) == 1
+    assert "_stuck_callback" in reports[0]
+    assert task.stats().overruns == 1
+
+
+def test_watchdog_sleeps_while_no_run_is_in_flight(monkeypatch):
+    checks = []
+    original = Schedule.internal_report_deadline
+
+    def _counting(self, token):
+        checks.append(token)
+        return original(self, token)
+
+    monkeypatch.setattr(Schedule, "internal_report_deadline", _counting)
+    quick = Schedule(0.02, lambda _conn: None)
+    scheduler = Scheduler(quick)
+    stop_event, thread = _start(scheduler)
+    time.sleep(0.2)
+    _stop(scheduler, stop_event, thread)
+
+    # Every run finished within its budget, so the watchdog was never woken to check one.
+    assert quick.stats().runs >= 3
+    assert checks == []
+    time.sleep(0.05)
+    assert not any(t.name == "jhomeassistant-schedule-watchdog" for t in threading.enumerate())
+
+
+def test_adaptive_interval_shrinks_on_change_and_grows_while_stable():
+    values = iter([20.0, 20.05, 20.1, 20.1, 23.0, 23.0])
+    task = Schedule(10.0, lambda _conn: next(values),
+                    adaptive=AdaptiveInterval(minimum=1.0, maximum=20.0, threshold=0.5, growth=2.0))
+    task.internal_anchor(0.0)
+
+    intervals = []
+    for _ in range(6):
+        task.run(task.next_run, "conn")
+        intervals.append(task.interval)
+
+    # First value only sets the baseline; changes within the threshold count as stable.
+    assert intervals == [10.0, 20.0, 20.0, 20.0, 1.0, 2.0]
+    assert task.stats().interval == 2.0
+    with pytest.raises(ValueError):
+        AdaptiveInterval(minimum=5.0, maximum=1.0)
+
+
+def test_adaptive_interval_change_moves_the_scheduled_deadline():
+    readings = iter(range(100))
+    task = Schedule(0.05, lambda _conn: next(readings), adaptive=AdaptiveInterval(minimum=0.01, maximum=10.0))
+    scheduler = Scheduler(task)
+    stop_event, thread = _start(scheduler)
+    time.sleep(0.15)
+    _stop(scheduler, stop_event, thread)
+
+    # Values change on every run, so after the baseline run the schedule polls at its minimum.
+    assert task.interval == 0.01
+    assert task.stats().runs >= 6
+
+
+def test_adaptive_interval_compares_mappings_per_key():
+    adaptive = AdaptiveInterval(minimum=1.0, maximum=10.0, threshold=1.0)
+    assert not adaptive.changed({"a": 1.0, "b": "on"}, {"a": 1.5, "b": "on"})
+    assert adaptive.changed({"a": 1.0, "b": "on"}, {"a": 1.0, "b": "off"})
+    assert adaptive.changed({"a": 1.0}, {"a": 1.0, "c": 2})